@@ -0,0 +1,79 @@
+"""CLI startup cost: cumulative import time of social_duo.main and per-command cold starts.
+
+Run from the repo root: python -m benchmarks.bench_import_time --budget-ms 150
+Exits 1 when the median import of social_duo.main exceeds --budget-ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = ("history", "config", "post", "molt")
+
+
+def _import_us(module: str) -> int:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"{module} missing from -X importtime output")
+
+
+def _cold_start_ms(command: str) -> float:
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "social_duo.main", command, "--help"],
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def _loaded_modules() -> list[str]:
+    code = "import sys, social_duo.main; print('\\n'.join(sorted(sys.modules)))"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def run(*, repeat: int, budget_ms: float | None) -> dict:
+    import_ms = statistics.median(_import_us("social_duo.main") / 1000 for _ in range(repeat))
+    loaded = _loaded_modules()
+    result = {
+        "benchmark": "import_time",
+        "repeat": repeat,
+        "import_main_ms": round(import_ms, 1),
+        "modules_loaded": len(loaded),
+        "heavy_modules_loaded": [m for m in ("httpx", "pydantic", "dotenv") if m in loaded],
+        "cold_start_ms": {
+            cmd: round(statistics.median(_cold_start_ms(cmd) for _ in range(repeat)), 1) for cmd in COMMANDS
+        },
+        "budget_ms": budget_ms,
+    }
+    result["within_budget"] = budget_ms is None or import_ms <= budget_ms
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if importing social_duo.main is slower")
+    args = parser.parse_args()
+    result = run(**vars(args))
+    print(json.dumps(result))
+    if not result["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Reducer, context-build and near-duplicate lookup cost on a large molt feed.
+
+Run from the repo root: python -m benchmarks.bench_molt_state --events 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+from social_duo.core.molt_engine import FeedState, _build_context, reduce_event
+
+
+def _events(count: int, posts_every: int, comments_every: int):
+    post_id = comment_id = None
+    parent_id = None
+    counters = {"post": 0, "comment": 0, "reply": 0}
+    for n in range(count):
+        agent = "AgentA" if n % 2 == 0 else "AgentB"
+        if post_id is None or n % posts_every == 0:
+            counters["post"] += 1
+            post_id = f"P{counters['post']}"
+            comment_id = parent_id = None
+            yield {
+                "agent": agent,
+                "action": "CREATE_POST",
+                "target_id": post_id,
+                "payload": {"post_id": post_id, "title": f"Topic {n}", "content": f"Post {n} about transit"},
+            }
+        elif comment_id is None or n % comments_every == 0:
+            counters["comment"] += 1
+            comment_id = parent_id = f"C{counters['comment']}"
+            yield {
+                "agent": agent,
+                "action": "COMMENT",
+                "target_id": post_id,
+                "payload": {"comment_id": comment_id, "post_id": post_id, "content": f"Comment {n}"},
+            }
+        else:
+            counters["reply"] += 1
+            reply_id = f"R{counters['reply']}"
+            yield {
+                "agent": agent,
+                "action": "REPLY",
+                "target_id": parent_id,
+                "payload": {"reply_id": reply_id, "parent_id": parent_id, "content": f"Reply {n}"},
+            }
+            parent_id = reply_id
+
+
+def run(*, events: int, posts_every: int, comments_every: int, context_builds: int, skip_index: bool) -> dict:
+    state = FeedState(max_posts=events, max_comments=events, max_replies=events)
+    started = time.perf_counter()
+    for event in _events(events, posts_every, comments_every):
+        reduce_event(state, event)
+    reduce_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if not skip_index:
+        state.similarity.flush()
+    index_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(context_builds):
+        _build_context(state, "x", "low", None)
+        state.latest_post_id()
+        state.latest_comment_id()
+        if not skip_index:
+            state.is_repeat("Reply about transit and how cities plan for it")
+    context_s = time.perf_counter() - started
+
+    return {
+        "benchmark": "molt_state",
+        "events": events,
+        "posts": len(state.posts),
+        "comments": len(state.comments),
+        "replies": len(state.replies),
+        "reduce_s": round(reduce_s, 3),
+        "reduce_us_per_event": round(reduce_s / events * 1e6, 3),
+        "index_build_s": None if skip_index else round(index_s, 3),
+        "context_builds": context_builds,
+        "context_us_per_build": round(context_s / context_builds * 1e6, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--posts-every", type=int, default=100)
+    parser.add_argument("--comments-every", type=int, default=10)
+    parser.add_argument("--context-builds", type=int, default=1000)
+    parser.add_argument("--skip-index", action="store_true", help="Skip the similarity index build and lookups")
+    args = parser.parse_args()
+    print(json.dumps(run(**vars(args))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Throughput of the many-agent molt engine against an in-process stub LLM.
+
+Run from the repo root: python -m benchmarks.bench_molt_swarm --agents 200 --feeds 50 --turns 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from benchmarks.stub_llm import StubMoltLLM
+from social_duo.core.molt_swarm import SCHEDULERS, default_personas, simulate_swarm
+
+
+def run(*, agents: int, feeds: int, turns: int, concurrency: int, latency: float, scheduler: str) -> dict:
+    llm = StubMoltLLM(latency=latency)
+    sched = SCHEDULERS[scheduler](seed=7) if scheduler != "round-robin" else SCHEDULERS[scheduler]()
+    result = simulate_swarm(
+        llm=llm,
+        personas=default_personas(agents),
+        feeds=feeds,
+        turns=turns,
+        platform="x",
+        risk="low",
+        topic=None,
+        event_cb=lambda event: None,
+        scheduler=sched,
+        concurrency=concurrency,
+        feed_limits={"max_replies": 1_000_000, "max_comments": 1_000_000},
+    )
+    return {
+        "benchmark": "molt_swarm",
+        "agents": agents,
+        "feeds": feeds,
+        "concurrency": concurrency,
+        "latency_s": latency,
+        "scheduler": scheduler,
+        "llm_calls": llm.calls,
+        **result["stats"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--feeds", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.01, help="Stub LLM latency per call in seconds")
+    parser.add_argument("--scheduler", choices=sorted(SCHEDULERS), default="round-robin")
+    args = parser.parse_args()
+    print(json.dumps(run(**vars(args))))
+
+
+if __name__ == "__main__":
+    main()
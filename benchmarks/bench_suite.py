@@ -0,0 +1,248 @@
+"""End-to-end offline benchmark suite against the deterministic stub LLM server.
+
+Runs post (single platform and --platform all), reply, discuss (12/50 turns) and molt
+(30/500 turns) through the real CLI in a temporary workspace, plus storage and scoring
+micro-benchmarks. Reports throughput, p50/p95/p99 run latency, LLM calls and DB bytes per run.
+
+    python -m benchmarks.bench_suite --runs 5 --latency lognormal:200:0.4 --error-rate 0.01 --out bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from benchmarks.stub_server import StubConfig, StubServer
+
+# name -> (argv, weight); heavy scenarios run runs // weight times (at least once).
+SCENARIOS: dict[str, tuple[list[str], int]] = {
+    "post_single": (["post", "--platform", "x", "--goal", "educate", "--topic", "transit", "--audience", "commuters",
+                     "--tone", "calm", "--length", "short", "--facts", "facts.txt", "--json"], 1),
+    "post_all": (["post", "--platform", "all", "--goal", "educate", "--topic", "transit", "--audience", "commuters",
+                  "--tone", "calm", "--length", "short", "--facts", "facts.txt", "--json"], 1),
+    "reply": (["reply", "--text", "Bus lanes slow everyone down.", "--platform", "x", "--json"], 1),
+    "discuss_12": (["discuss", "--platform", "x", "--turns", "12", "--stop-on", "turns", "--json"], 1),
+    "discuss_50": (["discuss", "--platform", "x", "--turns", "50", "--stop-on", "turns", "--json"], 5),
+    "molt_30": (["molt", "run", "--turns", "30", "--platform", "x", "--cadence", "fast", "--json"], 1),
+    "molt_500": (["molt", "run", "--turns", "500", "--platform", "x", "--cadence", "fast", "--json"], 5),
+}
+MICRO = ("storage", "scoring")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), math.ceil(pct / 100 * len(ordered))))
+    return ordered[rank - 1]
+
+
+def _latency_stats(seconds: list[float]) -> dict[str, float]:
+    ms = [s * 1000 for s in seconds]
+    return {
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+    }
+
+
+def _db_bytes(db_path: Path) -> int:
+    """Bytes of used pages, as seen through the WAL, so checkpoint timing doesn't skew deltas."""
+    if not db_path.exists():
+        return 0
+    conn = sqlite3.connect(db_path)
+    try:
+        pages = conn.execute("PRAGMA page_count").fetchone()[0] - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return pages * conn.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _workspace(base_url: str) -> Iterator[Path]:
+    """Temporary cwd with an initialised .social-duo workspace wired to the stub server."""
+    keys = ("OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_JSON_SCHEMA", "SOCIAL_DUO_NO_DAEMON")
+    saved_env = {key: os.environ.get(key) for key in keys}
+    saved_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="social-duo-bench-") as tmp:
+        os.environ.update(
+            {"OPENAI_API_KEY": "stub", "OPENAI_BASE_URL": base_url, "OPENAI_JSON_SCHEMA": "1", "SOCIAL_DUO_NO_DAEMON": "1"}
+        )
+        os.chdir(tmp)
+        try:
+            Path("facts.txt").write_text("- Route 9 runs every 8 minutes\n")
+            _invoke(["init"])
+            yield Path(tmp) / ".social-duo"
+        finally:
+            os.chdir(saved_cwd)
+            for key, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def _invoke(argv: list[str]) -> None:
+    from typer.testing import CliRunner
+
+    from social_duo.main import app
+
+    result = CliRunner().invoke(app, argv, input="\n")
+    if result.exit_code != 0:
+        detail = result.exception if result.exception and not isinstance(result.exception, SystemExit) else result.output[-500:]
+        raise RuntimeError(f"{' '.join(argv[:2])} exited {result.exit_code}: {detail}")
+
+
+def run_scenario(name: str, *, stub: StubServer, workspace: Path, runs: int) -> dict[str, Any]:
+    argv, weight = SCENARIOS[name]
+    runs = max(1, runs // weight)
+    latencies: list[float] = []
+    calls: list[int] = []
+    db_bytes: list[int] = []
+    failures: list[str] = []
+    started = time.perf_counter()
+    for _ in range(runs):
+        before_calls, before_bytes = stub.stats()["calls"], _db_bytes(workspace / "history.db")
+        t0 = time.perf_counter()
+        try:
+            _invoke(argv)
+        except RuntimeError as exc:
+            failures.append(str(exc))
+            continue
+        latencies.append(time.perf_counter() - t0)
+        calls.append(stub.stats()["calls"] - before_calls)
+        db_bytes.append(_db_bytes(workspace / "history.db") - before_bytes)
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": name,
+        "runs": runs,
+        "ok": len(latencies),
+        "failed": len(failures),
+        "errors": failures[:3],
+        "throughput_runs_per_s": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        **_latency_stats(latencies),
+        "llm_calls_per_run": round(statistics.fmean(calls), 2) if calls else 0.0,
+        "db_bytes_per_run": round(statistics.fmean(db_bytes)) if db_bytes else 0,
+    }
+
+
+def bench_storage(workspace: Path, n: int = 2000) -> dict[str, Any]:
+    from social_duo.storage.events import add_event
+    from social_duo.storage.history import add_step, create_run, create_session
+
+    db_path = workspace / "micro.db"
+    session_id = create_session(db_path, cwd=str(workspace), label="bench")
+    run_id = create_run(db_path, session_id=session_id, run_type="molt", platform="x", input_json={})
+    payload = {"id": "p1", "title": "Notes on transit", "content": "A concrete thought about transit." * 3}
+    before = _db_bytes(db_path)
+    t0 = time.perf_counter()
+    for _ in range(n):
+        add_event(db_path, run_id=run_id, agent="AgentA", action="CREATE_POST", target_id=None, payload=payload)
+    events_s = time.perf_counter() - t0
+    mid = _db_bytes(db_path)
+    t0 = time.perf_counter()
+    for idx in range(n):
+        add_step(db_path, run_id=run_id, step_index=idx, agent_name="writer", role="draft", content=payload)
+    steps_s = time.perf_counter() - t0
+    return {
+        "micro": "storage",
+        "ops": n,
+        "add_event_us": round(events_s / n * 1e6, 2),
+        "add_step_us": round(steps_s / n * 1e6, 2),
+        "add_event_ops_per_s": round(n / events_s),
+        "add_step_ops_per_s": round(n / steps_s),
+        "bytes_per_event": round((mid - before) / n),
+        "bytes_per_step": round((_db_bytes(db_path) - mid) / n),
+    }
+
+
+def bench_scoring(n: int = 5000) -> dict[str, Any]:
+    from social_duo.core.config import default_config
+    from social_duo.core.constraints import validate_text
+    from social_duo.core.policy import get_policy
+    from social_duo.core.scoring import compute_metrics
+
+    config = default_config()
+    config.brand_voice.banned_phrases = ["game changer", "synergy", "revolutionary", "disrupt", "10x"]
+    matcher = get_policy(config).banned_matcher
+    text = "Why transit matters this week: three concrete changes and what they cost. Learn more at our site. #transit"
+    t0 = time.perf_counter()
+    for _ in range(n):
+        validate_text(text, config=config, platform="x", cta_required=True, cta_text="Learn more")
+    validate_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(n):
+        compute_metrics(text, banned_phrases=[], cta_required=True, cta_text="Learn more", banned_matcher=matcher)
+    metrics_s = time.perf_counter() - t0
+    return {
+        "micro": "scoring",
+        "ops": n,
+        "validate_text_us": round(validate_s / n * 1e6, 2),
+        "compute_metrics_us": round(metrics_s / n * 1e6, 2),
+    }
+
+
+def run(
+    runs: int = 5,
+    latency: str = "fixed:0",
+    error_rate: float = 0.0,
+    tokens_per_s: float = 0.0,
+    pass_rate: float = 0.5,
+    seed: int = 7,
+    only: str | None = None,
+    out: Path | None = None,
+) -> dict[str, Any]:
+    selected = [name.strip() for name in only.split(",")] if only else [*SCENARIOS, *MICRO]
+    unknown = [name for name in selected if name not in SCENARIOS and name not in MICRO]
+    if unknown:
+        raise SystemExit(f"Unknown scenario(s): {', '.join(unknown)}")
+    config = StubConfig(latency=latency, error_rate=error_rate, tokens_per_s=tokens_per_s, pass_rate=pass_rate, seed=seed)
+    report: dict[str, Any] = {
+        "benchmark": "suite",
+        "stub": vars(config),
+        "python": sys.version.split()[0],
+        "scenarios": [],
+        "micro": [],
+    }
+    with StubServer(config) as stub, _workspace(stub.url) as workspace:
+        for name in selected:
+            if name in SCENARIOS:
+                report["scenarios"].append(run_scenario(name, stub=stub, workspace=workspace, runs=runs))
+            elif name == "storage":
+                report["micro"].append(bench_storage(workspace))
+            else:
+                report["micro"].append(bench_scoring())
+        report["llm"] = stub.stats()
+    if out:
+        out.write_text(json.dumps(report, indent=2) + "\n")
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (heavy ones run fewer)")
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:LO:HI | exp:MEAN | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of LLM calls answered with HTTP 500")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="Completion token rate (0 = instant)")
+    parser.add_argument("--pass-rate", type=float, default=0.5, help="Share of Editor critiques that PASS")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", default=None, help=f"Comma-separated subset of: {', '.join([*SCENARIOS, *MICRO])}")
+    parser.add_argument("--out", type=Path, default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+    print(json.dumps(run(**vars(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import itertools
+import json
+import threading
+import time
+from typing import Any
+
+# Canned payloads shared by StubMoltLLM and the HTTP stub server (benchmarks.stub_server).
+MOLT_ACTIONS = ["CREATE_POST", "COMMENT", "REPLY", "REPLY", "UPVOTE", "REPLY"]
+WORDS = ["transit", "zoning", "libraries", "parks", "budgets", "housing", "water", "schools", "bikes", "markets"]
+
+
+def word_for(n: int) -> str:
+    return WORDS[n % len(WORDS)]
+
+
+def molt_action(n: int) -> dict[str, Any]:
+    word = word_for(n)
+    return {
+        "action": MOLT_ACTIONS[n % len(MOLT_ACTIONS)],
+        "title": f"Notes on {word} #{n}",
+        "content": f"Call {n}: a concrete thought about {word} and how neighbours use it.",
+        "target_id": None,
+        "vote": None,
+        "moderation": None,
+    }
+
+
+def writer_draft(n: int) -> dict[str, Any]:
+    word = word_for(n)
+    text = f"Why {word} matters this week: three concrete changes and what they cost. #{word}"
+    return {
+        "recommended": text,
+        "variants": [text, f"{word.title()} in one line.", f"What we learned about {word}."],
+        "hashtags": [f"#{word}"],
+        "rationale": ["Specific", "Short"],
+    }
+
+
+def editor_critique(n: int, passed: bool) -> dict[str, Any]:
+    word = word_for(n)
+    return {
+        "verdict": "PASS" if passed else "FAIL",
+        "issues": [] if passed else [{"type": "clarity", "detail": f"Be more specific about {word}."}],
+        "edited_version": f"A tighter take on {word}: small steps, clear wins.",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 85 + n % 10, "clarity": 70 + n % 25, "hook": 60 + n % 30, "risk": 10},
+    }
+
+
+class StubMoltLLM:
+    """In-process LLMClient that returns valid MoltAction JSON after an optional fixed latency."""
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.calls = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def chat(self, messages, *, temperature, max_tokens, response_format=None) -> dict:
+        with self._lock:
+            n = next(self._counter)
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return {"choices": [{"message": {"content": json.dumps(molt_action(n))}}]}
@@ -0,0 +1,230 @@
+"""Deterministic OpenAI-compatible stub server for offline benchmarks.
+
+Serves POST /v1/chat/completions with schema-valid JSON for the Writer, Editor, discuss and
+molt prompts. Latency, error rate and token rate are configurable; randomness is seeded.
+
+Standalone: python -m benchmarks.stub_server --port 8089 --latency lognormal:300:0.5 --error-rate 0.02
+then point OPENAI_BASE_URL at http://127.0.0.1:8089/v1 (any OPENAI_API_KEY works).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+
+from benchmarks.stub_llm import editor_critique, molt_action, word_for, writer_draft
+from social_duo.agents.prompts import EDITOR_SYSTEM
+from social_duo.agents.prompts_discuss import AGENT_DISCUSS_SYSTEM
+from social_duo.agents.prompts_molt import MOLT_PREAMBLE
+
+_EXPECTED = re.compile(r"Expected intent: ([A-Z_]+)")
+_PLATFORM = re.compile(r"Platform(?: target)?: (x|linkedin|instagram|threads|all)\b")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """``fixed:MS``, ``uniform:LO_MS:HI_MS``, ``exp:MEAN_MS`` or ``lognormal:MEDIAN_MS:SIGMA`` -> seconds sampler."""
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1000 / values[0]) if values[0] else 0.0
+    if kind == "lognormal":
+        mu = math.log(values[0] / 1000) if values[0] else -50.0
+        sigma = values[1] if len(values) > 1 else 0.5
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    raise ValueError(f"Unknown latency distribution {spec!r}")
+
+
+@dataclass
+class StubConfig:
+    latency: str = "fixed:0"
+    error_rate: float = 0.0
+    tokens_per_s: float = 0.0
+    pass_rate: float = 0.5
+    seed: int = 7
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class StubServer:
+    """Threaded stub; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: StubConfig | None = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self._sample_latency = parse_latency(self.config.latency)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="stub-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+    def respond(self, body: dict[str, Any]) -> tuple[int, dict[str, Any], float]:
+        """Status, JSON body and the delay to apply before sending it."""
+        messages = body.get("messages") or []
+        with self._lock:
+            n = self.calls
+            self.calls += 1
+            delay = self._sample_latency(self._rng)
+            fail = self._rng.random() < self.config.error_rate
+            passed = self._rng.random() < self.config.pass_rate
+            if fail:
+                self.errors += 1
+        if fail:
+            return 500, {"error": {"message": "stub injected failure", "type": "server_error"}}, delay
+
+        content = json.dumps(_content_for(messages, n, passed))
+        prompt_tokens = sum(_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = _tokens(content)
+        if self.config.tokens_per_s > 0:
+            delay += completion_tokens / self.config.tokens_per_s
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+        return (
+            200,
+            {
+                "id": f"stub-{n}",
+                "object": "chat.completion",
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            },
+            delay,
+        )
+
+
+def _content_for(messages: list[dict[str, Any]], n: int, passed: bool) -> dict[str, Any]:
+    system = str(messages[0].get("content", "")) if messages else ""
+    last = str(messages[-1].get("content", "")) if messages else ""
+    if system == EDITOR_SYSTEM:
+        return editor_critique(n, passed)
+    if system == AGENT_DISCUSS_SYSTEM:
+        return _discuss_turn(last, n, word_for(n))
+    if system.startswith(MOLT_PREAMBLE):
+        return molt_action(n)
+    # Writer (and anything unrecognised) gets a Draft.
+    return writer_draft(n)
+
+
+def _discuss_turn(context: str, n: int, word: str) -> dict[str, Any]:
+    match = _EXPECTED.search(context)
+    intent = match.group(1) if match else "PROPOSE_TOPIC"
+    platform_match = _PLATFORM.search(context)
+    platform = platform_match.group(1) if platform_match else "x"
+    platform = "x" if platform == "all" else platform
+    chosen = {"topic": f"Local {word}", "angle": "what changes for residents", "platform": platform}
+    turn: dict[str, Any] = {"type": "DISCUSS", "intent": intent, "message": f"Turn {n} on {word}.", "stop": False}
+    if intent in {"PROPOSE_TOPIC", "DECIDE"}:
+        turn.update({"intent": "DECIDE", "candidates": [chosen], "chosen": chosen})
+    elif intent == "DRAFT":
+        turn["artifacts"] = [{"kind": "post", "platform": platform, "content": f"{word.title()}: a short, specific update."}]
+    elif intent == "SIMULATE_COMMENT":
+        turn["artifacts"] = [{"kind": "reply", "platform": platform, "content": f"Comment: what about {word} costs?"}]
+    elif intent == "REPLY":
+        turn["artifacts"] = [{"kind": "reply", "platform": platform, "content": f"Reply: costs for {word} are listed."}]
+    elif intent == "WRAPUP":
+        turn["stop"] = True
+    else:
+        turn.update({"intent": "REVISE", "artifacts": [
+            {"kind": "post", "platform": platform, "content": f"{word.title()}: revised update #{n}."}
+        ]})
+    return turn
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            status, payload, delay = 404, {"error": {"message": "not found"}}, 0.0
+        else:
+            status, payload, delay = self.server.stub.respond(body)
+        if delay > 0:
+            time.sleep(delay)
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:MS | uniform:LO:HI | exp:MEAN | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="Completion token rate (0 = instant)")
+    parser.add_argument("--pass-rate", type=float, default=0.5, help="Share of Editor critiques that PASS")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    config = StubConfig(args.latency, args.error_rate, args.tokens_per_s, args.pass_rate, args.seed)
+    server = StubServer(config, host=args.host, port=args.port)
+    print(json.dumps({"url": server.url, **vars(args)}), flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
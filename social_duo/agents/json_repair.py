@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import re
+from types import NoneType
+from typing import Any, TypeVar, get_args, get_origin
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_FENCE = re.compile(r"^```[\w-]*\s*\n?|\n?```\s*$")
+_SCALAR = re.compile(r"[A-Za-z0-9+\-.]+")
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_SMART_QUOTES = "“”"
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_fences(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```"):
+        text = _FENCE.sub("", text)
+    return text
+
+
+def _pop_whitespace(out: list[str]) -> None:
+    while out and out[-1].isspace():
+        out.pop()
+
+
+def _value_done(stack: list[list[str]]) -> None:
+    if stack:
+        top = stack[-1]
+        top[1] = "colon" if top[0] == "{" and top[1] == "key" else "comma"
+
+
+def _is_json_scalar(token: str) -> bool:
+    try:
+        json.loads(token)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def repair_json(content: str) -> str | None:
+    """Rewrite common LLM JSON mistakes into parseable JSON.
+
+    Handles code fences, leading/trailing prose, smart-quoted strings, trailing commas,
+    raw newlines inside strings, Python literals, and output truncated mid-structure
+    (open strings, dangling keys and unclosed brackets are closed; a number or literal cut
+    off mid-token becomes null). Returns None when there is no object to salvage.
+    """
+    text = _strip_fences(content)
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    out: list[str] = []
+    stack: list[list[str]] = []  # [opener, phase]; phase is key|colon|value|comma
+    in_string = False
+    smart = False
+    escaped = False
+    cut_scalar: tuple[int, bool] | None = None  # (index in out, was a key) of a scalar ending the text
+    i = start
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                out.append(ch)
+                escaped = False
+            elif ch == "\\":
+                out.append(ch)
+                escaped = True
+            elif (smart and ch in _SMART_QUOTES) or (not smart and ch == '"'):
+                out.append('"')
+                in_string = False
+                _value_done(stack)
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            elif ch == "\t":
+                out.append("\\t")
+            elif ord(ch) >= 0x20:
+                out.append(ch)
+        elif ch == '"' or ch in _SMART_QUOTES:
+            in_string = True
+            smart = ch != '"'
+            out.append('"')
+        elif ch in _CLOSERS:
+            if stack and stack[-1][1] != "key":
+                stack[-1][1] = "comma"
+            stack.append([ch, "key" if ch == "{" else "value"])
+            out.append(ch)
+        elif ch in "}]":
+            if not stack:
+                break
+            _pop_whitespace(out)
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(_CLOSERS[stack.pop()[0]])
+            if not stack:
+                break
+            stack[-1][1] = "comma"
+        elif ch == ",":
+            out.append(ch)
+            if stack:
+                stack[-1][1] = "key" if stack[-1][0] == "{" else "value"
+        elif ch == ":":
+            out.append(ch)
+            if stack:
+                stack[-1][1] = "value"
+        elif ch.isspace():
+            out.append(ch)
+        else:
+            match = _SCALAR.match(text, i)
+            token = match.group(0) if match else ch
+            if i + len(token) == len(text):
+                cut_scalar = (len(out), bool(stack) and stack[-1][0] == "{" and stack[-1][1] == "key")
+            out.append(_LITERALS.get(token, token))
+            _value_done(stack)
+            i += len(token)
+            continue
+        i += 1
+
+    if in_string:
+        if escaped:
+            out.pop()
+        out.append('"')
+        _value_done(stack)
+    if cut_scalar is not None and not _is_json_scalar(out[cut_scalar[0]]):
+        index, was_key = cut_scalar
+        if was_key:
+            del out[index:]
+            stack[-1][1] = "key"
+        else:
+            out[index] = "null"
+    while stack:
+        opener, phase = stack.pop()
+        _pop_whitespace(out)
+        if phase == "colon":
+            out.append(": null")
+        elif phase == "value" and out and out[-1] == ":":
+            out.append(" null")
+        elif out and out[-1] == ",":
+            out.pop()
+        out.append(_CLOSERS[opener])
+
+    return "".join(out)
+
+
+def _empty_value(annotation: Any) -> tuple[bool, Any]:
+    origin = get_origin(annotation)
+    if annotation is list or origin is list:
+        return True, []
+    if annotation is dict or origin is dict:
+        return True, {}
+    if NoneType in get_args(annotation):
+        return True, None
+    return False, None
+
+
+def fill_defaults(model: type[BaseModel], data: Any) -> Any:
+    """Fill required list/dict/optional fields the model left out with empty values."""
+    if not isinstance(data, dict):
+        return data
+    for name, info in model.model_fields.items():
+        key = info.alias or name
+        if key in data or not info.is_required():
+            continue
+        ok, value = _empty_value(info.annotation)
+        if ok:
+            data[key] = value
+    return data
+
+
+def parse_tolerant(model: type[ModelT], content: str) -> ModelT:
+    """Repair ``content`` and validate it against ``model``; raises like json.loads/model_validate."""
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        repaired = repair_json(content)
+        if repaired is None:
+            raise
+        data = json.loads(repaired)
+    return model.model_validate(fill_defaults(model, data))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass(frozen=True)
+class PromptLayout:
+    """Messages ordered as a stable prefix (system + static context) followed by a per-call suffix.
+
+    Provider-side prompt caches match on the longest identical prefix, so anything that only
+    changes with the workspace config or the brief goes in ``static`` and anything that changes
+    per call (draft, feedback, instruction) goes in ``dynamic``.
+    """
+
+    system: str
+    static: tuple[str, ...]
+    dynamic: tuple[str, ...]
+
+    @property
+    def prefix_hash(self) -> str:
+        digest = hashlib.sha256(self.system.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update("\n".join(self.static).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+    def messages(self) -> list[dict]:
+        return [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": "\n".join(self.static)},
+            {"role": "user", "content": "\n".join(self.dynamic)},
+        ]
+
+
+@dataclass
+class PromptCacheStats:
+    calls: int = 0
+    prefix_repeats: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    seen_prefixes: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, prefix_hash: str, usage: dict[str, Any] | None) -> None:
+        with self._lock:
+            self._record(prefix_hash, usage)
+
+    def _record(self, prefix_hash: str, usage: dict[str, Any] | None) -> None:
+        self.calls += 1
+        if prefix_hash in self.seen_prefixes:
+            self.prefix_repeats += 1
+        self.seen_prefixes[prefix_hash] = self.seen_prefixes.get(prefix_hash, 0) + 1
+        if not usage:
+            return
+        self.prompt_tokens += int(usage.get("prompt_tokens") or 0)
+        self.completion_tokens += int(usage.get("completion_tokens") or 0)
+        details = usage.get("prompt_tokens_details") or {}
+        self.cached_tokens += int(details.get("cached_tokens") or 0)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of prompt tokens the provider served from its cache."""
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prefix_repeats": self.prefix_repeats,
+            "unique_prefixes": len(self.seen_prefixes),
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "hit_rate": round(self.hit_rate, 4),
+        }
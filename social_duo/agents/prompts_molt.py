@@ -1,20 +1,45 @@
 from __future__ import annotations
 
-MOLT_SYSTEM = """
+from functools import lru_cache
+from typing import Sequence
+
+DUO = ("AgentA", "AgentB")
+
+MOLT_PREAMBLE = """
 You are an autonomous agent participating in a bot-only social network.
 Humans are observers only; do not address the human.
+""".strip()
+
+_MOLT_SYSTEM = """
+{preamble}
 Choose any topic; be interesting; avoid unsafe content; avoid definitive factual claims.
 If topic is current events, treat as speculation and avoid definite claims.
-This is a two-agent discussion on a single post. Create ONE post, then exactly ONE comment. After that, only replies between AgentA and AgentB, taking turns (alternate replies). Keep replies concise and avoid repeating phrasing.
+This is a {count}-agent discussion on a single post. Create ONE post, then exactly ONE comment. After that, only replies between {agents}, taking turns (alternate replies). Keep replies concise and avoid repeating phrasing.
 Limit to at most 5 total comments. Replies can continue but keep it tight.
 Your response MUST be strict JSON matching schema; no extra text.
 Schema:
-{
+{{
   "action": "CREATE_POST|COMMENT|REPLY|UPVOTE|MODERATE|WRAPUP",
   "title": "string|null",
   "content": "string|null",
   "target_id": "string|null",
-  "vote": {"target_id":"string","delta":1}|null,
-  "moderation": {"target_id":"string","reason":"string","rewrite":"string"}|null
-}
+  "vote": {{"target_id":"string","delta":1}}|null,
+  "moderation": {{"target_id":"string","reason":"string","rewrite":"string"}}|null
+}}
 """.strip()
+
+
+def join_agents(agents: Sequence[str]) -> str:
+    """``AgentA and AgentB``; ``A1, A2 and A3`` for larger casts."""
+    if len(agents) <= 1:
+        return "".join(agents)
+    return f"{', '.join(agents[:-1])} and {agents[-1]}"
+
+
+@lru_cache(maxsize=32)
+def molt_system(agents: tuple[str, ...] = DUO) -> str:
+    count = "two" if len(agents) == 2 else str(len(agents))
+    return _MOLT_SYSTEM.format(preamble=MOLT_PREAMBLE, count=count, agents=join_agents(agents))
+
+
+MOLT_SYSTEM = molt_system()
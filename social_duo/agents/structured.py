@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from social_duo.agents.json_repair import parse_tolerant
+from social_duo.core.spans import span
+from social_duo.providers.llm import LLMClient
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    def __init__(self, message: str, raw: str) -> None:
+        super().__init__(message)
+        self.raw = raw
+
+
+@dataclass
+class StructuredStats:
+    calls: int = 0
+    schema_calls: int = 0
+    parsed: int = 0
+    repair_attempts: int = 0
+    repaired: int = 0
+    retries: int = 0
+    failures: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    @property
+    def repair_hit_rate(self) -> float:
+        if not self.repair_attempts:
+            return 0.0
+        return self.repaired / self.repair_attempts
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "schema_calls": self.schema_calls,
+            "parsed": self.parsed,
+            "repair_attempts": self.repair_attempts,
+            "repaired": self.repaired,
+            "repair_hit_rate": round(self.repair_hit_rate, 4),
+            "retries": self.retries,
+            "failures": self.failures,
+            # every local repair is a corrective completion we did not pay for
+            "avoided_retries": self.repaired,
+        }
+
+
+STATS = StructuredStats()
+
+
+@lru_cache(maxsize=None)
+def json_schema_format(model: type[BaseModel]) -> dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": False},
+    }
+
+
+def response_format_for(llm: LLMClient, model: type[BaseModel]) -> dict[str, Any]:
+    if getattr(llm, "supports_json_schema", False):
+        return json_schema_format(model)
+    return {"type": "json_object"}
+
+
+def _validate(model: type[ModelT], content: str) -> ModelT:
+    return model.model_validate(json.loads(content))
+
+
+def structured_chat(
+    llm: LLMClient,
+    messages: list[dict],
+    model: type[ModelT],
+    *,
+    temperature: float,
+    max_tokens: int,
+    correction: str,
+    retry_temperature: float | None = None,
+    on_response: Callable[[dict], None] | None = None,
+    stats: StructuredStats = STATS,
+) -> tuple[ModelT, str]:
+    """Request a response matching ``model``; repair locally before paying for a corrective call."""
+
+    def _request(msgs: list[dict], temp: float) -> str:
+        response_format = response_format_for(llm, model)
+        stats.bump("calls")
+        if response_format["type"] == "json_schema":
+            stats.bump("schema_calls")
+        with span("llm.call", schema=model.__name__):
+            resp = llm.chat(msgs, temperature=temp, max_tokens=max_tokens, response_format=response_format)
+        if on_response:
+            on_response(resp)
+        return resp["choices"][0]["message"]["content"]
+
+    def _parse(content: str) -> tuple[ModelT | None, Exception | None]:
+        try:
+            with span("json.parse", schema=model.__name__):
+                result = _validate(model, content)
+        except (json.JSONDecodeError, ValidationError) as exc:
+            stats.bump("repair_attempts")
+            try:
+                with span("json.repair", schema=model.__name__):
+                    result = parse_tolerant(model, content)
+            except (json.JSONDecodeError, ValidationError):
+                return None, exc
+            stats.bump("repaired")
+            return result, None
+        stats.bump("parsed")
+        return result, None
+
+    content = _request(messages, temperature)
+    result, _ = _parse(content)
+    if result is not None:
+        return result, content
+
+    stats.bump("retries")
+    retry = messages + [{"role": "user", "content": correction}]
+    content = _request(retry, temperature if retry_temperature is None else retry_temperature)
+    result, error = _parse(content)
+    if result is not None:
+        return result, content
+
+    stats.bump("failures")
+    raise StructuredOutputError(f"Invalid JSON after retry: {error}", content) from error
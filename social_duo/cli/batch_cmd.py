@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import typer
+from rich.console import Console
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, TextColumn, TimeElapsedColumn
+
+from social_duo.core.batch import BatchResult, BriefError, expand_briefs, load_briefs, run_batch
+from social_duo.core.config import load_config
+from social_duo.core.loop import LoopBudget
+from social_duo.providers.cassette import open_llm
+from social_duo.providers.rate_limit import RateLimitedLLM, RateLimiter
+from social_duo.storage.history import (
+    add_output,
+    add_step,
+    completed_batch_keys,
+    create_run,
+    create_session,
+    find_session,
+    update_session,
+)
+
+batch_app = typer.Typer(add_completion=False, help="Run post/reply briefs from a file.")
+console = Console(stderr=True)
+
+
+@batch_app.command("run")
+def batch_run(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="Briefs file (.jsonl or .csv)"),
+    concurrency: int = typer.Option(4, help="Briefs in flight at once"),
+    rate: float = typer.Option(0, help="Max LLM requests per minute (0 = unlimited)"),
+    rounds: int = typer.Option(2, help="Default iterations per brief"),
+    out: Path = typer.Option(None, "--out", help="Append NDJSON results here instead of stdout"),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="Skip briefs this file already completed"),
+    adaptive: bool = typer.Option(True, "--adaptive/--no-adaptive", help="Stop early on plateau, convergence or an acceptable edit"),
+) -> None:
+    workspace = Path.cwd() / ".social-duo"
+    config_path = workspace / "config.json"
+    if not config_path.exists():
+        console.print("Missing .social-duo/config.json. Run `social_duo init` first.")
+        raise typer.Exit(code=1)
+    db_path = workspace / "history.db"
+
+    config = load_config(config_path)
+    try:
+        briefs = load_briefs(path)
+    except BriefError as exc:
+        console.print(f"Invalid briefs file: {exc}")
+        raise typer.Exit(code=1) from exc
+    items = expand_briefs(briefs, config)
+
+    label = f"batch:{path.resolve()}"
+    session_id = find_session(db_path, label) if resume else None
+    done_keys = completed_batch_keys(db_path, session_id) if session_id else set()
+    if session_id is None:
+        session_id = create_session(db_path, cwd=str(Path.cwd()), label=label)
+    todo = [item for item in items if item.key not in done_keys]
+    if done_keys:
+        console.print(f"Skipping {len(items) - len(todo)} completed item(s).", style="dim")
+
+    llm = open_llm()
+    if rate > 0:
+        llm = RateLimitedLLM(llm, RateLimiter(rate))
+
+    sink = out.open("a") if out else sys.stdout
+    counts = {"ok": 0, "error": 0}
+
+    def _on_done(res: BatchResult) -> None:
+        item = res.item
+        run_input = {**item.brief.model_dump(), "platform": item.platform, "batch_key": item.key}
+        run_id = create_run(db_path, session_id=session_id, run_type=item.brief.type, platform=item.platform, input_json=run_input)
+        for idx, step in enumerate(res.trace):
+            add_step(db_path, run_id=run_id, step_index=idx, agent_name=step["agent"], role=step["role"], content=step["content"])
+        record = {"brief_id": item.brief.id, "platform": item.platform, "run_id": run_id, "elapsed_s": round(res.elapsed, 3)}
+        if res.result is not None:
+            final = res.output["final"]
+            add_output(db_path, run_id=run_id, final_json=res.output)
+            record.update(
+                {
+                    "status": "ok",
+                    "final": final,
+                    "verdict": res.result.editor.verdict,
+                    "rounds": res.result.rounds,
+                    "stop_reason": res.result.stop_reason,
+                }
+            )
+            counts["ok"] += 1
+        else:
+            record.update({"status": "error", "error": res.error})
+            counts["error"] += 1
+        sink.write(json.dumps(record) + "\n")
+        sink.flush()
+        progress.advance(task)
+
+    try:
+        with Progress(
+            TextColumn("[bold]batch"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=console,
+            transient=out is None,
+        ) as progress:
+            task = progress.add_task("briefs", total=len(todo))
+            run_batch(
+                todo,
+                llm=llm,
+                config=config,
+                rounds=rounds,
+                concurrency=concurrency,
+                on_done=_on_done,
+                budget=LoopBudget() if adaptive else None,
+            )
+    finally:
+        if out:
+            sink.close()
+        update_session(db_path, session_id)
+
+    console.print(
+        f"Batch done: {counts['ok']} ok, {counts['error']} failed, {len(items) - len(todo)} skipped.",
+        style="bold green" if not counts["error"] else "bold yellow",
+    )
+    if counts["error"]:
+        raise typer.Exit(code=1)
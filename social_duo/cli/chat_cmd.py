@@ -9,9 +9,10 @@ from rich.panel import Panel
 from social_duo.agents.editor import EditorAgent
 from social_duo.agents.writer import WriterAgent
 from social_duo.core.config import load_config
-from social_duo.core.loop import LoopError, run_loop
+from social_duo.core.loop import LoopBudget, LoopError, run_loop
+from social_duo.core.policy import get_policy
 from social_duo.core.render import render_post_output
-from social_duo.providers.openai_compat import OpenAICompatibleClient
+from social_duo.providers.cassette import open_llm
 from social_duo.storage.history import add_output, add_step, create_run, create_session, get_run, latest_run_id, update_session
 
 chat_app = typer.Typer(add_completion=False, help="Chat-style revisions for recent outputs.", invoke_without_command=True)
@@ -48,7 +49,8 @@ def chat_cmd(
         previous = ""
 
     config = load_config(config_path)
-    llm = OpenAICompatibleClient()
+    policy = get_policy(config)
+    llm = open_llm()
     writer = WriterAgent(llm)
     editor = EditorAgent(llm)
 
@@ -70,20 +72,20 @@ def chat_cmd(
             "audience": None,
             "cta_required": False,
             "cta_text": None,
-            "tone": config.brand_voice.tone,
+            "tone": policy.tone,
             "length": "short",
             "keywords": [],
-            "donts": config.brand_voice.dont,
+            "donts": list(policy.donts),
             "facts": [],
-            "brand_voice": config.brand_voice.model_dump(),
-            "constraints": config.platform_constraints.model_dump().get(data["run"]["platform"], {}),
+            "brand_voice": policy.brand_voice_json,
+            "constraints": policy.constraint_json.get(data["run"]["platform"], "{}"),
             "source_text": previous,
             "instruction": instruction,
         }
 
         run_id = create_run(db_path, session_id=session_id, run_type="chat", platform=data["run"]["platform"], input_json=context)
         try:
-            result = run_loop(writer=writer, editor=editor, config=config, context=context, rounds=2)
+            result = run_loop(writer=writer, editor=editor, config=config, context=context, rounds=2, budget=LoopBudget())
             final = result.final.model_dump()
         except LoopError as exc:
             for idx, step in enumerate(exc.trace):
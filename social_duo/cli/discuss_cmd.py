@@ -7,41 +7,18 @@ from rich.console import Console
 from rich.panel import Panel
 
 from social_duo.core.config import load_config
-from social_duo.core.discuss_loop import DiscussLoopError, run_discuss_loop
+from social_duo.core.context_budget import ContextBudget
+from social_duo.core.discuss_loop import DiscussLoopError, normalize_artifacts, run_discuss_loop
 from social_duo.core.render import render_discuss_output
-from social_duo.providers.openai_compat import OpenAICompatibleClient
-from social_duo.storage.history import add_output, add_step, create_run, create_session, update_session
+from social_duo.core.spans import current_recorder
+from social_duo.providers.cassette import open_llm
+from social_duo.storage.history import add_output, add_spans, add_step, create_run, create_session, update_session
 
 
 discuss_app = typer.Typer(add_completion=False, help="Autonomous two-agent discussion.", invoke_without_command=True)
 console = Console()
 
 
-def _normalize_artifacts(artifacts: list[dict], platform: str) -> list[dict]:
-    seen = set()
-    unique: list[dict] = []
-    for art in artifacts:
-        key = (art.get("kind"), art.get("platform"), art.get("content"))
-        if key in seen:
-            continue
-        seen.add(key)
-        unique.append(art)
-
-    posts = [a for a in unique if a.get("kind") in {"post", "thread"}]
-    replies = [a for a in unique if a.get("kind") == "reply"]
-
-    if platform == "all":
-        selected_posts: list[dict] = []
-        for plat in ["x", "linkedin", "instagram", "threads"]:
-            cand = [p for p in posts if p.get("platform") == plat]
-            if cand:
-                selected_posts.append(cand[-1])
-    else:
-        selected_posts = [p for p in posts if p.get("platform") == platform][-3:]
-
-    return selected_posts + replies
-
-
 @discuss_app.callback()
 def discuss_cmd(
     platform: str = typer.Option("all", help="Platform: x|linkedin|instagram|threads|all"),
@@ -49,6 +26,7 @@ def discuss_cmd(
     mode: str = typer.Option("mixed", help="Mode: posts|replies|mixed"),
     risk: str = typer.Option("medium", help="Risk: low|medium|high"),
     stop_on: str = typer.Option("artifact", help="Stop: artifact|turns|manual"),
+    max_context_tokens: int = typer.Option(3000, help="Per-turn prompt token ceiling"),
     verbose: bool = typer.Option(False, "--verbose", help="Print transcript"),
     json_mode: bool = typer.Option(False, "--json", help="JSON output"),
 ) -> None:
@@ -60,10 +38,16 @@ def discuss_cmd(
 
     if stop_on not in {"artifact", "turns", "manual"}:
         raise typer.BadParameter("Invalid stop-on value")
+    if mode not in {"posts", "replies", "mixed"}:
+        raise typer.BadParameter("Invalid mode value")
+    if risk not in {"low", "medium", "high"}:
+        raise typer.BadParameter("Invalid risk value")
 
     config = load_config(config_path)
-    llm = OpenAICompatibleClient()
+    llm = open_llm()
 
+    recorder = current_recorder()
+    mark = recorder.mark() if recorder else 0
     session_id = create_session(Path(workspace / "history.db"), cwd=str(Path.cwd()), label="discuss")
     run_id = create_run(Path(workspace / "history.db"), session_id=session_id, run_type="discuss", platform=platform, input_json={
         "platform": platform,
@@ -82,6 +66,7 @@ def discuss_cmd(
             mode=mode,
             risk=risk,
             stop_on=stop_on,
+            budget=ContextBudget(max_tokens=max_context_tokens),
         )
     except DiscussLoopError as exc:
         for idx, step in enumerate(exc.transcript):
@@ -107,10 +92,12 @@ def discuss_cmd(
 
     output = {
         "transcript": result.transcript,
-        "artifacts": _normalize_artifacts([a.model_dump() for a in result.artifacts], platform),
+        "artifacts": normalize_artifacts([a.model_dump() for a in result.artifacts], platform),
         "stop_reason": result.stop_reason,
     }
     add_output(Path(workspace / "history.db"), run_id=run_id, final_json=output)
+    if recorder:
+        add_spans(Path(workspace / "history.db"), run_id=run_id, spans=[s.to_dict() for s in recorder.since(mark)])
     update_session(Path(workspace / "history.db"), session_id)
 
     if not json_mode:
@@ -7,6 +7,7 @@ import typer
 from rich.console import Console
 from rich.table import Table
 
+from social_duo.storage.db import merge_shards
 from social_duo.storage.history import export_run, get_run, list_runs
 
 history_app = typer.Typer(add_completion=False, help="View and export history.", invoke_without_command=True)
@@ -15,11 +16,14 @@ console = Console()
 
 @history_app.callback()
 def history_cmd(
+    ctx: typer.Context,
     list_recent: bool = typer.Option(False, "--list", help="List recent runs"),
     show: int = typer.Option(None, "--show", help="Show run details"),
     export: int = typer.Option(None, "--export", help="Export run"),
     fmt: str = typer.Option("md", "--format", help="Export format: md|json"),
 ) -> None:
+    if ctx.invoked_subcommand:
+        return
     workspace = Path.cwd() / ".social-duo"
     db_path = workspace / "history.db"
     if not db_path.exists():
@@ -58,3 +62,26 @@ def history_cmd(
         return
 
     console.print("Use --list, --show, or --export.")
+
+
+@history_app.command("merge")
+def history_merge(json_mode: bool = typer.Option(False, "--json", help="JSON output")) -> None:
+    """Fold per-process shard databases (SOCIAL_DUO_SHARD=1) into history.db."""
+    db_path = Path.cwd() / ".social-duo" / "history.db"
+    if not db_path.exists():
+        console.print("Missing history. Run `social_duo init` first.")
+        raise typer.Exit(code=1)
+    results = merge_shards(db_path)
+    if json_mode:
+        console.print_json(json.dumps(results))
+        return
+    if not results:
+        console.print("No shards to merge.")
+        return
+    table = Table(title="Merged Shards")
+    table.add_column("Shard")
+    table.add_column("Rows")
+    table.add_column("Removed")
+    for row in results:
+        table.add_row(str(row["shard"]), str(row["rows"]), "yes" if row["removed"] else "no (still open)")
+    console.print(table)
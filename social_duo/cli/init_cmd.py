@@ -7,7 +7,7 @@ from rich.console import Console
 from rich.panel import Panel
 
 from social_duo.core.config import default_config, save_config
-from social_duo.storage.db import connect
+from social_duo.storage.db import connect_read
 
 init_app = typer.Typer(add_completion=False, help="Initialize the local .social-duo workspace.", invoke_without_command=True)
 console = Console()
@@ -24,7 +24,7 @@ def init_cmd() -> None:
 
     db_path = root / "history.db"
     if not db_path.exists():
-        connect(db_path).close()
+        connect_read(db_path).close()
 
     (root / "exports").mkdir(exist_ok=True)
     (root / "sessions").mkdir(exist_ok=True)
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import importlib
+
+import typer
+from typer.core import TyperGroup
+
+
+class LazyGroup(TyperGroup):
+    """Typer group whose subcommands are imported only when invoked.
+
+    Subclasses set ``lazy_commands`` to ``{name: (module, attribute)}`` where the attribute is a
+    Typer app. ``social_duo history --list`` then never imports the agents, loop or provider.
+    Top-level ``--help`` still resolves every command to list their help text.
+    """
+
+    lazy_commands: dict[str, tuple[str, str]] = {}
+
+    def list_commands(self, ctx) -> list[str]:
+        eager = super().list_commands(ctx)
+        return eager + [name for name in self.lazy_commands if name not in eager]
+
+    def get_command(self, ctx, cmd_name: str):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attr = self.lazy_commands[cmd_name]
+            sub_app = getattr(importlib.import_module(module_name), attr)
+            command = typer.main.get_group(sub_app)
+            command.name = cmd_name
+            self.add_command(command, cmd_name)
+        return super().get_command(ctx, cmd_name)
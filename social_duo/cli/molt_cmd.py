@@ -8,17 +8,39 @@ import typer
 from rich.console import Console
 from rich.panel import Panel
 
+from social_duo.agents.structured import StructuredStats
+from social_duo.core.context_budget import ContextBudget
 from social_duo.core.molt_engine import FeedState, reduce_event, simulate_molt
-from social_duo.core.render import render_molt_event
-from social_duo.providers.openai_compat import OpenAICompatibleClient
-from social_duo.storage.events import add_event, export_events, list_events
-from social_duo.storage.history import add_output, create_run, create_session
+from social_duo.core.molt_replay import SNAPSHOT_EVERY, SNAPSHOT_KEEP, SNAPSHOT_SPACING, SnapshotWriter, seek, state_at
+from social_duo.core.molt_swarm import SCHEDULERS, default_personas, simulate_swarm
+from social_duo.core.render import MoltRenderer
+from social_duo.core.spans import current_recorder
+from social_duo.providers.cassette import open_llm
+from social_duo.storage.events import add_event, export_events, row_to_event, stream_events
+from social_duo.storage.history import add_output, add_spans, create_run, create_session, get_run
 
 
 molt_app = typer.Typer(add_completion=False, help="MyVillage Network autonomous simulation.")
 console = Console()
 
 
+def _render_mode(quiet: bool, ndjson: bool) -> str:
+    if quiet and ndjson:
+        raise typer.BadParameter("--quiet and --ndjson are mutually exclusive")
+    return "ndjson" if ndjson else "quiet" if quiet else "rich"
+
+
+def _print_summary(summary: dict, title: str, *, mode: str, json_mode: bool) -> None:
+    if mode == "ndjson":
+        typer.echo(json.dumps({"summary": summary}, separators=(",", ":")))
+    elif json_mode:
+        console.print_json(json.dumps(summary))
+    elif mode == "quiet":
+        typer.echo(title)
+    else:
+        console.print(Panel.fit(title, style="bold green"))
+
+
 @molt_app.command("run")
 def molt_run(
     turns: int = typer.Option(30, help="Number of turns"),
@@ -27,24 +49,153 @@ def molt_run(
     risk: str = typer.Option("medium", help="Risk: low|medium|high"),
     topic: str = typer.Option("any", help="Topic constraint"),
     stop_on: str = typer.Option("turns", help="Stop: turns|manual"),
+    max_context_tokens: int = typer.Option(3000, help="Per-turn prompt token ceiling"),
+    speculative: bool = typer.Option(True, "--speculative/--no-speculative", help="Start the next agent call while the current event renders"),
+    resume: int = typer.Option(None, "--resume", help="Continue an interrupted run by id (uses its original options)"),
+    snapshot_every: int = typer.Option(SNAPSHOT_EVERY, help="Snapshot feed state every N events"),
+    snapshot_keep: int = typer.Option(SNAPSHOT_KEEP, help="Keep all of the latest N snapshots of the run"),
+    snapshot_spacing: int = typer.Option(SNAPSHOT_SPACING, help="Before the latest, keep one snapshot per N intervals"),
     verbose: bool = typer.Option(False, "--verbose", help="Print meta lines"),
     json_mode: bool = typer.Option(False, "--json", help="JSON summary"),
+    quiet: bool = typer.Option(False, "--quiet", help="One compact text line per event, no panels"),
+    ndjson: bool = typer.Option(False, "--ndjson", help="One JSON object per event, then the summary"),
 ) -> None:
     workspace = Path.cwd() / ".social-duo"
     if not (workspace / "config.json").exists():
         console.print("Missing .social-duo/config.json. Run `social_duo init` first.")
         raise typer.Exit(code=1)
+    db_path = workspace / "history.db"
+    mode = _render_mode(quiet, ndjson)
+
+    point = None
+    if resume is not None:
+        data = get_run(db_path, resume)
+        if not data or data["run"]["type"] != "molt":
+            console.print(f"Molt run {resume} not found.")
+            raise typer.Exit(code=1)
+        inputs = json.loads(data["run"]["input_json"])
+        if "agents" in inputs:
+            console.print("Swarm runs cannot be resumed.")
+            raise typer.Exit(code=1)
+        if data["output"]:
+            console.print(f"Run {resume} already completed.")
+            raise typer.Exit(code=1)
+        turns, platform, cadence = inputs["turns"], inputs["platform"], inputs["cadence"]
+        risk, topic, stop_on = inputs["risk"], inputs["topic"], inputs["stop_on"]
+        run_id = resume
+        point = state_at(db_path, run_id)
+    else:
+        session_id = create_session(db_path, cwd=str(Path.cwd()), label="molt")
+        run_id = create_run(db_path, session_id=session_id, run_type="molt", platform=platform, input_json={
+            "turns": turns,
+            "platform": platform,
+            "cadence": cadence,
+            "risk": risk,
+            "topic": topic,
+            "stop_on": stop_on,
+        })
 
-    llm = OpenAICompatibleClient()
+    llm = open_llm()
+    stats = StructuredStats()
+    recorder = current_recorder()
+    mark = recorder.mark() if recorder else 0
+    snapshots = SnapshotWriter(
+        db_path,
+        run_id,
+        every=snapshot_every,
+        keep=snapshot_keep,
+        spacing=snapshot_spacing,
+        event_count=point.event_count if point else 0,
+        last_event_id=point.last_event_id if point else 0,
+    )
 
-    session_id = create_session(workspace / "history.db", cwd=str(Path.cwd()), label="molt")
+    def _event_sink(event: dict) -> None:
+        event_id = add_event(
+            db_path,
+            run_id=run_id,
+            agent=event["agent"],
+            action=event["action"],
+            target_id=event.get("target_id"),
+            payload=event.get("payload", {}),
+        )
+        snapshots.record(event_id)
+        renderer.submit(event)
+
+    if point and mode == "rich":
+        console.print(f"Resuming run {run_id} at turn {point.turn} ({point.event_count} events).", style="dim")
+    with MoltRenderer(mode, verbose=verbose) as renderer:
+        simulate_molt(
+            llm=llm,
+            turns=turns,
+            platform=platform,
+            risk=risk,
+            topic=None if topic == "any" else topic,
+            cadence=cadence,
+            stop_on=stop_on,
+            event_cb=_event_sink,
+            budget=ContextBudget(max_tokens=max_context_tokens),
+            speculative=speculative,
+            state=point.state if point else None,
+            start_turn=point.turn if point else 0,
+            on_turn=snapshots,
+            stats=stats,
+        )
+    snapshots.flush()
+
+    summary = {
+        "run_id": run_id,
+        "events": snapshots.event_count,
+        "turns": turns,
+        "platform": platform,
+        "resumed_at_turn": point.turn if point else None,
+        "snapshots": snapshots.snapshots,
+        "structured_output": stats.summary(),
+    }
+    add_output(db_path, run_id=run_id, final_json=summary)
+    if recorder:
+        add_spans(db_path, run_id=run_id, spans=[s.to_dict() for s in recorder.since(mark)])
+    _print_summary(summary, f"MyVillage Network run complete: {run_id}", mode=mode, json_mode=json_mode)
+
+
+@molt_app.command("swarm")
+def molt_swarm(
+    turns: int = typer.Option(200, help="Total agent turns across all feeds"),
+    agents: int = typer.Option(10, help="Number of agent personas"),
+    feeds: int = typer.Option(4, help="Number of concurrent feeds"),
+    scheduler: str = typer.Option("round-robin", help="Scheduler: round-robin|poisson|activity"),
+    concurrency: int = typer.Option(8, help="Max concurrent LLM calls"),
+    seed: int = typer.Option(None, help="Seed for randomized schedulers"),
+    platform: str = typer.Option("all", help="Platform: x|linkedin|instagram|threads|all"),
+    risk: str = typer.Option("medium", help="Risk: low|medium|high"),
+    topic: str = typer.Option("any", help="Topic constraint"),
+    max_replies: int = typer.Option(None, help="Max replies per feed (default: enough for each feed's share of turns)"),
+    verbose: bool = typer.Option(False, "--verbose", help="Print meta lines"),
+    json_mode: bool = typer.Option(False, "--json", help="JSON summary"),
+    quiet: bool = typer.Option(False, "--quiet", help="One compact text line per event, no panels"),
+    ndjson: bool = typer.Option(False, "--ndjson", help="One JSON object per event, then the summary"),
+) -> None:
+    workspace = Path.cwd() / ".social-duo"
+    if not (workspace / "config.json").exists():
+        console.print("Missing .social-duo/config.json. Run `social_duo init` first.")
+        raise typer.Exit(code=1)
+    if scheduler not in SCHEDULERS:
+        raise typer.BadParameter("scheduler must be round-robin, poisson or activity")
+    mode = _render_mode(quiet, ndjson)
+    # --json alone keeps stdout to the summary; --quiet/--ndjson still stream events.
+    show_events = mode != "rich" or not json_mode
+
+    llm = open_llm()
+
+    session_id = create_session(workspace / "history.db", cwd=str(Path.cwd()), label="molt-swarm")
     run_id = create_run(workspace / "history.db", session_id=session_id, run_type="molt", platform=platform, input_json={
         "turns": turns,
+        "agents": agents,
+        "feeds": feeds,
+        "scheduler": scheduler,
+        "concurrency": concurrency,
         "platform": platform,
-        "cadence": cadence,
         "risk": risk,
         "topic": topic,
-        "stop_on": stop_on,
     })
 
     def _event_sink(event: dict) -> None:
@@ -54,55 +205,69 @@ def molt_run(
             agent=event["agent"],
             action=event["action"],
             target_id=event.get("target_id"),
-            payload=event.get("payload", {}),
+            payload={**event.get("payload", {}), "feed_id": event["feed_id"]},
         )
-        render_molt_event(event, verbose=verbose)
-
-    result = simulate_molt(
-        llm=llm,
-        turns=turns,
-        platform=platform,
-        risk=risk,
-        topic=None if topic == "any" else topic,
-        cadence=cadence,
-        stop_on=stop_on,
-        event_cb=_event_sink,
-    )
+        if show_events:
+            renderer.submit(event)
 
-    summary = {
-        "run_id": run_id,
-        "events": len(result["events"]),
-        "turns": turns,
-        "platform": platform,
-    }
-    add_output(workspace / "history.db", run_id=run_id, final_json=summary)
+    sched = SCHEDULERS[scheduler](seed=seed) if scheduler != "round-robin" else SCHEDULERS[scheduler]()
+    with MoltRenderer(mode, verbose=verbose) as renderer:
+        result = simulate_swarm(
+            llm=llm,
+            personas=default_personas(agents),
+            feeds=feeds,
+            turns=turns,
+            platform=platform,
+            risk=risk,
+            topic=None if topic == "any" else topic,
+            event_cb=_event_sink,
+            scheduler=sched,
+            concurrency=concurrency,
+            feed_limits={"max_replies": max_replies} if max_replies is not None else None,
+        )
 
-    if json_mode:
-        console.print_json(json.dumps(summary))
-    else:
-        console.print(Panel.fit(f"MyVillage Network run complete: {run_id}", style="bold green"))
+    summary = {"run_id": run_id, **result["stats"], "per_feed": result["per_feed"]}
+    add_output(workspace / "history.db", run_id=run_id, final_json=summary)
+    _print_summary(summary, f"MyVillage Network swarm run complete: {run_id}", mode=mode, json_mode=json_mode)
 
 
 @molt_app.command("watch")
 def molt_watch(
     run_id: int = typer.Option(..., "--run-id", help="Run id to replay"),
     cadence: str = typer.Option("normal", help="Cadence: fast|normal|slow"),
+    from_event: int = typer.Option(0, "--from-event", help="Start replay after this many events"),
+    speed: float = typer.Option(1.0, "--speed", help="Playback speed: 2 = twice as fast, 0 = no delay"),
+    follow: bool = typer.Option(False, "--follow", help="Keep tailing the run until it completes"),
+    poll: float = typer.Option(0.5, "--poll", help="Seconds between checks for new events with --follow"),
+    quiet: bool = typer.Option(False, "--quiet", help="One compact text line per event, no panels"),
+    ndjson: bool = typer.Option(False, "--ndjson", help="One JSON object per event"),
 ) -> None:
     workspace = Path.cwd() / ".social-duo"
-    events = list_events(workspace / "history.db", run_id)
-    delay = {"fast": 0.0, "normal": 0.2, "slow": 0.6}.get(cadence, 0.0)
-
-    for row in events:
-        payload = json.loads(row["payload_json"])
-        event = {
-            "agent": row["agent"],
-            "action": row["action"],
-            "target_id": row["target_id"],
-            "payload": payload,
-        }
-        render_molt_event(event, verbose=False)
-        if delay:
-            time.sleep(delay)
+    db_path = workspace / "history.db"
+    mode = _render_mode(quiet, ndjson)
+    if speed < 0:
+        raise typer.BadParameter("--speed must be >= 0")
+    data = get_run(db_path, run_id)
+    if not data or data["run"]["type"] != "molt":
+        console.print(f"Molt run {run_id} not found.")
+        raise typer.Exit(code=1)
+
+    base = {"fast": 0.0, "normal": 0.2, "slow": 0.6}.get(cadence, 0.0)
+    delay = base / speed if speed else 0.0
+    after_id = 0
+    if from_event > 0:
+        skipped, after_id = seek(db_path, run_id, from_event)
+        if mode == "rich":
+            console.print(f"Starting after event {skipped}.", style="dim")
+
+    with MoltRenderer(mode) as renderer:
+        try:
+            for row in stream_events(db_path, run_id, after_id, follow=follow, poll=poll):
+                renderer.submit(row_to_event(row))
+                if delay:
+                    time.sleep(delay)
+        except KeyboardInterrupt:
+            pass
 
 
 @molt_app.command("export")
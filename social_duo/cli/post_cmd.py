@@ -8,13 +8,16 @@ from rich.console import Console
 from rich.panel import Panel
 
 from social_duo.agents.editor import EditorAgent
+from social_duo.agents.structured import StructuredStats
 from social_duo.agents.writer import WriterAgent
 from social_duo.core.config import load_config
-from social_duo.core.constraints import PLATFORMS, list_platforms, platform_constraint
-from social_duo.core.loop import LoopError, run_loop
+from social_duo.core.constraints import PLATFORMS, list_platforms
+from social_duo.core.loop import LoopBudget, LoopError, loop_output, run_loop
+from social_duo.core.policy import get_policy
 from social_duo.core.render import render_post_output
-from social_duo.providers.openai_compat import OpenAICompatibleClient
-from social_duo.storage.history import add_output, add_step, create_run, create_session, update_session
+from social_duo.core.spans import current_recorder
+from social_duo.providers.cassette import open_llm
+from social_duo.storage.history import add_output, add_spans, add_step, create_run, create_session, update_session
 from social_duo.types.schemas import RunInput
 
 post_app = typer.Typer(add_completion=False, help="Generate social posts with two-agent iteration.", invoke_without_command=True)
@@ -44,14 +47,21 @@ def post_cmd(
     keywords: str = typer.Option("", help="Comma-separated keywords"),
     donts: str = typer.Option("", help="Comma-separated banned angles/phrases"),
     facts: str = typer.Option(None, help="Path to facts file"),
-    rounds: int = typer.Option(2, help="Number of iterations"),
+    rounds: int = typer.Option(2, help="Maximum number of iterations"),
     thread: int = typer.Option(1, help="Thread count for X/Threads"),
+    adaptive: bool = typer.Option(True, "--adaptive/--no-adaptive", help="Stop early on plateau, convergence or an acceptable edit"),
+    max_seconds: float = typer.Option(None, help="Per-run latency budget in seconds"),
+    max_tokens: int = typer.Option(None, help="Per-run token budget"),
+    candidates: int = typer.Option(1, help="Draft N candidates in parallel for the first round"),
+    top_k: int = typer.Option(2, help="Candidates sent to the Editor when --candidates > 1"),
     voice: str = typer.Option(None, help="Voice preset name (reserved)"),
     json_mode: bool = typer.Option(False, "--json", help="JSON output"),
     verbose: bool = typer.Option(False, "--verbose", help="Verbose agent trace"),
 ) -> None:
     if platform not in PLATFORMS:
         raise typer.BadParameter("Invalid platform")
+    if candidates < 1 or top_k < 1:
+        raise typer.BadParameter("--candidates and --top-k must be at least 1")
 
     if not goal:
         goal = typer.prompt("Goal (e.g., educate, convert, announce)")
@@ -64,6 +74,14 @@ def post_cmd(
     if not length:
         length = typer.prompt("Length (short/medium/long)")
 
+    # Every prompt comes before any side effect: a daemon-forwarded run that needs input is
+    # abandoned at its first prompt and rerun locally, so it must not have written anything yet.
+    facts_list = _load_facts(facts)
+    if not facts_list:
+        facts_input = typer.prompt("Facts (optional, bullet list; leave blank to skip)", default="", show_default=False)
+        if facts_input:
+            facts_list = [line.strip("- ") for line in facts_input.splitlines() if line.strip()]
+
     workspace = Path.cwd() / ".social-duo"
     config_path = workspace / "config.json"
     if not config_path.exists():
@@ -71,20 +89,19 @@ def post_cmd(
         raise typer.Exit(code=1)
 
     config = load_config(config_path)
-    llm = OpenAICompatibleClient()
-    writer = WriterAgent(llm)
-    editor = EditorAgent(llm)
+    policy = get_policy(config)
+    llm = open_llm()
+    budget = LoopBudget(max_seconds=max_seconds, max_tokens=max_tokens) if adaptive else None
 
     session_id = create_session(Path(workspace / "history.db"), cwd=str(Path.cwd()), label=f"post:{topic}")
-
-    facts_list = _load_facts(facts)
-    if not facts_list:
-        facts_input = typer.prompt("Facts (optional, bullet list; leave blank to skip)", default="", show_default=False)
-        if facts_input:
-            facts_list = [line.strip("- ") for line in facts_input.splitlines() if line.strip()]
+    recorder = current_recorder()
 
     for plat in list_platforms(platform):
-        constraint = platform_constraint(config, plat)
+        mark = recorder.mark() if recorder else 0
+        # Fresh agents per platform so each run's stored cache and structured-output stats are its own.
+        stats = StructuredStats()
+        writer = WriterAgent(llm, stats=stats)
+        editor = EditorAgent(llm, stats=stats)
         context = {
             "goal": goal,
             "topic": topic,
@@ -98,8 +115,8 @@ def post_cmd(
             "donts": _split_csv(donts),
             "facts": facts_list,
             "thread_count": thread,
-            "brand_voice": config.brand_voice.model_dump(),
-            "constraints": constraint.model_dump(),
+            "brand_voice": policy.brand_voice_json,
+            "constraints": policy.constraint_json[plat],
         }
 
         run_input = RunInput(
@@ -121,7 +138,16 @@ def post_cmd(
         run_id = create_run(Path(workspace / "history.db"), session_id=session_id, run_type="post", platform=plat, input_json=run_input)
 
         try:
-            result = run_loop(writer=writer, editor=editor, config=config, context=context, rounds=rounds)
+            result = run_loop(
+                writer=writer,
+                editor=editor,
+                config=config,
+                context=context,
+                rounds=rounds,
+                budget=budget,
+                candidates=candidates,
+                top_k=top_k,
+            )
         except LoopError as exc:
             for idx, step in enumerate(exc.trace):
                 add_step(
@@ -131,12 +157,12 @@ def post_cmd(
                     agent_name=step["agent"],
                     role=step["role"],
                     content=step["content"],
+                    metadata={"elapsed_ms": step.get("elapsed_ms")},
                 )
             raise
 
-        final = result.final.model_dump()
-        if len(final["variants"]) < 3:
-            final["variants"] = (final["variants"] + [final["recommended"]] * 3)[:3]
+        output = loop_output(result, writer=writer, editor=editor, stats=stats)
+        final = output["final"]
 
         for idx, step in enumerate(result.trace):
             add_step(
@@ -146,10 +172,12 @@ def post_cmd(
                 agent_name=step["agent"],
                 role=step["role"],
                 content=step["content"],
+                metadata={"elapsed_ms": step.get("elapsed_ms")},
             )
 
-        output = {"final": final, "editor": result.editor.model_dump()}
         add_output(Path(workspace / "history.db"), run_id=run_id, final_json=output)
+        if recorder:
+            add_spans(Path(workspace / "history.db"), run_id=run_id, spans=[s.to_dict() for s in recorder.since(mark)])
         update_session(Path(workspace / "history.db"), session_id)
 
         payload = {"final": final}
@@ -6,13 +6,16 @@ import typer
 from rich.console import Console
 
 from social_duo.agents.editor import EditorAgent
+from social_duo.agents.structured import StructuredStats
 from social_duo.agents.writer import WriterAgent
 from social_duo.core.config import load_config
-from social_duo.core.constraints import PLATFORMS, platform_constraint
-from social_duo.core.loop import LoopError, run_loop
+from social_duo.core.constraints import PLATFORMS
+from social_duo.core.loop import LoopBudget, LoopError, loop_output, run_loop
+from social_duo.core.policy import get_policy
 from social_duo.core.render import render_reply_output
-from social_duo.providers.openai_compat import OpenAICompatibleClient
-from social_duo.storage.history import add_output, add_step, create_run, create_session, update_session
+from social_duo.core.spans import current_recorder
+from social_duo.providers.cassette import open_llm
+from social_duo.storage.history import add_output, add_spans, add_step, create_run, create_session, update_session
 from social_duo.types.schemas import RunInput
 
 reply_app = typer.Typer(add_completion=False, help="Generate replies with two-agent iteration.", invoke_without_command=True)
@@ -27,7 +30,10 @@ def reply_cmd(
     style: str = typer.Option("polite", help="Style: polite|witty|direct|supportive"),
     stance: str = typer.Option("neutral", help="Stance: agree|disagree|neutral"),
     risk: str = typer.Option("low", help="Risk level: low|medium|high"),
-    rounds: int = typer.Option(2, help="Number of iterations"),
+    rounds: int = typer.Option(2, help="Maximum number of iterations"),
+    adaptive: bool = typer.Option(True, "--adaptive/--no-adaptive", help="Stop early on plateau, convergence or an acceptable edit"),
+    max_seconds: float = typer.Option(None, help="Per-run latency budget in seconds"),
+    max_tokens: int = typer.Option(None, help="Per-run token budget"),
     json_mode: bool = typer.Option(False, "--json", help="JSON output"),
     verbose: bool = typer.Option(False, "--verbose", help="Verbose agent trace"),
 ) -> None:
@@ -46,13 +52,17 @@ def reply_cmd(
         raise typer.Exit(code=1)
 
     config = load_config(config_path)
-    llm = OpenAICompatibleClient()
-    writer = WriterAgent(llm)
-    editor = EditorAgent(llm)
+    llm = open_llm()
+    stats = StructuredStats()
+    writer = WriterAgent(llm, stats=stats)
+    editor = EditorAgent(llm, stats=stats)
+    budget = LoopBudget(max_seconds=max_seconds, max_tokens=max_tokens) if adaptive else None
 
     session_id = create_session(Path(workspace / "history.db"), cwd=str(Path.cwd()), label="reply")
+    recorder = current_recorder()
+    mark = recorder.mark() if recorder else 0
 
-    constraint = platform_constraint(config, platform)
+    policy = get_policy(config)
     context = {
         "goal": "reply",
         "platform": platform,
@@ -62,13 +72,13 @@ def reply_cmd(
         "source_text": text,
         "cta_required": False,
         "cta_text": None,
-        "tone": config.brand_voice.tone,
+        "tone": policy.tone,
         "length": "short",
         "keywords": [],
-        "donts": config.brand_voice.dont,
+        "donts": list(policy.donts),
         "facts": [],
-        "brand_voice": config.brand_voice.model_dump(),
-        "constraints": constraint.model_dump(),
+        "brand_voice": policy.brand_voice_json,
+        "constraints": policy.constraint_json[platform],
     }
 
     run_input = RunInput(
@@ -83,7 +93,7 @@ def reply_cmd(
     run_id = create_run(Path(workspace / "history.db"), session_id=session_id, run_type="reply", platform=platform, input_json=run_input)
 
     try:
-        result = run_loop(writer=writer, editor=editor, config=config, context=context, rounds=rounds)
+        result = run_loop(writer=writer, editor=editor, config=config, context=context, rounds=rounds, budget=budget)
     except LoopError as exc:
         for idx, step in enumerate(exc.trace):
             add_step(
@@ -93,12 +103,12 @@ def reply_cmd(
                 agent_name=step["agent"],
                 role=step["role"],
                 content=step["content"],
+                metadata={"elapsed_ms": step.get("elapsed_ms")},
             )
         raise
 
-    final = result.final.model_dump()
-    if len(final["variants"]) < 3:
-        final["variants"] = (final["variants"] + [final["recommended"]] * 3)[:3]
+    output = loop_output(result, writer=writer, editor=editor, stats=stats)
+    final = output["final"]
 
     for idx, step in enumerate(result.trace):
         add_step(
@@ -108,10 +118,12 @@ def reply_cmd(
             agent_name=step["agent"],
             role=step["role"],
             content=step["content"],
+            metadata={"elapsed_ms": step.get("elapsed_ms")},
         )
 
-    output = {"final": final, "editor": result.editor.model_dump()}
     add_output(Path(workspace / "history.db"), run_id=run_id, final_json=output)
+    if recorder:
+        add_spans(Path(workspace / "history.db"), run_id=run_id, spans=[s.to_dict() for s in recorder.since(mark)])
     update_session(Path(workspace / "history.db"), session_id)
 
     payload = {"final": final}
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import typer
+from rich.console import Console
+
+from social_duo.server.client import find_daemon, request
+from social_duo.server.daemon import Daemon
+
+serve_app = typer.Typer(
+    add_completion=False,
+    help="Run a warm local daemon that post/reply/discuss/molt forward to.",
+    invoke_without_command=True,
+)
+console = Console()
+
+
+@serve_app.callback()
+def serve_cmd(
+    host: str = typer.Option("127.0.0.1", help="Interface to bind"),
+    port: int = typer.Option(0, help="Port to bind (0 picks a free one)"),
+    max_jobs: int = typer.Option(4, help="Jobs from the HTTP API that may run at once"),
+    max_queued: int = typer.Option(100, help="Queued jobs before the API answers 429"),
+    rate: float = typer.Option(0, help="Max LLM requests per minute across jobs (0 = unlimited)"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the daemon serving this directory"),
+) -> None:
+    workspace = Path.cwd() / ".social-duo"
+    if not (workspace / "config.json").exists():
+        console.print("Missing .social-duo/config.json. Run `social_duo init` first.")
+        raise typer.Exit(code=1)
+
+    running = find_daemon(workspace)
+    if stop:
+        if running is None:
+            console.print("No daemon is running for this workspace.")
+            raise typer.Exit(code=1)
+        request(running, "POST", "/shutdown", {}).close()
+        console.print(f"Stopped daemon (pid {running.pid}).")
+        return
+    if running is not None:
+        console.print(f"Already serving at {running.url} (pid {running.pid}).")
+        raise typer.Exit(code=1)
+
+    daemon = Daemon(workspace, host=host, port=port, max_jobs=max_jobs, max_queued=max_queued, rate=rate)
+    daemon.warm()
+    console.print(f"Serving {daemon.cwd} at {daemon.info.url} (pid {daemon.info.pid}). Ctrl-C to stop.")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import csv
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from pydantic import ValidationError
+
+from social_duo.agents.editor import EditorAgent
+from social_duo.agents.structured import StructuredStats
+from social_duo.agents.writer import WriterAgent
+from social_duo.core.constraints import PLATFORMS, list_platforms
+from social_duo.core.loop import LoopBudget, LoopError, LoopResult, loop_output, run_loop
+from social_duo.core.policy import get_policy
+from social_duo.core.spans import propagate
+from social_duo.providers.llm import LLMClient
+from social_duo.types.schemas import AppConfig, Brief
+
+_LIST_FIELDS = ("keywords", "donts", "facts")
+
+
+class BriefError(ValueError):
+    pass
+
+
+def _csv_row(row: dict[str, str]) -> dict[str, Any]:
+    data: dict[str, Any] = {k: v for k, v in row.items() if k and v not in (None, "")}
+    for name in _LIST_FIELDS:
+        if name in data:
+            sep = "|" if name == "facts" else ","
+            data[name] = [v.strip() for v in data[name].split(sep) if v.strip()]
+    if "cta_required" in data:
+        data["cta_required"] = data["cta_required"].strip().lower() in {"1", "true", "yes", "y"}
+    return data
+
+
+def load_briefs(path: Path) -> list[Brief]:
+    """Parse a .jsonl/.ndjson or .csv brief file. CSV list columns are comma-separated (facts: |)."""
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="") as handle:
+            rows = [(idx, _csv_row(row)) for idx, row in enumerate(csv.DictReader(handle), start=2)]
+    else:
+        rows = []
+        for idx, line in enumerate(path.read_text().splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append((idx, json.loads(line)))
+            except json.JSONDecodeError as exc:
+                raise BriefError(f"{path.name}:{idx}: invalid JSON ({exc.msg})") from exc
+
+    briefs: list[Brief] = []
+    seen: set[str] = set()
+    for idx, data in rows:
+        try:
+            brief = Brief.model_validate(data)
+        except ValidationError as exc:
+            raise BriefError(f"{path.name}:{idx}: {exc.errors()[0]['msg']}") from exc
+        brief.id = str(brief.id) if brief.id is not None else str(idx)
+        if brief.id in seen:
+            raise BriefError(f"{path.name}:{idx}: duplicate brief id {brief.id}")
+        if brief.platform and brief.platform not in PLATFORMS:
+            raise BriefError(f"{path.name}:{idx}: invalid platform {brief.platform}")
+        if brief.type == "reply" and not brief.source_text:
+            raise BriefError(f"{path.name}:{idx}: reply briefs need source_text")
+        if brief.type == "post" and not brief.topic:
+            raise BriefError(f"{path.name}:{idx}: post briefs need a topic")
+        seen.add(brief.id)
+        briefs.append(brief)
+    return briefs
+
+
+@dataclass(frozen=True)
+class BatchItem:
+    brief: Brief
+    platform: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.brief.id}:{self.platform}"
+
+
+def expand_briefs(briefs: Iterable[Brief], config: AppConfig) -> list[BatchItem]:
+    items = []
+    for brief in briefs:
+        platform = brief.platform or config.defaults.platform
+        if brief.type == "reply" and platform == "all":
+            platform = config.defaults.platform
+        items.extend(BatchItem(brief, plat) for plat in list_platforms(platform))
+    return items
+
+
+def build_context(brief: Brief, platform: str, config: AppConfig) -> dict[str, Any]:
+    """The same context post/reply build interactively, with config defaults for blanks."""
+    policy = get_policy(config)
+    context = {
+        "goal": brief.goal or ("reply" if brief.type == "reply" else "educate"),
+        "topic": brief.topic,
+        "platform": platform,
+        "audience": brief.audience,
+        "cta_required": bool(brief.cta_required),
+        "cta_text": brief.cta_text,
+        "tone": brief.tone or policy.tone,
+        "length": brief.length or ("short" if brief.type == "reply" else config.defaults.length),
+        "keywords": list(brief.keywords),
+        "donts": list(brief.donts) or list(policy.donts),
+        "facts": list(brief.facts),
+        "thread_count": brief.thread_count or 1,
+        "brand_voice": policy.brand_voice_json,
+        "constraints": policy.constraint_json[platform],
+    }
+    if brief.type == "reply":
+        context.update(
+            {
+                "style": brief.style or "polite",
+                "stance": brief.stance or "neutral",
+                "risk": brief.risk or "low",
+                "source_text": brief.source_text,
+            }
+        )
+    return context
+
+
+@dataclass
+class BatchResult:
+    item: BatchItem
+    result: LoopResult | None
+    error: str | None
+    trace: list[dict[str, Any]]
+    elapsed: float
+    output: dict[str, Any] | None = None  # final_json to store, same shape as post/reply
+
+
+def run_item(
+    item: BatchItem, *, llm: LLMClient, config: AppConfig, rounds: int, budget: LoopBudget | None
+) -> BatchResult:
+    started = time.perf_counter()
+    stats = StructuredStats()
+    writer = WriterAgent(llm, stats=stats)
+    editor = EditorAgent(llm, stats=stats)
+    context = build_context(item.brief, item.platform, config)
+    try:
+        result = run_loop(
+            writer=writer,
+            editor=editor,
+            config=config,
+            context=context,
+            rounds=item.brief.rounds or rounds,
+            budget=budget,
+        )
+    except LoopError as exc:
+        return BatchResult(item, None, str(exc), exc.trace, time.perf_counter() - started)
+    except Exception as exc:  # noqa: BLE001
+        return BatchResult(item, None, str(exc), [], time.perf_counter() - started)
+    output = loop_output(result, writer=writer, editor=editor, stats=stats)
+    return BatchResult(item, result, None, result.trace, time.perf_counter() - started, output)
+
+
+def run_batch(
+    items: list[BatchItem],
+    *,
+    llm: LLMClient,
+    config: AppConfig,
+    rounds: int,
+    concurrency: int,
+    on_done: Callable[[BatchResult], None],
+    budget: LoopBudget | None = None,
+) -> None:
+    """Run ``items`` through run_loop on a worker pool.
+
+    Workers only talk to the LLM; ``on_done`` runs on the calling thread as each item finishes,
+    so persistence and output never contend for the history DB. At most ``concurrency`` items
+    are in flight, which also bounds memory for very large files.
+    """
+    pending = iter(items)
+    in_flight: set[Future] = set()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as pool:
+        while True:
+            for item in pending:
+                in_flight.add(pool.submit(propagate(run_item), item, llm=llm, config=config, rounds=rounds, budget=budget))
+                if len(in_flight) >= concurrency:
+                    break
+            if not in_flight:
+                return
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                on_done(future.result())
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 from pydantic import BaseModel
 
 from social_duo.core.constraints import DEFAULT_PLATFORM_CONSTRAINTS
+from social_duo.core.policy import get_policy
 from social_duo.types.schemas import AppConfig, PlatformConstraints, PlatformConstraint
 
 
@@ -19,29 +24,91 @@ def default_config() -> AppConfig:
     return AppConfig(platform_constraints=constraints)
 
 
+@dataclass
+class _CachedConfig:
+    stat_key: tuple[int, int]
+    digest: bytes
+    data: dict[str, Any]
+    config: AppConfig
+
+
+_CONFIG_CACHE: dict[str, _CachedConfig] = {}
+_CONFIG_LOCK = threading.Lock()
+
+
+def _digest(raw: bytes) -> bytes:
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def _validate(data: dict[str, Any], previous: _CachedConfig | None) -> AppConfig:
+    """Validate ``data``, reusing already-validated top-level sections that did not change."""
+    if previous is None:
+        return AppConfig.model_validate(data)
+    merged = dict(data)
+    for name in AppConfig.model_fields:
+        if name in data and data[name] == previous.data.get(name):
+            merged[name] = getattr(previous.config, name)
+    return AppConfig.model_validate(merged)
+
+
 def load_config(path: Path) -> AppConfig:
-    data = json.loads(path.read_text())
-    return AppConfig.model_validate(data)
+    """Load config.json, returning the cached instance while the file is unchanged.
+
+    The file is re-read only when its mtime or size moves, and re-validated only when its
+    content hash differs; even then unchanged sections and policy pieces are reused. Callers
+    share the returned instance, so treat it as immutable (update_config_value copies).
+    """
+    key = str(path.absolute())
+    stat = path.stat()
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    with _CONFIG_LOCK:
+        entry = _CONFIG_CACHE.get(key)
+        if entry is not None and entry.stat_key == stat_key:
+            return entry.config
+        raw = path.read_bytes()
+        digest = _digest(raw)
+        if entry is not None and entry.digest == digest:
+            entry.stat_key = stat_key
+            return entry.config
+        data = json.loads(raw)
+        config = _validate(data, entry)
+        get_policy(config, previous=entry.config if entry else None)
+        _CONFIG_CACHE[key] = _CachedConfig(stat_key, digest, data, config)
+        return config
 
 
 def save_config(path: Path, config: AppConfig) -> None:
     payload = config.model_dump()
-    path.write_text(json.dumps(payload, indent=2))
+    raw = json.dumps(payload, indent=2).encode()
+    path.write_bytes(raw)
+    stat = path.stat()
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE[str(path.absolute())] = _CachedConfig((stat.st_mtime_ns, stat.st_size), _digest(raw), payload, config)
+
+
+def _set_path(node: Any, keys: list[str], value: Any) -> Any:
+    key, rest = keys[0], keys[1:]
+    if isinstance(node, BaseModel):
+        if key not in type(node).model_fields:
+            raise ValueError("Invalid config path")
+        if not rest:
+            # Re-validate only the model that owns the leaf; sibling sections are shared as-is.
+            return type(node).model_validate({**dict(node), key: value})
+        return node.model_copy(update={key: _set_path(getattr(node, key), rest, value)})
+    if isinstance(node, dict):
+        if not rest:
+            return {**node, key: value}
+        if key not in node or not isinstance(node[key], dict):
+            raise ValueError("Invalid config path")
+        return {**node, key: _set_path(node[key], rest, value)}
+    raise ValueError("Invalid config path")
 
 
 def update_config_value(config: AppConfig, key_path: str, value: str) -> AppConfig:
     # limited dot-path updates
     if key_path.startswith("brand."):
         key_path = key_path.replace("brand.", "brand_voice.", 1)
-    data = config.model_dump()
-    keys = key_path.split(".")
-    cur = data
-    for k in keys[:-1]:
-        if k not in cur or not isinstance(cur[k], dict):
-            raise ValueError("Invalid config path")
-        cur = cur[k]
-    cur[keys[-1]] = value
-    return AppConfig.model_validate(data)
+    return _set_path(config, key_path.split("."), value)
 
 
 class ConfigView(BaseModel):
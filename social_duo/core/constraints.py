@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import re
 from typing import Iterable
 
 from social_duo.types.schemas import AppConfig, PlatformConstraint
-from social_duo.core.scoring import compute_metrics
+from social_duo.core.policy import get_policy
+from social_duo.core.scoring import compute_metrics, compute_thread_metrics, split_sentences
+from social_duo.core.spans import traced
 
 
 DEFAULT_PLATFORM_CONSTRAINTS = {
@@ -56,9 +59,10 @@ PLATFORMS = ["x", "linkedin", "instagram", "threads", "all"]
 def platform_constraint(config: AppConfig, platform: str) -> PlatformConstraint:
     if platform not in PLATFORMS:
         raise ValueError(f"Unsupported platform: {platform}")
-    return getattr(config.platform_constraints, platform)
+    return get_policy(config).constraint(platform)
 
 
+@traced("validate")
 def validate_text(
     text: str,
     *,
@@ -66,13 +70,25 @@ def validate_text(
     platform: str,
     cta_required: bool,
     cta_text: str | None,
+    thread_count: int | None = None,
 ) -> tuple[list[str], dict]:
-    constraint = platform_constraint(config, platform)
+    policy = get_policy(config)
+    constraint = policy.constraint(platform)
+    if is_thread(constraint, thread_count):
+        return validate_thread(
+            text,
+            config=config,
+            platform=platform,
+            cta_required=cta_required,
+            cta_text=cta_text,
+            thread_count=thread_count or 1,
+        )
     metrics = compute_metrics(
         text,
         banned_phrases=config.brand_voice.banned_phrases,
         cta_required=cta_required,
         cta_text=cta_text,
+        banned_matcher=policy.banned_matcher,
     )
     issues: list[str] = []
 
@@ -90,6 +106,145 @@ def validate_text(
     return issues, metrics
 
 
+def score_candidate(issues: list[str], metrics: dict, constraint: PlatformConstraint) -> float:
+    """Local 0-100 ranking score: 25 off per constraint issue, up to 20 off for leaving the typical length band."""
+    score = 100.0 - 25.0 * len(issues)
+    char_count = metrics.get("char_count")
+    if char_count is not None:
+        if char_count < constraint.typical_min:
+            score -= 20.0 * (constraint.typical_min - char_count) / max(1, constraint.typical_min)
+        elif char_count > constraint.typical_max:
+            score -= min(20.0, 20.0 * (char_count - constraint.typical_max) / max(1, constraint.typical_max))
+    return round(score, 2)
+
+
+_THREAD_MARKER = re.compile(r"^\s*\(?(\d+)\s*/\s*\d*\)?[.:]?\s+")
+
+
+def is_thread(constraint: PlatformConstraint, thread_count: int | None) -> bool:
+    return constraint.threadable and (thread_count or 1) > 1
+
+
+def parse_thread(text: str) -> list[str]:
+    """Split a thread into segments on numbered markers (1/5, (2/5)) or blank lines."""
+    lines = text.strip().splitlines()
+    if sum(1 for line in lines if _THREAD_MARKER.match(line)) > 1:
+        segments: list[list[str]] = []
+        for line in lines:
+            if _THREAD_MARKER.match(line) or not segments:
+                segments.append([line])
+            else:
+                segments[-1].append(line)
+        return ["\n".join(seg).strip() for seg in segments if "".join(seg).strip()]
+    return [block.strip() for block in re.split(r"\n\s*\n", text.strip()) if block.strip()]
+
+
+def _strip_marker(segment: str) -> str:
+    return _THREAD_MARKER.sub("", segment, count=1).strip()
+
+
+def _hard_wrap(sentence: str, limit: int) -> list[str]:
+    chunks: list[str] = []
+    current = ""
+    for word in sentence.split():
+        while len(word) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(word[:limit])
+            word = word[limit:]
+        candidate = f"{current} {word}".strip()
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _pack(sentences: list[str], limit: int) -> list[str]:
+    segments: list[str] = []
+    current = ""
+    for sentence in sentences:
+        for piece in _hard_wrap(sentence, limit) if len(sentence) > limit else [sentence]:
+            candidate = f"{current} {piece}".strip()
+            if current and len(candidate) > limit:
+                segments.append(current)
+                current = piece
+            else:
+                current = candidate
+    if current:
+        segments.append(current)
+    return segments
+
+
+def split_thread(text: str, char_limit: int) -> list[str]:
+    """Split text at sentence boundaries into numbered segments that fit char_limit."""
+    sentences: list[str] = []
+    for segment in parse_thread(text):
+        sentences.extend(split_sentences(_strip_marker(segment)))
+    if not sentences:
+        return []
+    total = 1
+    while True:
+        reserve = len(f"{total}/{total} ")
+        packed = _pack(sentences, max(1, char_limit - reserve))
+        if len(packed) <= total:
+            break
+        total = len(packed)
+    return [f"{idx}/{len(packed)} {segment}" for idx, segment in enumerate(packed, start=1)]
+
+
+def normalize_thread(text: str, constraint: PlatformConstraint) -> str:
+    """Return the thread unchanged when every segment fits, otherwise re-split it."""
+    segments = parse_thread(text)
+    if segments and all(len(segment) <= constraint.char_limit for segment in segments):
+        return text
+    return "\n\n".join(split_thread(text, constraint.char_limit))
+
+
+def validate_thread(
+    text: str,
+    *,
+    config: AppConfig,
+    platform: str,
+    cta_required: bool,
+    cta_text: str | None,
+    thread_count: int,
+) -> tuple[list[str], dict]:
+    policy = get_policy(config)
+    constraint = policy.constraint(platform)
+    segments = parse_thread(text)
+    metrics = compute_thread_metrics(
+        segments,
+        banned_phrases=config.brand_voice.banned_phrases,
+        cta_required=cta_required,
+        cta_text=cta_text,
+        banned_matcher=policy.banned_matcher,
+    )
+    issues: list[str] = []
+
+    for seg in metrics["segments"]:
+        if seg["char_count"] > constraint.char_limit:
+            issues.append(
+                f"Segment {seg['index']} exceeds character limit ({seg['char_count']}/{constraint.char_limit})."
+            )
+        if seg["hashtag_count"] > constraint.hashtag_max:
+            issues.append(f"Segment {seg['index']} has too many hashtags ({seg['hashtag_count']}/{constraint.hashtag_max}).")
+    if metrics["segment_count"] != thread_count:
+        issues.append(f"Thread has {metrics['segment_count']} segments; expected {thread_count}.")
+    if metrics["banned_hits"]:
+        issues.append(f"Contains banned phrases: {', '.join(metrics['banned_hits'])}.")
+    if cta_required and not metrics["cta_present"]:
+        issues.append("CTA required but missing.")
+    if metrics["avg_sentence_length"] > 26:
+        issues.append("Sentences are too long on average.")
+
+    return issues, metrics
+
+
 def list_platforms(platform: str) -> Iterable[str]:
     if platform == "all":
         return ["x", "linkedin", "instagram", "threads"]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+# Rough chars-per-token ratio for English prose with OpenAI tokenizers; avoids a tokenizer dependency.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clip_text(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[: max(0, max_chars - 1)].rstrip() + "…"
+
+
+@dataclass(frozen=True)
+class ContextBudget:
+    """Per-turn prompt ceiling for discuss and molt.
+
+    ``recent_turns`` and ``recent_items`` are replayed verbatim; anything older is folded
+    into a rolling summary. ``max_tokens`` bounds the whole prompt (system + history + context).
+    """
+
+    max_tokens: int = 3000
+    recent_turns: int = 8
+    recent_items: int = 6
+    item_chars: int = 600
+    summary_lines: int = 12
+
+    def clip_item(self, item: dict[str, Any] | None) -> dict[str, Any] | None:
+        if not item:
+            return item
+        clipped = dict(item)
+        for key in ("content", "title", "rewrite"):
+            if isinstance(clipped.get(key), str):
+                clipped[key] = clip_text(clipped[key], self.item_chars)
+        return clipped
+
+    def fit_messages(self, messages: list[dict]) -> list[dict]:
+        """Drop the oldest replayed history, then clip the final context, until under max_tokens.
+
+        Clipping cuts the end of the context, so builders shrink their own variable sections
+        first and this only fires when the fixed instructions alone are over budget.
+        """
+        total = sum(estimate_tokens(m["content"]) for m in messages)
+        if total <= self.max_tokens:
+            return messages
+        head, history, tail = messages[:1], list(messages[1:-1]), messages[-1]
+        while history and total > self.max_tokens:
+            total -= estimate_tokens(history.pop(0)["content"])
+        if total > self.max_tokens:
+            allowed = self.max_tokens - (total - estimate_tokens(tail["content"]))
+            tail = {**tail, "content": clip_text(tail["content"], max(0, allowed) * CHARS_PER_TOKEN)}
+        return head + history + [tail]
+
+
+def summarize_turn(turn: dict[str, Any], agent: str | None = None) -> str:
+    """Cheap local extractor: intent, first sentence of the message, and the chosen topic."""
+    intent = turn.get("intent") or turn.get("action") or "?"
+    message = (turn.get("message") or turn.get("content") or "").strip()
+    first = message.split(". ")[0]
+    line = f"{agent + ' ' if agent else ''}{intent}: {clip_text(first, 120)}"
+    chosen = turn.get("chosen")
+    if isinstance(chosen, dict) and chosen.get("topic"):
+        line += f" (chose {chosen['topic']})"
+    return line
+
+
+class RollingSummary:
+    """Bounded summary of items that have left the verbatim window."""
+
+    def __init__(self, max_lines: int = 12, extractor: Callable[[Any], str] = str) -> None:
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.extractor = extractor
+        self.folded = 0
+
+    def add(self, item: Any) -> None:
+        self.folded += 1
+        self.lines.append(self.extractor(item))
+
+    def text(self) -> str:
+        if not self.folded:
+            return "none"
+        dropped = self.folded - len(self.lines)
+        prefix = [f"(+{dropped} earlier)"] if dropped else []
+        return " | ".join(prefix + list(self.lines))
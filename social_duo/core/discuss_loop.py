@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from dataclasses import dataclass
 from typing import Any
 
-from pydantic import ValidationError
-
 from social_duo.agents.prompts_discuss import AGENT_DISCUSS_SYSTEM
-from social_duo.core.constraints import list_platforms, platform_constraint, validate_text
+from social_duo.agents.structured import StructuredOutputError, structured_chat
+from social_duo.core.constraints import list_platforms, parse_thread, validate_text
+from social_duo.core.context_budget import (
+    CHARS_PER_TOKEN,
+    ContextBudget,
+    RollingSummary,
+    clip_text,
+    estimate_tokens,
+    summarize_turn,
+)
+from social_duo.core.policy import get_policy
+from social_duo.core.spans import span
 from social_duo.providers.llm import LLMClient
 from social_duo.types.discuss_schemas import DiscussArtifact, DiscussTurn
 from social_duo.types.schemas import AppConfig
@@ -40,13 +50,16 @@ def _build_context(
     risk: str,
     turn_index: int,
     chosen: dict | None,
-    artifacts: list[dict[str, Any]],
+    artifacts_json: str,
+    artifacts_summary: str,
+    turns_summary: str,
     must_converge: bool,
     constraint_issues: list[str],
     expected_intent: str,
     agent_name: str,
+    budget: ContextBudget | None = None,
 ) -> str:
-    constraints = {p: platform_constraint(config, p).model_dump() for p in list_platforms(platform)}
+    budget = budget or ContextBudget()
     platform_rule = (
         "If platform=all, produce one artifact per platform. "
         "If platform is a single target, produce 3 variants for that platform."
@@ -57,24 +70,34 @@ def _build_context(
         '"chosen":{"topic":"...","angle":"...","platform":"x|linkedin|instagram|threads"},'
         '"artifacts":[{"kind":"post|thread|reply","platform":"x|linkedin|instagram|threads","content":"..."}],"stop":false}'
     )
-    return "\n".join(
-        [
-            f"Turn: {turn_index}",
-            f"Mode: {mode}",
-            f"Risk level: {risk}",
-            f"Platform target: {platform}",
-            f"Constraints: {json.dumps(constraints)}",
-            platform_rule,
-            f"Chosen: {json.dumps(chosen) if chosen else None}",
-            f"Artifacts so far: {json.dumps(artifacts)}",
-            f"Must converge now: {must_converge}",
-            f"Constraint issues: {constraint_issues}",
-            f"Agent: {agent_name}",
-            f"Expected intent: {expected_intent}",
-            f"Schema: {schema}",
-            "Reminder: Output ONLY valid JSON per schema with all keys present. Each artifact MUST include platform. Do NOT echo this context.",
-        ]
-    )
+    header = [
+        f"Turn: {turn_index}",
+        f"Mode: {mode}",
+        f"Risk level: {risk}",
+        f"Platform target: {platform}",
+        f"Constraints: {get_policy(config).constraints_json(platform)}",
+        platform_rule,
+        f"Chosen: {json.dumps(chosen) if chosen else None}",
+    ]
+    # Variable sections in prompt order; their values are shrunk so the instructions after them always fit.
+    labels = ["Earlier turns (summary)", "Earlier artifacts (summary)", "Recent artifacts", "Constraint issues"]
+    values = [turns_summary, artifacts_summary, artifacts_json, str(constraint_issues)]
+    footer = [
+        f"Must converge now: {must_converge}",
+        f"Agent: {agent_name}",
+        f"Expected intent: {expected_intent}",
+        f"Schema: {schema}",
+        "Reminder: Output ONLY valid JSON per schema with all keys present. Each artifact MUST include platform. Do NOT echo this context.",
+    ]
+    fixed = "\n".join(header + [f"{label}: " for label in labels] + footer)
+    # Less one char per value: clip_text still emits its ellipsis when there is no room left.
+    room = (budget.max_tokens - estimate_tokens(AGENT_DISCUSS_SYSTEM) - estimate_tokens(fixed)) * CHARS_PER_TOKEN - len(values)
+    # Issues and recent artifacts get first claim on the room; the summaries are cut first.
+    for idx in (3, 2, 1, 0):
+        values[idx] = clip_text(values[idx], max(0, room))
+        room -= len(values[idx])
+    sections = [f"{label}: {value}" for label, value in zip(labels, values)]
+    return "\n".join(header + sections + footer)
 
 
 def _call_agent(
@@ -84,61 +107,127 @@ def _call_agent(
     context: str,
     history: list[dict[str, Any]],
     temperature: float,
+    budget: ContextBudget | None = None,
 ) -> tuple[DiscussTurn, str]:
+    budget = budget or ContextBudget()
     messages = [{"role": "system", "content": system}]
-    for item in history[-8:]:
+    for item in history[-budget.recent_turns :] if budget.recent_turns else []:
         messages.append({"role": "assistant", "content": json.dumps(item["turn"])})
     messages.append({"role": "user", "content": context})
-
-    resp = llm.chat(messages, temperature=temperature, max_tokens=900, response_format={"type": "json_object"})
-    content = resp["choices"][0]["message"]["content"]
+    messages = budget.fit_messages(messages)
 
     try:
-        data = json.loads(content)
-        turn = DiscussTurn.model_validate(data)
-        return turn, content
-    except (json.JSONDecodeError, ValidationError) as exc:
-        correction = messages + [
-            {
-                "role": "user",
-                "content": "Return ONLY valid JSON that matches the schema. Include platform on every artifact item. No extra text.",
-            }
-        ]
-        resp = llm.chat(correction, temperature=temperature, max_tokens=900, response_format={"type": "json_object"})
-        content = resp["choices"][0]["message"]["content"]
-        try:
-            data = json.loads(content)
-            turn = DiscussTurn.model_validate(data)
-            return turn, content
-        except (json.JSONDecodeError, ValidationError) as exc2:
-            raise DiscussParseError(f"Invalid JSON after retry: {exc2}", content) from exc
+        turn, content = structured_chat(
+            llm,
+            messages,
+            DiscussTurn,
+            temperature=temperature,
+            max_tokens=900,
+            correction="Return ONLY valid JSON that matches the schema. Include platform on every artifact item. No extra text.",
+        )
+    except StructuredOutputError as exc:
+        raise DiscussParseError(str(exc), exc.raw) from exc
+    return turn, content
+
+
+class ArtifactStore:
+    """Artifacts seen so far, validated and serialized once on arrival.
+
+    Duplicates (same kind, platform and content) are dropped, each artifact's constraint
+    issues are computed once on arrival, and the JSON fragment used in the prompt is rebuilt
+    only when a new artifact arrives. With a ``window``, only the newest artifacts (and their
+    issues) are kept verbatim; older ones are folded into ``summary`` with an issue count.
+    """
+
+    def __init__(self, *, config: AppConfig, platform: str, window: int | None = None, item_chars: int | None = None) -> None:
+        self.config = config
+        self.targets = frozenset(list_platforms(platform))
+        self.window = window
+        self.item_chars = item_chars
+        self.artifacts: list[DiscussArtifact] = []
+        self.summary = RollingSummary(extractor=_fold_artifact)
+        self._seen: set[str] = set()
+        self._fragments: list[str] = []
+        self._issues: list[list[str]] = []
+        self._json: str | None = "[]"
+
+    def __len__(self) -> int:
+        return len(self.artifacts)
+
+    @property
+    def issues(self) -> list[str]:
+        """Constraint issues of the artifacts still in the verbatim window."""
+        return [issue for issues in self._issues for issue in issues]
+
+    def add(self, artifact: DiscussArtifact) -> bool:
+        key = hashlib.sha1(f"{artifact.kind}\x00{artifact.platform}\x00{artifact.content}".encode("utf-8")).hexdigest()
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+        self.artifacts.append(artifact)
+        self._issues.append(self._validate(artifact))
+        data = artifact.model_dump()
+        if self.item_chars:
+            data["content"] = clip_text(data["content"], self.item_chars)
+        self._fragments.append(json.dumps(data))
+        if self.window is not None and len(self._fragments) > self.window:
+            self._fragments.pop(0)
+            self.summary.add((self.artifacts[-self.window - 1], self._issues.pop(0)))
+        self._json = None
+        return True
+
+    def extend(self, artifacts: list[DiscussArtifact]) -> None:
+        for artifact in artifacts:
+            self.add(artifact)
+
+    def to_json(self) -> str:
+        if self._json is None:
+            self._json = "[" + ", ".join(self._fragments) + "]"
+        return self._json
+
+    def _validate(self, artifact: DiscussArtifact) -> list[str]:
+        if artifact.platform not in self.targets or artifact.kind not in {"post", "thread"}:
+            return []
+        problems, _ = validate_text(
+            artifact.content,
+            config=self.config,
+            platform=artifact.platform,
+            cta_required=False,
+            cta_text=None,
+            thread_count=len(parse_thread(artifact.content)) if artifact.kind == "thread" else None,
+        )
+        return problems
 
 
-def _collect_artifacts(turn: DiscussTurn, artifacts: list[DiscussArtifact]) -> None:
-    for artifact in turn.artifacts:
-        artifacts.append(artifact)
+def _fold_artifact(item: tuple[DiscussArtifact, list[str]]) -> str:
+    artifact, issues = item
+    line = f"{artifact.platform} {artifact.kind}: {clip_text(artifact.content, 80)}"
+    return f"{line} ({len(issues)} issues)" if issues else line
 
 
-def _validate_artifacts(
-    *,
-    config: AppConfig,
-    platform: str,
-    artifacts: list[DiscussArtifact],
-) -> list[str]:
-    issues: list[str] = []
-    for artifact in artifacts:
-        if artifact.platform not in list_platforms(platform):
+def normalize_artifacts(artifacts: list[dict], platform: str) -> list[dict]:
+    seen = set()
+    unique: list[dict] = []
+    for art in artifacts:
+        key = (art.get("kind"), art.get("platform"), art.get("content"))
+        if key in seen:
             continue
-        if artifact.kind in {"post", "thread"}:
-            problems, _ = validate_text(
-                artifact.content,
-                config=config,
-                platform=artifact.platform,
-                cta_required=False,
-                cta_text=None,
-            )
-            issues.extend(problems)
-    return issues
+        seen.add(key)
+        unique.append(art)
+
+    posts = [a for a in unique if a.get("kind") in {"post", "thread"}]
+    replies = [a for a in unique if a.get("kind") == "reply"]
+
+    if platform == "all":
+        selected_posts: list[dict] = []
+        for plat in ["x", "linkedin", "instagram", "threads"]:
+            cand = [p for p in posts if p.get("platform") == plat]
+            if cand:
+                selected_posts.append(cand[-1])
+    else:
+        selected_posts = [p for p in posts if p.get("platform") == platform][-3:]
+
+    return selected_posts + replies
 
 
 def run_discuss_loop(
@@ -150,9 +239,15 @@ def run_discuss_loop(
     mode: str,
     risk: str,
     stop_on: str,
+    budget: ContextBudget | None = None,
 ) -> DiscussLoopResult:
+    budget = budget or ContextBudget()
     transcript: list[dict[str, Any]] = []
-    artifacts: list[DiscussArtifact] = []
+    artifacts = ArtifactStore(config=config, platform=platform, window=budget.recent_items, item_chars=budget.item_chars)
+    earlier_turns = RollingSummary(
+        max_lines=budget.summary_lines,
+        extractor=lambda item: summarize_turn(item["turn"], item["agent"]),
+    )
     chosen: dict | None = None
     has_decided = False
     has_draft = False
@@ -186,20 +281,23 @@ def run_discuss_loop(
         else:
             expected_intent = "REVISE or WRAPUP"
 
-        constraint_issues = _validate_artifacts(config=config, platform=platform, artifacts=artifacts)
-        context = _build_context(
-            config=config,
-            platform=platform,
-            mode=mode,
-            risk=risk,
-            turn_index=idx + 1,
-            chosen=chosen,
-            artifacts=[a.model_dump() for a in artifacts],
-            must_converge=must_converge,
-            constraint_issues=constraint_issues,
-            expected_intent=expected_intent,
-            agent_name=agent_name,
-        )
+        with span("prompt.build", agent=agent_name):
+            context = _build_context(
+                config=config,
+                platform=platform,
+                mode=mode,
+                risk=risk,
+                turn_index=idx + 1,
+                chosen=chosen,
+                artifacts_json=artifacts.to_json(),
+                artifacts_summary=artifacts.summary.text(),
+                turns_summary=earlier_turns.text(),
+                must_converge=must_converge,
+                constraint_issues=artifacts.issues,
+                expected_intent=expected_intent,
+                agent_name=agent_name,
+                budget=budget,
+            )
 
         try:
             turn, raw = _call_agent(
@@ -208,6 +306,7 @@ def run_discuss_loop(
                 context=context,
                 history=transcript,
                 temperature=temperature,
+                budget=budget,
             )
         except DiscussParseError as exc:
             transcript.append(
@@ -228,7 +327,7 @@ def run_discuss_loop(
             chosen = turn.chosen.model_dump()
             has_decided = True
 
-        _collect_artifacts(turn, artifacts)
+        artifacts.extend(turn.artifacts)
         for artifact in turn.artifacts:
             if artifact.kind in {"post", "thread"}:
                 has_draft = True
@@ -247,12 +346,14 @@ def run_discuss_loop(
                 "raw": raw,
             }
         )
+        if len(transcript) > budget.recent_turns:
+            earlier_turns.add(transcript[-budget.recent_turns - 1])
 
         if stop_on == "manual" and turn.stop:
-            return DiscussLoopResult(transcript=transcript, artifacts=artifacts, stop_reason="manual")
+            return DiscussLoopResult(transcript=transcript, artifacts=artifacts.artifacts, stop_reason="manual")
         if stop_on == "artifact" and turn.intent == "WRAPUP":
-            return DiscussLoopResult(transcript=transcript, artifacts=artifacts, stop_reason="artifact")
+            return DiscussLoopResult(transcript=transcript, artifacts=artifacts.artifacts, stop_reason="artifact")
         if stop_on == "artifact" and mode == "posts" and has_draft and turn.intent == "WRAPUP":
-            return DiscussLoopResult(transcript=transcript, artifacts=artifacts, stop_reason="artifact")
+            return DiscussLoopResult(transcript=transcript, artifacts=artifacts.artifacts, stop_reason="artifact")
 
-    return DiscussLoopResult(transcript=transcript, artifacts=artifacts, stop_reason="turns")
+    return DiscussLoopResult(transcript=transcript, artifacts=artifacts.artifacts, stop_reason="turns")
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
+import time
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any
+from difflib import SequenceMatcher
+from typing import Any, Callable
 
 from social_duo.agents.editor import EditorAgent
+from social_duo.agents.structured import StructuredStats
 from social_duo.agents.writer import WriterAgent
-from social_duo.core.constraints import validate_text
-from social_duo.types.schemas import AppConfig, EditorOutput, WriterOutput
+from social_duo.core.constraints import (
+    is_thread,
+    normalize_thread,
+    platform_constraint,
+    score_candidate,
+    validate_text,
+)
+from social_duo.core.spans import propagate
+from social_duo.types.schemas import AppConfig, EditorOutput, EditorScores, PlatformConstraint, WriterOutput
 
 
 @dataclass
@@ -14,6 +26,55 @@ class LoopResult:
     final: WriterOutput
     editor: EditorOutput
     trace: list[dict[str, Any]]
+    rounds: int = 0
+    stop_reason: str = "rounds"
+
+
+def loop_output(
+    result: LoopResult, *, writer: WriterAgent, editor: EditorAgent, stats: StructuredStats
+) -> dict[str, Any]:
+    """The ``final_json`` stored for a post, reply or batch run; ``final`` always has 3 variants.
+
+    ``editor`` is the last critique. Its verdict and issues judge the draft the Editor saw, so
+    when the run ended on ``accepted_edit`` (``final`` is the Editor's own edit, which passed
+    local validation) the block carries ``accepted_edit: true`` rather than a bare FAIL.
+    """
+    final = result.final.model_dump()
+    if len(final["variants"]) < 3:
+        final["variants"] = (final["variants"] + [final["recommended"]] * 3)[:3]
+    return {
+        "final": final,
+        "editor": {**result.editor.model_dump(), "accepted_edit": result.stop_reason == "accepted_edit"},
+        "loop": {"rounds": result.rounds, "stop_reason": result.stop_reason},
+        "prompt_cache": {"writer": writer.cache_stats.summary(), "editor": editor.cache_stats.summary()},
+        "structured_output": stats.summary(),
+    }
+
+
+@dataclass(frozen=True)
+class LoopBudget:
+    """Adaptive stopping for run_loop; ``rounds`` stays the upper bound.
+
+    After a FAIL the loop stops early when the Editor's ``edited_version`` already passes local
+    validation (accepted as-is instead of another Writer call), when the Editor's score dropped
+    (the previous, better draft is kept), improved by less than ``min_score_delta`` points, or
+    when the new draft differs from the previous one by less than ``min_change`` (difflib ratio). ``max_seconds``/``max_tokens``
+    skip a round that the average round cost so far says would overrun.
+    """
+
+    min_score_delta: float = 3.0
+    min_change: float = 0.05
+    accept_edited: bool = True
+    max_seconds: float | None = None
+    max_tokens: int | None = None
+
+
+def editor_score(scores: EditorScores) -> float:
+    return (scores.constraint_fit + scores.clarity + scores.hook + (100 - scores.risk)) / 4
+
+
+def change_ratio(before: str, after: str) -> float:
+    return 1.0 - SequenceMatcher(None, before, after).ratio()
 
 
 class LoopError(RuntimeError):
@@ -22,6 +83,87 @@ class LoopError(RuntimeError):
         self.trace = trace
 
 
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+def candidate_temperatures(candidates: int) -> list[float]:
+    if candidates <= 1:
+        return [0.7]
+    return [round(0.5 + 0.5 * n / (candidates - 1), 2) for n in range(candidates)]
+
+
+def _tournament(
+    writer: WriterAgent,
+    editor: EditorAgent,
+    context: dict[str, Any],
+    *,
+    candidates: int,
+    top_k: int,
+    validate: Callable[[str], tuple[list[str], dict[str, Any]]],
+    constraint: PlatformConstraint,
+    thread_mode: bool,
+    trace: list[dict[str, Any]],
+) -> tuple[WriterOutput, EditorOutput]:
+    """Best-of-N first round.
+
+    Fires ``candidates`` drafts at once across a temperature spread, ranks them with the local
+    constraint engine, and sends only the ``top_k`` best to the Editor (also concurrently). The
+    winner is the best Editor result (PASS first, then score). Every candidate and critique is
+    recorded in ``trace``; the winner is also recorded as the round's draft/critique.
+    """
+    temperatures = candidate_temperatures(candidates)
+    ranked: list[tuple[float, int, WriterOutput, list[str], dict[str, Any]]] = []
+    with ThreadPoolExecutor(max_workers=max(candidates, top_k), thread_name_prefix="tournament") as pool:
+        futures = [pool.submit(propagate(writer.draft), context, temperature=t) for t in temperatures]
+        for idx, (future, temperature) in enumerate(zip(futures, temperatures)):
+            meta = {"index": idx, "temperature": temperature}
+            try:
+                draft = future.result()
+                if thread_mode:
+                    draft.recommended = normalize_thread(draft.recommended, constraint)
+                issues, metrics = validate(draft.recommended)
+            except Exception as exc:  # noqa: BLE001
+                trace.append({"agent": "WriterAgent", "role": "candidate", "content": {**meta, "error": str(exc)}})
+                continue
+            score = score_candidate(issues, metrics, constraint)
+            trace.append(
+                {
+                    "agent": "WriterAgent",
+                    "role": "candidate",
+                    "content": {**draft.model_dump(), **meta, "issues": issues, "local_score": score},
+                }
+            )
+            ranked.append((score, idx, draft, issues, metrics))
+        if not ranked:
+            raise LoopError("Writer failed: no candidate produced a draft", trace)
+
+        finalists = sorted(ranked, key=lambda c: (-c[0], c[1]))[: max(1, top_k)]
+        critiques = [
+            pool.submit(
+                propagate(editor.critique),
+                ChainMap({"draft": d.recommended, "metrics": metrics, "constraint_issues": issues}, context),
+            )
+            for _, _, d, issues, metrics in finalists
+        ]
+        results = []
+        for (score, idx, draft, _, _), future in zip(finalists, critiques):
+            try:
+                critique = future.result()
+            except Exception as exc:  # noqa: BLE001
+                trace.append({"agent": "EditorAgent", "role": "candidate_critique", "content": {"index": idx, "error": str(exc)}})
+                continue
+            trace.append({"agent": "EditorAgent", "role": "candidate_critique", "content": {**critique.model_dump(), "index": idx}})
+            results.append((critique.verdict == "PASS", editor_score(critique.scores), score, -idx, draft, critique))
+        if not results:
+            raise LoopError("Editor failed: no candidate could be critiqued", trace)
+
+    *_, draft, critique = max(results, key=lambda r: r[:4])
+    trace.append({"agent": "WriterAgent", "role": "draft", "content": draft.model_dump()})
+    trace.append({"agent": "EditorAgent", "role": "critique", "content": critique.model_dump()})
+    return draft, critique
+
+
 def run_loop(
     *,
     writer: WriterAgent,
@@ -29,55 +171,142 @@ def run_loop(
     config: AppConfig,
     context: dict[str, Any],
     rounds: int,
+    budget: LoopBudget | None = None,
+    candidates: int = 1,
+    top_k: int = 2,
 ) -> LoopResult:
+    """Writer drafts, Editor critiques, up to ``rounds`` times or until PASS.
+
+    Without ``budget`` every FAIL is revised until ``rounds`` runs out; with one, the loop
+    also stops on plateau, convergence, an acceptable edit, or a spent time/token budget.
+    With ``candidates`` > 1 the first round is a tournament (see ``_tournament``).
+    """
     trace: list[dict[str, Any]] = []
     last_editor: EditorOutput | None = None
     draft: WriterOutput | None = None
+    thread_count = context.get("thread_count")
+    constraint = platform_constraint(config, context["platform"])
+    thread_mode = is_thread(constraint, thread_count)
+    started = time.monotonic()
+    tokens_start = writer.cache_stats.total_tokens + editor.cache_stats.total_tokens
+    stop_reason = "rounds"
+    rounds_run = 0
+
+    def _validate(text: str) -> tuple[list[str], dict[str, Any]]:
+        return validate_text(
+            text,
+            config=config,
+            platform=context["platform"],
+            cta_required=context.get("cta_required", False),
+            cta_text=context.get("cta_text"),
+            thread_count=thread_count,
+        )
 
     for i in range(rounds):
-        try:
-            if i == 0:
-                draft = writer.draft(context)
-            else:
-                revise_context = dict(context)
-                revise_context["editor_feedback"] = [issue.detail for issue in last_editor.issues] if last_editor else []
-                revise_context["edited_version"] = last_editor.edited_version if last_editor else ""
-                draft = writer.revise(revise_context)
-        except Exception as exc:  # noqa: BLE001
-            raise LoopError(f"Writer failed: {exc}", trace) from exc
-
-        trace.append({"agent": "WriterAgent", "role": "draft", "content": draft.model_dump()})
-
-        try:
-            issues, metrics = validate_text(
-                draft.recommended,
-                config=config,
-                platform=context["platform"],
-                cta_required=context.get("cta_required", False),
-                cta_text=context.get("cta_text"),
+        if budget is not None and i > 0:
+            elapsed = time.monotonic() - started
+            tokens = writer.cache_stats.total_tokens + editor.cache_stats.total_tokens - tokens_start
+            if budget.max_seconds is not None and elapsed + elapsed / i > budget.max_seconds:
+                stop_reason = "time_budget"
+                break
+            if budget.max_tokens is not None and tokens + tokens / i > budget.max_tokens:
+                stop_reason = "token_budget"
+                break
+
+        previous = draft
+        previous_editor = last_editor
+        rounds_run = i + 1
+        if i == 0 and candidates > 1:
+            draft, last_editor = _tournament(
+                writer,
+                editor,
+                context,
+                candidates=candidates,
+                top_k=top_k,
+                validate=_validate,
+                constraint=constraint,
+                thread_mode=thread_mode,
+                trace=trace,
             )
-        except Exception as exc:  # noqa: BLE001
-            raise LoopError(f"Constraint check failed: {exc}", trace) from exc
-
-        editor_context = dict(context)
-        editor_context.update(
-            {
-                "draft": draft.recommended,
-                "metrics": metrics,
-                "constraint_issues": issues,
-            }
-        )
+        else:
+            call_started = time.perf_counter()
+            try:
+                if i == 0:
+                    draft = writer.draft(context)
+                else:
+                    revise_context = ChainMap(
+                        {
+                            "editor_feedback": [issue.detail for issue in last_editor.issues] if last_editor else [],
+                            "edited_version": last_editor.edited_version if last_editor else "",
+                        },
+                        context,
+                    )
+                    draft = writer.revise(revise_context)
+            except Exception as exc:  # noqa: BLE001
+                raise LoopError(f"Writer failed: {exc}", trace) from exc
+
+            if thread_mode:
+                draft.recommended = normalize_thread(draft.recommended, constraint)
 
-        try:
-            last_editor = editor.critique(editor_context)
-            trace.append({"agent": "EditorAgent", "role": "critique", "content": last_editor.model_dump()})
-        except Exception as exc:  # noqa: BLE001
-            raise LoopError(f"Editor failed: {exc}", trace) from exc
+            trace.append({"agent": "WriterAgent", "role": "draft", "content": draft.model_dump(), "elapsed_ms": _ms(call_started)})
+
+            try:
+                issues, metrics = _validate(draft.recommended)
+            except Exception as exc:  # noqa: BLE001
+                raise LoopError(f"Constraint check failed: {exc}", trace) from exc
+
+            editor_context = ChainMap(
+                {
+                    "draft": draft.recommended,
+                    "metrics": metrics,
+                    "constraint_issues": issues,
+                },
+                context,
+            )
+
+            call_started = time.perf_counter()
+            try:
+                last_editor = editor.critique(editor_context)
+                trace.append(
+                    {"agent": "EditorAgent", "role": "critique", "content": last_editor.model_dump(), "elapsed_ms": _ms(call_started)}
+                )
+            except Exception as exc:  # noqa: BLE001
+                raise LoopError(f"Editor failed: {exc}", trace) from exc
 
         if last_editor.verdict == "PASS":
+            stop_reason = "pass"
+            break
+        if budget is None or i == rounds - 1:
+            continue
+
+        # An acceptable edit ends the run whatever the score trend; check it before plateau/convergence.
+        edited = last_editor.edited_version.strip()
+        if budget.accept_edited and edited and edited != draft.recommended:
+            if thread_mode:
+                edited = normalize_thread(edited, constraint)
+            try:
+                edit_issues, _ = _validate(edited)
+            except Exception:  # noqa: BLE001
+                edit_issues = ["validation failed"]
+            if not edit_issues:
+                draft = draft.model_copy(update={"recommended": edited})
+                trace.append({"agent": "EditorAgent", "role": "accepted_edit", "content": {"recommended": edited}})
+                stop_reason = "accepted_edit"
+                break
+        if previous_editor is not None:
+            delta = editor_score(last_editor.scores) - editor_score(previous_editor.scores)
+            if delta < 0:
+                draft, last_editor = previous, previous_editor
+                stop_reason = "regressed"
+                break
+            if delta < budget.min_score_delta:
+                stop_reason = "plateau"
+                break
+        if previous is not None and change_ratio(previous.recommended, draft.recommended) < budget.min_change:
+            stop_reason = "converged"
             break
 
     if draft is None or last_editor is None:
         raise RuntimeError("Loop did not produce output.")
 
-    return LoopResult(final=draft, editor=last_editor, trace=trace)
+    return LoopResult(final=draft, editor=last_editor, trace=trace, rounds=rounds_run, stop_reason=stop_reason)
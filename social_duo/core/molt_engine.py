@@ -1,19 +1,43 @@
 from __future__ import annotations
 
+import bisect
 import json
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Callable
 
-from pydantic import ValidationError
-
-from social_duo.agents.prompts_molt import MOLT_SYSTEM
+from social_duo.agents.prompts_molt import DUO, join_agents, molt_system
+from social_duo.agents.structured import STATS, StructuredStats, structured_chat
+from social_duo.core.context_budget import CHARS_PER_TOKEN, ContextBudget, clip_text, estimate_tokens
+from social_duo.core.similarity import SimilarityIndex
+from social_duo.core.spans import propagate, record, span
 from social_duo.providers.llm import LLMClient
 from social_duo.types.molt_schemas import MoltAction
 
 
+class FeedItem:
+    """A reduced post, comment or reply; ``payload`` is the event payload as emitted."""
+
+    __slots__ = ("item_id", "kind", "agent", "parent_id", "payload")
+
+    def __init__(self, item_id: str, kind: str, agent: str | None, parent_id: str | None, payload: dict) -> None:
+        self.item_id = item_id
+        self.kind = kind
+        self.agent = agent
+        self.parent_id = parent_id
+        self.payload = payload
+
+
 @dataclass
 class FeedState:
+    """Reduced feed. ``reduce_event`` is the only writer.
+
+    ``posts``/``comments``/``replies`` map ids to payloads for lookups; ``log`` keeps the same
+    items per kind in arrival order so "latest" and "last N" reads are O(1)/O(N) instead of
+    copying a dict, and ``children`` indexes threads by parent id.
+    """
+
     posts: dict[str, dict] = field(default_factory=dict)
     comments: dict[str, dict] = field(default_factory=dict)
     replies: dict[str, dict] = field(default_factory=dict)
@@ -31,21 +55,118 @@ class FeedState:
     reply_agent_by_id: dict[str, str] = field(default_factory=dict)
     max_replies: int = 2
     upvotes_used: dict[str, int] = field(default_factory=dict)
+    log: dict[str, list[FeedItem]] = field(default_factory=lambda: {"post": [], "comment": [], "reply": []})
+    children: dict[str, list[str]] = field(default_factory=dict)
+    sorted_topics: list[str] = field(default_factory=list)
+    reply_similarity: float = 0.45
+    topic_similarity: float = 0.6
+    similarity: SimilarityIndex = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.similarity = SimilarityIndex(threshold=self.reply_similarity)
 
     def next_id(self, kind: str) -> str:
         self.counters[kind] += 1
         prefix = {"post": "P", "comment": "C", "reply": "R"}[kind]
         return f"{prefix}{self.counters[kind]}"
 
+    def append(self, kind: str, item_id: str, payload: dict, *, agent: str | None, parent_id: str | None) -> None:
+        {"post": self.posts, "comment": self.comments, "reply": self.replies}[kind][item_id] = payload
+        # keep next_id ahead of replayed ids so a rebuilt state never reissues one
+        seq = item_id[1:]
+        if seq.isdigit() and int(seq) > self.counters[kind]:
+            self.counters[kind] = int(seq)
+        self.log[kind].append(FeedItem(item_id, kind, agent, parent_id, payload))
+        self.votes[item_id] = 0
+        if parent_id:
+            self.children.setdefault(parent_id, []).append(item_id)
+        text = f"{payload.get('title') or ''} {payload.get('content') or ''}" if kind == "post" else payload.get("content")
+        self.similarity.add(item_id, text or "")
+
+    def add_topic(self, topic_key: str) -> None:
+        if topic_key not in self.topics:
+            self.topics.add(topic_key)
+            bisect.insort(self.sorted_topics, topic_key)
+
+    def is_repeat(self, text: str | None) -> bool:
+        """True if ``text`` near-duplicates an earlier reply.
+
+        The last two replies are always scored exactly; older replies go through the LSH
+        index, so the check stays sub-linear as the feed grows. Comments are not compared:
+        a reply naturally echoes the comment it answers.
+        """
+        if not text:
+            return False
+        recent = [item.item_id for item in self.log["reply"][-2:]]
+        if any(self.similarity.score(text, item_id) > self.reply_similarity for item_id in recent):
+            return True
+        return any(
+            score > self.reply_similarity
+            for _, score in self.similarity.query(text, threshold=self.reply_similarity, prefix="R")
+        )
+
+    def is_repeat_topic(self, title: str | None, content: str | None) -> bool:
+        text = f"{title or ''} {content or ''}"
+        return bool(self.similarity.query(text, threshold=self.topic_similarity, prefix="P"))
+
+    def recent(self, kind: str, limit: int) -> list[dict]:
+        if limit <= 0:
+            return []
+        return [item.payload for item in self.log[kind][-limit:]]
+
     def latest_post_id(self) -> str | None:
-        if not self.posts:
-            return None
-        return list(self.posts.keys())[-1]
+        items = self.log["post"]
+        return items[-1].item_id if items else None
 
     def latest_comment_id(self) -> str | None:
-        if not self.comments:
-            return None
-        return list(self.comments.keys())[-1]
+        items = self.log["comment"]
+        return items[-1].item_id if items else None
+
+    def to_snapshot(self) -> dict[str, Any]:
+        return {
+            "limits": {
+                "max_posts": self.max_posts,
+                "max_comments": self.max_comments,
+                "max_replies": self.max_replies,
+                "reply_similarity": self.reply_similarity,
+                "topic_similarity": self.topic_similarity,
+            },
+            "counters": dict(self.counters),
+            "log": {
+                kind: [[item.item_id, item.agent, item.parent_id, item.payload] for item in items]
+                for kind, items in self.log.items()
+            },
+            "votes": self.votes,
+            "topics": self.sorted_topics,
+            "last_reply_id": self.last_reply_id,
+            "last_comment_id": self.last_comment_id,
+            "last_reply_agent": self.last_reply_agent,
+            "last_comment_agent": self.last_comment_agent,
+            "last_reply_text_by_agent": self.last_reply_text_by_agent,
+            "post_keyword": self.post_keyword,
+            "reply_agent_by_id": self.reply_agent_by_id,
+            "upvotes_used": self.upvotes_used,
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict[str, Any]) -> FeedState:
+        state = cls(**data["limits"])
+        for kind, items in data["log"].items():
+            for item_id, agent, parent_id, payload in items:
+                state.append(kind, item_id, payload, agent=agent, parent_id=parent_id)
+        state.counters.update(data["counters"])
+        state.votes.update(data["votes"])
+        for topic_key in data["topics"]:
+            state.add_topic(topic_key)
+        state.last_reply_id = data["last_reply_id"]
+        state.last_comment_id = data["last_comment_id"]
+        state.last_reply_agent = data["last_reply_agent"]
+        state.last_comment_agent = data["last_comment_agent"]
+        state.last_reply_text_by_agent = dict(data["last_reply_text_by_agent"])
+        state.post_keyword = data["post_keyword"]
+        state.reply_agent_by_id = dict(data["reply_agent_by_id"])
+        state.upvotes_used = dict(data["upvotes_used"])
+        return state
 
 
 def _normalize_topic(title: str | None, content: str | None) -> str:
@@ -93,23 +214,6 @@ def _extract_keyword(text: str | None) -> str:
     return sorted(candidates, key=len, reverse=True)[0]
 
 
-def _too_similar(a: str, b: str) -> bool:
-    if not a or not b:
-        return False
-    a_tokens = set(a.lower().split())
-    b_tokens = set(b.lower().split())
-    if not a_tokens or not b_tokens:
-        return False
-    overlap = len(a_tokens & b_tokens) / max(1, len(a_tokens | b_tokens))
-    return overlap > 0.45
-
-
-def _recent_reply_texts(state: FeedState, limit: int = 2) -> list[str]:
-    if not state.replies:
-        return []
-    return [r.get("content", "") for r in list(state.replies.values())[-limit:]]
-
-
 def _diversify_reply(content: str, *, agent: str, state: FeedState) -> str:
     starters = [
         "One angle is",
@@ -148,23 +252,20 @@ def reduce_event(state: FeedState, event: dict[str, Any]) -> None:
 
     if action == "CREATE_POST":
         post_id = payload["post_id"]
-        state.posts[post_id] = payload
-        state.votes[post_id] = 0
+        state.append("post", post_id, payload, agent=event.get("agent"), parent_id=None)
         topic_key = _normalize_topic(payload.get("title"), payload.get("content"))
         if topic_key:
-            state.topics.add(topic_key)
+            state.add_topic(topic_key)
         title = payload.get("title")
         state.post_keyword = _extract_keyword(title or payload.get("content"))
     elif action == "COMMENT":
         comment_id = payload["comment_id"]
-        state.comments[comment_id] = payload
-        state.votes[comment_id] = 0
+        state.append("comment", comment_id, payload, agent=event.get("agent"), parent_id=payload.get("post_id"))
         state.last_comment_id = comment_id
         state.last_comment_agent = event.get("agent")
     elif action == "REPLY":
         reply_id = payload["reply_id"]
-        state.replies[reply_id] = payload
-        state.votes[reply_id] = 0
+        state.append("reply", reply_id, payload, agent=event.get("agent"), parent_id=payload.get("parent_id"))
         state.last_reply_id = reply_id
         state.last_reply_agent = event.get("agent")
         if event.get("agent"):
@@ -174,38 +275,57 @@ def reduce_event(state: FeedState, event: dict[str, Any]) -> None:
     elif action == "UPVOTE":
         if target_id:
             state.votes[target_id] = state.votes.get(target_id, 0) + int(payload.get("delta", 1))
+        if event.get("agent"):
+            state.upvotes_used[event["agent"]] = state.upvotes_used.get(event["agent"], 0) + 1
     elif action == "MODERATE":
         pass
     elif action == "REWRITE":
         pass
 
 
-def _build_context(state: FeedState, platform: str, risk: str, topic: str | None) -> str:
-    recent_posts = list(state.posts.values())[-5:]
-    recent_comments = list(state.comments.values())[-5:]
+def _build_context(
+    state: FeedState,
+    platform: str,
+    risk: str,
+    topic: str | None,
+    budget: ContextBudget | None = None,
+    agents: tuple[str, ...] = DUO,
+) -> str:
+    budget = budget or ContextBudget()
+    limit = min(5, budget.recent_items)
+    recent_posts = [budget.clip_item(p) for p in state.recent("post", limit)]
+    recent_comments = [budget.clip_item(c) for c in state.recent("comment", limit)]
     remaining_comments = max(0, state.max_comments - len(state.comments))
     last_comment = recent_comments[-1] if recent_comments else None
     last_post = recent_posts[-1] if recent_posts else None
-    last_reply = state.replies.get(state.last_reply_id or "", {})
-    return "\n".join(
+    last_reply = budget.clip_item(state.replies.get(state.last_reply_id or "", {}))
+    topics = state.sorted_topics[-budget.summary_lines :]
+    header = [
+        f"Platform: {platform}",
+        f"Risk level: {risk}",
+        f"Topic constraint: {topic or 'any'}",
+    ]
+    feed = "\n".join(
         [
-            f"Platform: {platform}",
-            f"Risk level: {risk}",
-            f"Topic constraint: {topic or 'any'}",
             f"Recent posts: {json.dumps(recent_posts)}",
             f"Recent comments: {json.dumps(recent_comments)}",
             f"Last comment to reply to: {json.dumps(last_comment)}",
             f"Last reply to address (if any): {json.dumps(last_reply)}",
             f"Current post to discuss: {json.dumps(last_post)}",
             f"Post keyword: {state.post_keyword}",
-            f"Used topics: {sorted(state.topics)}",
-            "Rule: Create ONE post, then exactly ONE comment. After that, only replies between AgentA and AgentB.",
-            f"Allowed actions: CREATE_POST, COMMENT, REPLY, UPVOTE. Max posts: {state.max_posts}. Comments remaining: {remaining_comments}. Max replies: {state.max_replies}.",
-            "Replies must directly address the last comment or reply.",
-            "Comments and replies must directly reference the current post topic (use its key terms).",
-            "Choose ONE action. Avoid repeating identical topics.",
+            f"Used topics: {topics}",
         ]
     )
+    rules = [
+        f"Rule: Create ONE post, then exactly ONE comment. After that, only replies between {join_agents(agents)}.",
+        f"Allowed actions: CREATE_POST, COMMENT, REPLY, UPVOTE. Max posts: {state.max_posts}. Comments remaining: {remaining_comments}. Max replies: {state.max_replies}.",
+        "Replies must directly address the last comment or reply.",
+        "Comments and replies must directly reference the current post topic (use its key terms).",
+        "Choose ONE action. Avoid repeating identical topics.",
+    ]
+    fixed_tokens = estimate_tokens(molt_system(agents)) + estimate_tokens("\n".join(header + rules))
+    feed = clip_text(feed, max(0, budget.max_tokens - fixed_tokens) * CHARS_PER_TOKEN)
+    return "\n".join(header + [feed] + rules)
 
 
 def _call_agent(
@@ -214,24 +334,32 @@ def _call_agent(
     agent: str,
     context: str,
     temperature: float,
+    persona: str | None = None,
+    stats: StructuredStats = STATS,
+    agents: tuple[str, ...] = DUO,
 ) -> MoltAction:
+    system = molt_system(agents) + f"\nYou are {agent}."
+    if persona:
+        system += f" {persona}"
     messages = [
-        {"role": "system", "content": MOLT_SYSTEM + f"\nYou are {agent}."},
+        {"role": "system", "content": system},
         {"role": "user", "content": context},
     ]
 
-    resp = llm.chat(messages, temperature=temperature, max_tokens=500, response_format={"type": "json_object"})
-    content = resp["choices"][0]["message"]["content"]
+    action, _ = structured_chat(
+        llm,
+        messages,
+        MoltAction,
+        temperature=temperature,
+        max_tokens=500,
+        correction="Return ONLY valid JSON matching schema.",
+        stats=stats,
+    )
+    return action
 
-    try:
-        data = json.loads(content)
-        return MoltAction.model_validate(data)
-    except (json.JSONDecodeError, ValidationError):
-        correction = messages + [{"role": "user", "content": "Return ONLY valid JSON matching schema."}]
-        resp = llm.chat(correction, temperature=temperature, max_tokens=500, response_format={"type": "json_object"})
-        content = resp["choices"][0]["message"]["content"]
-        data = json.loads(content)
-        return MoltAction.model_validate(data)
+
+def _agent_for_turn(idx: int) -> str:
+    return "AgentA" if idx % 2 == 0 else "AgentB"
 
 
 def simulate_molt(
@@ -244,53 +372,112 @@ def simulate_molt(
     cadence: str,
     stop_on: str,
     event_cb,
+    budget: ContextBudget | None = None,
+    speculative: bool = True,
+    state: FeedState | None = None,
+    start_turn: int = 0,
+    on_turn: Callable[[int, FeedState], None] | None = None,
+    stats: StructuredStats = STATS,
 ) -> dict[str, Any]:
-    state = FeedState()
+    """Run the two-agent feed simulation.
+
+    With ``speculative`` on, the next agent's LLM call is started as soon as the current
+    event has been reduced, so it overlaps with ``event_cb`` (persist + render) and the
+    cadence sleep. The speculative call is only used if the context rebuilt at the start of
+    the next turn matches the one it was issued with; otherwise it is discarded.
+
+    ``state`` and ``start_turn`` continue a run from a rebuilt feed. ``on_turn(turns_done, state)``
+    is called at every turn boundary (and once at the end) so callers can checkpoint.
+    Structured-output counters go to ``stats``; pass a fresh one to report a single run.
+    """
+    state = state if state is not None else FeedState()
     events: list[dict[str, Any]] = []
+    speculation = {"hits": 0, "misses": 0}
+    pending: tuple[str, str, Future] | None = None
 
     delay = {"fast": 0.0, "normal": 0.2, "slow": 0.6}.get(cadence, 0.0)
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="molt-speculate") if speculative else None
 
-    for idx in range(turns):
-        agent = "AgentA" if idx % 2 == 0 else "AgentB"
-        context = _build_context(state, platform, risk, topic)
-        try:
-            action = _call_agent(llm, agent=agent, context=context, temperature=0.6)
-        except Exception as exc:  # noqa: BLE001
-            event = {
-                "agent": "ERROR",
-                "action": "ERROR",
-                "target_id": None,
-                "payload": {"error": str(exc)},
-            }
-            event_cb(event)
-            events.append(event)
-            continue
-
-        event = _action_to_event(action, state, agent)
-        if event:
-            event_cb(event)
-            events.append(event)
-            reduce_event(state, event)
-            if event["action"] == "WRAPUP":
-                break
-
-        if action.action == "MODERATE" and action.moderation:
-            rewrite_event = {
-                "agent": "SYSTEM",
-                "action": "REWRITE",
-                "target_id": action.moderation.target_id,
-                "payload": {"rewrite": action.moderation.rewrite},
-            }
-            event_cb(rewrite_event)
-            events.append(rewrite_event)
+    turns_done = start_turn
+    try:
+        for idx in range(start_turn, turns):
+            if on_turn is not None and idx > start_turn:
+                on_turn(turns_done, state)
+            turns_done = idx + 1
+            turn_started = time.monotonic()
+            agent = _agent_for_turn(idx)
+            with span("prompt.build", agent=agent):
+                context = _build_context(state, platform, risk, topic, budget)
+            future: Future | None = None
+            if pending is not None:
+                if pending[0] == agent and pending[1] == context:
+                    future = pending[2]
+                    speculation["hits"] += 1
+                else:
+                    speculation["misses"] += 1
+                pending = None
+            try:
+                if future is not None:
+                    action = future.result()
+                else:
+                    action = _call_agent(llm, agent=agent, context=context, temperature=0.6, stats=stats)
+            except Exception as exc:  # noqa: BLE001
+                event = {
+                    "agent": "ERROR",
+                    "action": "ERROR",
+                    "target_id": None,
+                    "payload": {"error": str(exc)},
+                }
+                event_cb(event)
+                events.append(event)
+                continue
+
+            latency = time.monotonic() - turn_started
+            record("molt.turn", latency, turn=idx, agent=agent, action=action.action, speculated=future is not None)
+            event = _action_to_event(action, state, agent)
+            if event:
+                events.append(event)
+                reduce_event(state, event)
+
+            if executor is not None and idx + 1 < turns and not (event and event["action"] == "WRAPUP"):
+                next_agent = _agent_for_turn(idx + 1)
+                next_context = _build_context(state, platform, risk, topic, budget)
+                pending = (
+                    next_agent,
+                    next_context,
+                    executor.submit(
+                        propagate(_call_agent), llm, agent=next_agent, context=next_context, temperature=0.6, stats=stats
+                    ),
+                )
+
+            if event:
+                event_cb(event)
+                if event["action"] == "WRAPUP":
+                    break
+
+            if action.action == "MODERATE" and action.moderation:
+                rewrite_event = {
+                    "agent": "SYSTEM",
+                    "action": "REWRITE",
+                    "target_id": action.moderation.target_id,
+                    "payload": {"rewrite": action.moderation.rewrite},
+                }
+                event_cb(rewrite_event)
+                events.append(rewrite_event)
 
-        if action.action == "WRAPUP":
-            continue
+            if action.action == "WRAPUP":
+                continue
 
-        if delay:
-            time.sleep(delay)
+            remaining = delay - (time.monotonic() - turn_started)
+            if remaining > 0:
+                time.sleep(remaining)
+        if on_turn is not None:
+            on_turn(turns_done, state)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-    return {"events": events, "state": state}
+    return {"events": events, "state": state, "speculation": speculation}
 
 
 def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[str, Any] | None:
@@ -304,8 +491,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
                 target = state.last_reply_id or state.last_comment_id
                 reply_id = state.next_id("reply")
                 content = action.content or "I agree with your point."
-                last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-                if _too_similar(content, last_reply):
+                if state.is_repeat(content):
                     content = f"Another angle: {content}"
                 return {
                     "agent": agent,
@@ -318,7 +504,6 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
                     },
                 }
             return None
-        state.upvotes_used[agent] = state.upvotes_used.get(agent, 0) + 1
         return {
             "agent": agent,
             "action": "UPVOTE",
@@ -330,8 +515,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
         target = state.last_reply_id or state.last_comment_id
         reply_id = state.next_id("reply")
         content = action.content or "I agree with your point."
-        last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-        if _too_similar(content, last_reply):
+        if state.is_repeat(content):
             content = f"Another angle: {content}"
         return {
             "agent": agent,
@@ -366,8 +550,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
                 target = state.last_reply_id or state.last_comment_id
                 reply_id = state.next_id("reply")
                 content = action.content or "I agree with your point."
-                last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-                if _too_similar(content, last_reply):
+                if state.is_repeat(content):
                     content = f"Another angle: {content}"
                 return {
                     "agent": agent,
@@ -381,7 +564,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
                 }
             return _upvote_event(target_post)
         topic_key = _normalize_topic(action.title, action.content)
-        if topic_key and topic_key in state.topics:
+        if topic_key and (topic_key in state.topics or state.is_repeat_topic(action.title, action.content)):
             # Avoid duplicate topics; fallback to upvote
             target = state.latest_post_id()
             if not target:
@@ -390,8 +573,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
                 target = state.last_reply_id or state.last_comment_id
                 reply_id = state.next_id("reply")
                 content = action.content or "I agree with your point."
-                last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-                if _too_similar(content, last_reply):
+                if state.is_repeat(content):
                     content = f"Another angle: {content}"
                 return {
                     "agent": agent,
@@ -464,8 +646,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
             action.content = f"On your point about {last_key}, {action.content}"
         if post_key and post_key not in action.content.lower():
             action.content = f"On {post_key}, how do you see this evolving?"
-        recent_replies = _recent_reply_texts(state, limit=2)
-        if any(_too_similar(action.content, r) for r in recent_replies):
+        if state.is_repeat(action.content):
             focus = post_key or last_key or "this"
             action.content = _short_followup(focus)
         # Per-agent starter diversification
@@ -487,8 +668,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
             target = state.last_reply_id or state.last_comment_id
             reply_id = state.next_id("reply")
             content = action.content or "I agree with your point."
-            last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-            if _too_similar(content, last_reply):
+            if state.is_repeat(content):
                 content = f"Another angle: {content}"
             return {
                 "agent": agent,
@@ -508,8 +688,7 @@ def _action_to_event(action: MoltAction, state: FeedState, agent: str) -> dict[s
             target = state.last_reply_id or state.last_comment_id
             reply_id = state.next_id("reply")
             content = action.content or "I agree with your point."
-            last_reply = state.replies.get(state.last_reply_id or "", {}).get("content", "")
-            if _too_similar(content, last_reply):
+            if state.is_repeat(content):
                 content = f"Another angle: {content}"
             return {
                 "agent": agent,
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from social_duo.core.molt_engine import FeedState, reduce_event
+from social_duo.storage.events import (
+    add_snapshot,
+    event_ids_after,
+    latest_checkpoint,
+    list_events_after,
+    nearest_snapshot,
+    row_to_event,
+    save_checkpoint,
+)
+
+SNAPSHOT_EVERY = 50
+# Each snapshot holds the full feed log, so keeping them all grows storage quadratically:
+# keep the latest few, and one per SNAPSHOT_SPACING intervals before that so seeks stay bounded.
+SNAPSHOT_KEEP = 3
+SNAPSHOT_SPACING = 10
+
+
+@dataclass
+class ReplayPoint:
+    state: FeedState
+    event_count: int
+    last_event_id: int
+    turn: int
+
+
+def state_at(db_path: Path, run_id: int, event_count: int | None = None) -> ReplayPoint:
+    """Rebuild a run's FeedState after ``event_count`` events (default: all of them).
+
+    Loads the nearest snapshot at or before that point and reduces only the events after it.
+    The latest snapshots are all kept, so resuming costs at most the snapshot interval; older
+    ones are thinned to one per ``SNAPSHOT_SPACING`` intervals, which bounds any other seek.
+
+    ``turn`` comes from the run's checkpoint, which the writer updates every turn, so turns
+    that produced no event are counted. Events past the checkpoint (a turn cut short by a
+    crash) and seeks that stop before it fall back to one turn per agent event.
+    """
+    snapshot = nearest_snapshot(db_path, run_id, event_count)
+    if snapshot:
+        point = ReplayPoint(
+            state=FeedState.from_snapshot(json.loads(snapshot["state_json"])),
+            event_count=snapshot["event_count"],
+            last_event_id=snapshot["last_event_id"],
+            turn=snapshot["turn"],
+        )
+    else:
+        point = ReplayPoint(state=FeedState(), event_count=0, last_event_id=0, turn=0)
+    checkpoint = latest_checkpoint(db_path, run_id)
+    if checkpoint and checkpoint["event_count"] < point.event_count:
+        checkpoint = None
+
+    limit = None if event_count is None else max(0, event_count - point.event_count)
+    for row in list_events_after(db_path, run_id, point.last_event_id, limit):
+        if checkpoint and point.event_count == checkpoint["event_count"]:
+            point.turn = checkpoint["turn"]
+        event = row_to_event(row)
+        reduce_event(point.state, event)
+        point.event_count += 1
+        point.last_event_id = int(row["id"])
+        if event["agent"] != "SYSTEM":
+            point.turn += 1
+    if checkpoint and point.event_count == checkpoint["event_count"]:
+        point.turn = checkpoint["turn"]
+    return point
+
+
+def seek(db_path: Path, run_id: int, event_count: int) -> tuple[int, int]:
+    """``(events skipped, last event id)`` after ``event_count`` events, without rebuilding state.
+
+    Starts at the nearest snapshot's position and walks only the event ids past it, so a
+    viewer that streams from there pays for neither the snapshot's state nor a replay.
+    """
+    snapshot = nearest_snapshot(db_path, run_id, event_count, with_state=False)
+    count, last_id = (snapshot["event_count"], snapshot["last_event_id"]) if snapshot else (0, 0)
+    ids = event_ids_after(db_path, run_id, last_id, max(0, event_count - count))
+    return count + len(ids), ids[-1] if ids else last_id
+
+
+class SnapshotWriter:
+    """``on_turn`` hook for simulate_molt that writes a snapshot every ``every`` persisted events.
+
+    The ``keep`` latest snapshots are retained, plus one per ``spacing`` intervals before
+    them (see ``add_snapshot``). Every turn also updates a
+    small checkpoint row with the exact turn reached, which ``state_at`` resumes from.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        run_id: int,
+        *,
+        every: int = SNAPSHOT_EVERY,
+        keep: int = SNAPSHOT_KEEP,
+        spacing: int = SNAPSHOT_SPACING,
+        event_count: int = 0,
+        last_event_id: int = 0,
+    ) -> None:
+        self.db_path = db_path
+        self.run_id = run_id
+        self.every = max(1, every)
+        self.keep = max(1, keep)
+        self.spacing = max(1, spacing)
+        self.event_count = event_count
+        self.last_event_id = last_event_id
+        self.snapshot_count = event_count
+        self.snapshots = 0
+        self._turn = 0
+        self._state: FeedState | None = None
+        self._checkpoint: tuple[int, int] | None = None
+        self._checkpoint_id: int | None = None
+
+    def record(self, event_id: int) -> None:
+        self.event_count += 1
+        self.last_event_id = event_id
+
+    def __call__(self, turn: int, state: FeedState) -> None:
+        self._turn, self._state = turn, state
+        if self.event_count - self.snapshot_count >= self.every:
+            self._write()
+        self._save_checkpoint()
+
+    def flush(self) -> None:
+        if self._state is not None and self.event_count > self.snapshot_count:
+            self._write()
+        if self._state is not None:
+            self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        if self._checkpoint == (self._turn, self.event_count):
+            return
+        self._checkpoint_id = save_checkpoint(
+            self.db_path,
+            run_id=self.run_id,
+            turn=self._turn,
+            event_count=self.event_count,
+            last_event_id=self.last_event_id,
+            checkpoint_id=self._checkpoint_id,
+        )
+        self._checkpoint = (self._turn, self.event_count)
+
+    def _write(self) -> None:
+        add_snapshot(
+            self.db_path,
+            run_id=self.run_id,
+            event_count=self.event_count,
+            last_event_id=self.last_event_id,
+            turn=self._turn,
+            state=self._state.to_snapshot(),
+            keep=self.keep,
+            spacing=self.every * self.spacing,
+        )
+        self.snapshot_count = self.event_count
+        self.snapshots += 1
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import heapq
+import math
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+
+from social_duo.core.context_budget import ContextBudget
+from social_duo.core.molt_engine import FeedState, _action_to_event, _build_context, _call_agent, reduce_event
+from social_duo.core.spans import propagate
+from social_duo.providers.llm import LLMClient
+
+
+@dataclass(frozen=True)
+class AgentPersona:
+    name: str
+    persona: str = ""
+    temperature: float = 0.6
+    activity: float = 1.0
+
+
+@dataclass
+class Feed:
+    feed_id: str
+    index: int
+    state: FeedState
+    event_count: int = 0
+    busy: bool = False
+
+
+def default_personas(count: int) -> list[AgentPersona]:
+    return [AgentPersona(name=f"Agent{idx + 1}") for idx in range(count)]
+
+
+class TurnScheduler(Protocol):
+    def pick(self, feeds: list[Feed], personas: list[AgentPersona]) -> tuple[Feed, AgentPersona] | None:
+        """Choose the next (feed, agent) among idle feeds, or None to wait for in-flight turns."""
+        ...
+
+
+class RoundRobinScheduler:
+    def __init__(self) -> None:
+        self._next_feed = 0
+        self._agent_cursor = 0
+
+    def pick(self, feeds: list[Feed], personas: list[AgentPersona]) -> tuple[Feed, AgentPersona] | None:
+        if not feeds:
+            return None
+        # next idle feed at or after the cursor, wrapping around
+        feed = min(feeds, key=lambda f: (f.index < self._next_feed, f.index))
+        persona = personas[self._agent_cursor % len(personas)]
+        self._next_feed = feed.index + 1
+        self._agent_cursor += 1
+        return feed, persona
+
+
+class PoissonScheduler:
+    """Agents arrive as independent Poisson processes (rate scaled by activity) on virtual time."""
+
+    def __init__(self, rate: float = 1.0, seed: int | None = None) -> None:
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self._arrivals: list[tuple[float, int]] = []
+        self._clock = 0.0
+
+    def _schedule(self, idx: int, persona: AgentPersona) -> None:
+        wait_time = self.rng.expovariate(max(1e-9, self.rate * persona.activity))
+        heapq.heappush(self._arrivals, (self._clock + wait_time, idx))
+
+    def pick(self, feeds: list[Feed], personas: list[AgentPersona]) -> tuple[Feed, AgentPersona] | None:
+        if not feeds:
+            return None
+        if not self._arrivals:
+            for idx, persona in enumerate(personas):
+                self._schedule(idx, persona)
+        self._clock, idx = heapq.heappop(self._arrivals)
+        self._schedule(idx, personas[idx])
+        return self.rng.choice(feeds), personas[idx]
+
+
+class ActivityPriorityScheduler:
+    """Busier feeds and more active agents are picked proportionally more often."""
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.rng = random.Random(seed)
+
+    def pick(self, feeds: list[Feed], personas: list[AgentPersona]) -> tuple[Feed, AgentPersona] | None:
+        if not feeds:
+            return None
+        feed = self.rng.choices(feeds, weights=[f.event_count + 1 for f in feeds])[0]
+        persona = self.rng.choices(personas, weights=[p.activity for p in personas])[0]
+        return feed, persona
+
+
+SCHEDULERS: dict[str, Callable[..., TurnScheduler]] = {
+    "round-robin": RoundRobinScheduler,
+    "poisson": PoissonScheduler,
+    "activity": ActivityPriorityScheduler,
+}
+
+
+@dataclass
+class SwarmStats:
+    turns: int = 0
+    events: int = 0
+    errors: int = 0
+    dropped: int = 0
+    elapsed: float = 0.0
+    per_feed: dict[str, int] = field(default_factory=dict)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "events": self.events,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "elapsed_s": round(self.elapsed, 4),
+            "events_per_sec": round(self.events / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+
+
+def simulate_swarm(
+    *,
+    llm: LLMClient,
+    personas: list[AgentPersona],
+    feeds: int,
+    turns: int,
+    platform: str,
+    risk: str,
+    topic: str | None,
+    event_cb: Callable[[dict[str, Any]], None],
+    scheduler: TurnScheduler | None = None,
+    concurrency: int = 8,
+    budget: ContextBudget | None = None,
+    feed_limits: dict[str, int] | None = None,
+) -> dict[str, Any]:
+    """Run many agents over many feeds with up to ``concurrency`` LLM calls in flight.
+
+    Each feed keeps its own FeedState and is reduced exactly like simulate_molt: a feed has at
+    most one turn in flight, so events within a feed stay strictly ordered. ``turns`` is the
+    total number of agent turns across all feeds. Events carry a ``feed_id``.
+
+    Prompts name the personas as the feed's participants. Unless ``feed_limits`` sets
+    ``max_replies``, each feed allows enough replies for its share of ``turns``; turns whose
+    action the reducer rejects are counted as ``dropped``.
+    """
+    if not personas:
+        raise ValueError("At least one persona is required.")
+    if feeds < 1:
+        raise ValueError("At least one feed is required.")
+    scheduler = scheduler or RoundRobinScheduler()
+    names = tuple(persona.name for persona in personas)
+    limits = {"max_replies": max(2, math.ceil(turns / feeds)), **(feed_limits or {})}
+    all_feeds = [Feed(feed_id=f"F{idx + 1}", index=idx, state=FeedState(**limits)) for idx in range(feeds)]
+    stats = SwarmStats(per_feed={f.feed_id: 0 for f in all_feeds})
+    events: list[dict[str, Any]] = []
+
+    def _emit(feed: Feed, event: dict[str, Any]) -> None:
+        event["feed_id"] = feed.feed_id
+        events.append(event)
+        feed.event_count += 1
+        stats.events += 1
+        stats.per_feed[feed.feed_id] += 1
+        event_cb(event)
+
+    started = time.perf_counter()
+    in_flight: dict[Future, tuple[Feed, AgentPersona]] = {}
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="molt-swarm") as pool:
+        while stats.turns < turns or in_flight:
+            while stats.turns < turns and len(in_flight) < concurrency:
+                pick = scheduler.pick([f for f in all_feeds if not f.busy], personas)
+                if pick is None:
+                    break
+                feed, persona = pick
+                context = _build_context(feed.state, platform, risk, topic, budget, agents=names)
+                future = pool.submit(
+                    propagate(_call_agent),
+                    llm,
+                    agent=persona.name,
+                    context=context,
+                    temperature=persona.temperature,
+                    persona=persona.persona or None,
+                    agents=names,
+                )
+                feed.busy = True
+                in_flight[future] = (feed, persona)
+                stats.turns += 1
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                feed, persona = in_flight.pop(future)
+                feed.busy = False
+                try:
+                    action = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    stats.errors += 1
+                    _emit(feed, {"agent": "ERROR", "action": "ERROR", "target_id": None, "payload": {"error": str(exc)}})
+                    continue
+
+                event = _action_to_event(action, feed.state, persona.name)
+                if event is None:
+                    stats.dropped += 1
+                else:
+                    reduce_event(feed.state, event)
+                    _emit(feed, event)
+
+                if action.action == "MODERATE" and action.moderation:
+                    _emit(
+                        feed,
+                        {
+                            "agent": "SYSTEM",
+                            "action": "REWRITE",
+                            "target_id": action.moderation.target_id,
+                            "payload": {"rewrite": action.moderation.rewrite},
+                        },
+                    )
+    stats.elapsed = time.perf_counter() - started
+
+    return {
+        "events": events,
+        "feeds": {f.feed_id: f.state for f in all_feeds},
+        "stats": stats.summary(),
+        "per_feed": stats.per_feed,
+    }
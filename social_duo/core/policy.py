@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import threading
+import weakref
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+from social_duo.core.scoring import BannedPhraseMatcher
+from social_duo.types.schemas import AppConfig, PlatformConstraint
+
+
+@dataclass(frozen=True)
+class PolicyBundle:
+    """Read-only view of an AppConfig with prompt fragments serialized once.
+
+    Configs are treated as immutable once loaded (updates build a new AppConfig),
+    so a bundle is built once per config instance and shared by every agent and loop.
+    """
+
+    constraints: Mapping[str, PlatformConstraint]
+    constraint_json: Mapping[str, str]
+    target_json: Mapping[str, str]
+    brand_voice_json: str
+    banned_matcher: BannedPhraseMatcher
+    tone: str
+    donts: tuple[str, ...]
+
+    def constraint(self, platform: str) -> PlatformConstraint:
+        try:
+            return self.constraints[platform]
+        except KeyError:
+            raise ValueError(f"Unsupported platform: {platform}") from None
+
+    def constraints_json(self, target: str) -> str:
+        """JSON object of constraints keyed by platform; target may be a platform or "all"."""
+        try:
+            return self.target_json[target]
+        except KeyError:
+            raise ValueError(f"Unsupported platform: {target}") from None
+
+
+def compile_policy(config: AppConfig, previous: PolicyBundle | None = None) -> PolicyBundle:
+    """Build the bundle; pieces whose inputs match ``previous`` (e.g. the banned-phrase matcher) are reused."""
+    constraints = {
+        name: getattr(config.platform_constraints, name) for name in type(config.platform_constraints).model_fields
+    }
+    dumps = {name: c.model_dump() for name, c in constraints.items()}
+    target_json = {name: json.dumps({name: dump}) for name, dump in dumps.items()}
+    target_json["all"] = json.dumps(dumps)
+    banned = tuple(config.brand_voice.banned_phrases)
+    if previous is not None and previous.banned_matcher.banned == banned:
+        matcher = previous.banned_matcher
+    else:
+        matcher = BannedPhraseMatcher(list(banned))
+    return PolicyBundle(
+        constraints=MappingProxyType(constraints),
+        constraint_json=MappingProxyType({name: json.dumps(dump) for name, dump in dumps.items()}),
+        target_json=MappingProxyType(target_json),
+        brand_voice_json=json.dumps(config.brand_voice.model_dump()),
+        banned_matcher=matcher,
+        tone=config.brand_voice.tone,
+        donts=tuple(config.brand_voice.dont),
+    )
+
+
+_CACHE: dict[int, tuple[weakref.ref, PolicyBundle]] = {}
+_LOCK = threading.Lock()
+
+
+def _cached(config: AppConfig) -> PolicyBundle | None:
+    entry = _CACHE.get(id(config))
+    if entry is not None and entry[0]() is config:
+        return entry[1]
+    return None
+
+
+def get_policy(config: AppConfig, *, previous: AppConfig | None = None) -> PolicyBundle:
+    """Bundle for ``config``, compiled once per instance; ``previous`` lets a reload reuse its pieces."""
+    key = id(config)
+    policy = _cached(config)
+    if policy is not None:
+        return policy
+    policy = compile_policy(config, _cached(previous) if previous is not None else None)
+    with _LOCK:
+        _CACHE[key] = (weakref.ref(config, lambda _ref, key=key: _CACHE.pop(key, None)), policy)
+    return policy
@@ -1,15 +1,24 @@
 from __future__ import annotations
 
 import json
+import queue
+import sys
+import threading
+import time
 from typing import Any
 
-from rich.console import Console
+from rich.console import Console, Group, RenderableType
+from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 
+from social_duo.core.spans import propagate, traced
+
 console = Console()
+err_console = Console(stderr=True)
 
 
+@traced("render")
 def render_post_output(output: dict[str, Any], *, json_mode: bool, verbose: bool) -> None:
     if json_mode:
         console.print_json(json.dumps(output))
@@ -38,6 +47,7 @@ def render_post_output(output: dict[str, Any], *, json_mode: bool, verbose: bool
             console.print(f"[{step['agent']} {step['role']}] {step['content']}")
 
 
+@traced("render")
 def render_reply_output(output: dict[str, Any], *, json_mode: bool, verbose: bool) -> None:
     if json_mode:
         console.print_json(json.dumps(output))
@@ -66,6 +76,7 @@ def render_reply_output(output: dict[str, Any], *, json_mode: bool, verbose: boo
             console.print(f"[{step['agent']} {step['role']}] {step['content']}")
 
 
+@traced("render")
 def render_discuss_output(output: dict[str, Any], *, json_mode: bool, verbose: bool) -> None:
     if json_mode:
         console.print_json(json.dumps(output))
@@ -101,42 +112,181 @@ def render_discuss_output(output: dict[str, Any], *, json_mode: bool, verbose: b
             console.print(artifact["content"])
 
 
-def render_molt_event(event: dict[str, Any], *, verbose: bool) -> None:
+def molt_event_renderables(event: dict[str, Any], *, verbose: bool) -> list[RenderableType]:
     action = event.get("action")
     agent = event.get("agent")
     payload = event.get("payload", {})
     target_id = event.get("target_id")
+    out: list[RenderableType] = []
 
     if verbose and action not in {"ERROR"}:
-        console.print(f"[MyVillage meta] {agent} -> {action}")
+        out.append(f"[MyVillage meta] {agent} -> {action}")
 
     if action == "CREATE_POST":
         title = payload.get("title") or ""
         content = payload.get("content") or ""
         label = f"[MyVillage POST {payload.get('post_id')}] (Agent: {agent})"
-        console.print(Panel.fit(label, style="bold green"))
+        out.append(Panel.fit(label, style="bold green"))
         if title:
-            console.print(title)
-        console.print(content)
+            out.append(title)
+        out.append(content)
     elif action == "COMMENT":
         label = f"[MyVillage COMMENT {payload.get('comment_id')}] on {payload.get('post_id')} (Agent: {agent})"
-        console.print(Panel.fit(label, style="bold blue"))
-        console.print(payload.get("content", ""))
+        out.append(Panel.fit(label, style="bold blue"))
+        out.append(payload.get("content", ""))
     elif action == "REPLY":
         label = f"[MyVillage REPLY {payload.get('reply_id')}] on {payload.get('parent_id')} (Agent: {agent})"
-        console.print(Panel.fit(label, style="bold cyan"))
-        console.print(payload.get("content", ""))
+        out.append(Panel.fit(label, style="bold cyan"))
+        out.append(payload.get("content", ""))
     elif action == "UPVOTE":
-        console.print(f"[MyVillage UPVOTE] {agent} upvoted {target_id} (+{payload.get('delta', 1)})")
+        out.append(f"[MyVillage UPVOTE] {agent} upvoted {target_id} (+{payload.get('delta', 1)})")
     elif action == "MODERATE":
-        console.print(Panel.fit(f"[MyVillage MODERATE] {agent} flagged {target_id}", style="bold red"))
-        console.print(payload.get("reason", ""))
-        console.print(f"Rewrite: {payload.get('rewrite', '')}")
+        out.append(Panel.fit(f"[MyVillage MODERATE] {agent} flagged {target_id}", style="bold red"))
+        out.append(payload.get("reason", ""))
+        out.append(f"Rewrite: {payload.get('rewrite', '')}")
     elif action == "REWRITE":
-        console.print(Panel.fit(f"[MyVillage REWRITE] {target_id}", style="bold yellow"))
-        console.print(payload.get("rewrite", ""))
+        out.append(Panel.fit(f"[MyVillage REWRITE] {target_id}", style="bold yellow"))
+        out.append(payload.get("rewrite", ""))
     elif action == "WRAPUP":
-        console.print(Panel.fit("[MyVillage WRAPUP]", style="bold magenta"))
+        out.append(Panel.fit("[MyVillage WRAPUP]", style="bold magenta"))
     elif action == "ERROR":
-        console.print(Panel.fit("[MyVillage ERROR]", style="bold red"))
-        console.print(payload.get("error", ""))
+        out.append(Panel.fit("[MyVillage ERROR]", style="bold red"))
+        out.append(payload.get("error", ""))
+    return out
+
+
+@traced("render")
+def render_molt_event(event: dict[str, Any], *, verbose: bool) -> None:
+    for renderable in molt_event_renderables(event, verbose=verbose):
+        console.print(renderable)
+
+
+def molt_event_line(event: dict[str, Any], *, ndjson: bool) -> str:
+    """One compact line per event, with no rich layout: JSON, or ``ACTION id agent: text``."""
+    if ndjson:
+        record = {key: event.get(key) for key in ("agent", "action", "target_id", "payload")}
+        return json.dumps(record, separators=(",", ":"))
+    payload = event.get("payload", {})
+    item_id = payload.get("post_id") or payload.get("comment_id") or payload.get("reply_id") or event.get("target_id")
+    text = payload.get("title") or payload.get("content") or payload.get("rewrite") or payload.get("error") or ""
+    text = " ".join(str(text).split())
+    if len(text) > 120:
+        text = text[:117] + "..."
+    line = f"{event.get('action')} {item_id or '-'} {event.get('agent')}"
+    return f"{line}: {text}" if text else line
+
+
+_STOP = object()
+
+
+class MoltRenderer:
+    """Renders molt events on a background thread so the simulation never waits on the terminal.
+
+    ``submit`` only enqueues. The render thread collects whatever arrives within one frame
+    (``1 / fps`` seconds) and writes it in a single call: ``rich`` prints the frame's panels
+    under a Live status line, ``quiet`` writes compact text lines and ``ndjson`` one JSON
+    object per event. ``close`` drains the queue, so nothing is lost on exit.
+    """
+
+    MODES = ("rich", "quiet", "ndjson")
+
+    def __init__(self, mode: str = "rich", *, verbose: bool = False, fps: float = 20.0, max_queued: int = 10_000) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown render mode {mode!r}")
+        self.mode = mode
+        self.verbose = verbose
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.rendered = 0
+        self.frames = 0
+        self._error: BaseException | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queued)
+        self._thread = threading.Thread(target=propagate(self._run), name="molt-render", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: dict[str, Any]) -> None:
+        self._queue.put(event)
+
+    def close(self) -> None:
+        self._stop()
+        if self._error is not None:
+            raise self._error
+
+    def _stop(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self) -> "MoltRenderer":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        # A render failure must not mask an exception already leaving the block.
+        if exc[0] is None:
+            self.close()
+        else:
+            self._stop()
+
+    def _status(self) -> str:
+        return f"[dim]{self.rendered} events rendered, {self._queue.qsize()} queued[/dim]"
+
+    def _run(self) -> None:
+        live = None
+        if self.mode == "rich" and console.is_terminal:
+            live = Live(self._status(), console=console, refresh_per_second=max(1.0, 1.0 / (self.interval or 0.05)), transient=True)
+            live.start()
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.interval
+                while batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                if batch[-1] is _STOP:
+                    stopping = True
+                    batch.pop()
+                if batch and self._error is None:
+                    try:
+                        self._flush(batch)
+                    except Exception as exc:  # noqa: BLE001
+                        # Keep draining so producers never block on a full queue; close() re-raises.
+                        self._error = exc
+                if live is not None:
+                    live.update(self._status())
+        finally:
+            if live is not None:
+                live.stop()
+
+    @traced("render")
+    def _flush(self, batch: list[dict[str, Any]]) -> None:
+        if self.mode == "rich":
+            console.print(Group(*(r for event in batch for r in molt_event_renderables(event, verbose=self.verbose))))
+        else:
+            sys.stdout.write("".join(molt_event_line(event, ndjson=self.mode == "ndjson") + "\n" for event in batch))
+            sys.stdout.flush()
+        self.rendered += len(batch)
+        self.frames += 1
+
+
+def render_profile(summary: dict[str, Any]) -> None:
+    """Per-stage latency table on stderr, so --json output stays parseable."""
+    table = Table(title=f"Profile (wall {summary['wall_ms']:.1f} ms)", show_lines=False)
+    for column in ("Stage", "Count", "Total ms", "Mean ms", "Max ms", "% wall"):
+        table.add_column(column, justify="left" if column == "Stage" else "right")
+    wall = summary["wall_ms"] or 1.0
+    for name, row in summary["stages"].items():
+        table.add_row(
+            name,
+            str(row["count"]),
+            f"{row['total_ms']:.1f}",
+            f"{row['mean_ms']:.2f}",
+            f"{row['max_ms']:.1f}",
+            f"{100 * row['total_ms'] / wall:.0f}%",
+        )
+    err_console.print(table)
+    err_console.print("Stages nest (llm.call contains llm.queue and llm.network) and overlap across threads.", style="dim")
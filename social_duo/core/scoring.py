@@ -25,6 +25,23 @@ def contains_banned_phrase(text: str, banned: list[str]) -> list[str]:
     return hits
 
 
+class BannedPhraseMatcher:
+    """Single compiled pass over the text; falls back to per-phrase checks only on a hit."""
+
+    def __init__(self, banned: list[str]) -> None:
+        self.banned = tuple(banned)
+        phrases = sorted({p.lower() for p in banned if p}, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(p) for p in phrases)) if phrases else None
+
+    def hits(self, text: str) -> list[str]:
+        if self._pattern is None:
+            return []
+        lower = text.lower()
+        if not self._pattern.search(lower):
+            return []
+        return [phrase for phrase in self.banned if phrase.lower() in lower]
+
+
 def cta_present(text: str, cta_text: str | None) -> bool:
     if cta_text:
         return cta_text.lower() in text.lower()
@@ -39,10 +56,14 @@ def compute_metrics(
     banned_phrases: list[str],
     cta_required: bool,
     cta_text: str | None,
+    banned_matcher: BannedPhraseMatcher | None = None,
 ) -> dict:
     char_count = len(text)
     hashtag_count = count_hashtags(text)
-    banned_hits = contains_banned_phrase(text, banned_phrases)
+    if banned_matcher is not None:
+        banned_hits = banned_matcher.hits(text)
+    else:
+        banned_hits = contains_banned_phrase(text, banned_phrases)
     avg_len = avg_sentence_length(text)
 
     metrics = {
@@ -53,3 +74,36 @@ def compute_metrics(
         "cta_present": cta_present(text, cta_text) if cta_required else True,
     }
     return metrics
+
+
+def split_sentences(text: str) -> list[str]:
+    parts = re.split(r"(?<=[.!?])\s+", text.strip())
+    return [p.strip() for p in parts if p.strip()]
+
+
+def compute_thread_metrics(
+    segments: list[str],
+    *,
+    banned_phrases: list[str],
+    cta_required: bool,
+    cta_text: str | None,
+    banned_matcher: BannedPhraseMatcher | None = None,
+) -> dict:
+    metrics = compute_metrics(
+        "\n\n".join(segments),
+        banned_phrases=banned_phrases,
+        cta_required=cta_required,
+        cta_text=cta_text,
+        banned_matcher=banned_matcher,
+    )
+    metrics["segment_count"] = len(segments)
+    metrics["segments"] = [
+        {
+            "index": idx,
+            "char_count": len(segment),
+            "hashtag_count": count_hashtags(segment),
+            "avg_sentence_length": avg_sentence_length(segment),
+        }
+        for idx, segment in enumerate(segments, start=1)
+    ]
+    return metrics
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from typing import Iterable
+
+_PRIME = (1 << 61) - 1
+
+
+def shingles(text: str, size: int = 1) -> frozenset[str]:
+    """Lowercased word n-grams; ``size=1`` is the plain token set."""
+    tokens = (text or "").lower().split()
+    if size <= 1 or len(tokens) < size:
+        return frozenset(tokens)
+    return frozenset(" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def lsh_params(threshold: float, num_perm: int) -> tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint sits just below ``threshold``, favouring recall."""
+    target = threshold * 0.9
+    best: tuple[float, int, int] | None = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - target)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class SimilarityIndex:
+    """Incremental MinHash/LSH index for near-duplicate lookup.
+
+    Items are bucketed by banded MinHash signatures, so a query only scores the items that
+    share a band with it; candidates are then verified with exact Jaccard on their shingle
+    sets, so reported scores are exact and false positives never leak through. ``add`` only
+    records the shingles; signatures are computed on the next query, so replaying a feed
+    that is never queried (seek, resume) stays cheap.
+    """
+
+    def __init__(self, *, threshold: float = 0.45, num_perm: int = 128, shingle_size: int = 1, seed: int = 1) -> None:
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = random.Random(seed)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+        self._buckets: list[dict[tuple[int, ...], list[str]]] = [{} for _ in range(self.bands)]
+        self._shingles: dict[str, frozenset[str]] = {}
+        self._pending: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._shingles)
+
+    def signature(self, items: frozenset[str]) -> list[int]:
+        rows = []
+        for item in items:
+            h = _token_hash(item)
+            rows.append([(a * h + b) % _PRIME for a, b in self._perms])
+        return rows[0] if len(rows) == 1 else list(map(min, *rows))
+
+    def _bands(self, signature: list[int]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        rows = self.rows
+        for band in range(self.bands):
+            yield band, tuple(signature[band * rows : (band + 1) * rows])
+
+    def add(self, item_id: str, text: str) -> None:
+        items = shingles(text, self.shingle_size)
+        if not items or item_id in self._shingles:
+            return
+        self._shingles[item_id] = items
+        self._pending.append(item_id)
+
+    def flush(self) -> None:
+        """Bucket everything added since the last query."""
+        for item_id in self._pending:
+            for band, key in self._bands(self.signature(self._shingles[item_id])):
+                self._buckets[band].setdefault(key, []).append(item_id)
+        self._pending.clear()
+
+    def query(self, text: str, *, threshold: float | None = None, prefix: str | None = None) -> list[tuple[str, float]]:
+        """Indexed items at or above ``threshold`` Jaccard, best first; ``prefix`` filters ids."""
+        items = shingles(text, self.shingle_size)
+        if not items:
+            return []
+        threshold = self.threshold if threshold is None else threshold
+        self.flush()
+        candidates: set[str] = set()
+        for band, key in self._bands(self.signature(items)):
+            candidates.update(self._buckets[band].get(key, ()))
+        matches = []
+        for item_id in candidates:
+            if prefix and not item_id.startswith(prefix):
+                continue
+            score = jaccard(items, self._shingles[item_id])
+            if score >= threshold:
+                matches.append((item_id, score))
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+    def score(self, text: str, item_id: str) -> float:
+        """Exact Jaccard against one indexed item (0.0 if unknown)."""
+        other = self._shingles.get(item_id)
+        return jaccard(shingles(text, self.shingle_size), other) if other else 0.0
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# Stage names used across the pipeline; summaries list them in this order.
+STAGES = (
+    "prompt.build",
+    "llm.call",
+    "llm.queue",
+    "llm.network",
+    "json.parse",
+    "json.repair",
+    "validate",
+    "db.write",
+    "render",
+    "molt.turn",
+)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    name: str
+    start_ns: int
+    duration_ns: int = 0
+    attrs: dict[str, Any] = field(default_factory=dict)
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    parent_id: str | None = None
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration_ns / 1e6
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attrs": self.attrs,
+        }
+
+
+class SpanRecorder:
+    """Thread-safe sink for finished spans of one command, job or test."""
+
+    def __init__(self) -> None:
+        self.trace_id = _new_id(16)
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def mark(self) -> int:
+        with self._lock:
+            return len(self.spans)
+
+    def since(self, mark: int) -> list[Span]:
+        """Spans finished after ``mark`` was taken, e.g. the ones belonging to a single run."""
+        with self._lock:
+            return self.spans[mark:]
+
+    def summary(self, spans: list[Span] | None = None) -> dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans if spans is None else spans)
+        stages: dict[str, dict[str, float]] = {}
+        for span in spans:
+            row = stages.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["count"] += 1
+            row["total_ms"] += span.duration_ms
+            row["max_ms"] = max(row["max_ms"], span.duration_ms)
+        order = {name: idx for idx, name in enumerate(STAGES)}
+        return {
+            "wall_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages": {
+                name: {
+                    "count": int(row["count"]),
+                    "total_ms": round(row["total_ms"], 3),
+                    "mean_ms": round(row["total_ms"] / row["count"], 3),
+                    "max_ms": round(row["max_ms"], 3),
+                }
+                for name, row in sorted(stages.items(), key=lambda kv: (order.get(kv[0], len(order)), kv[0]))
+            },
+        }
+
+    def to_otel(self, service_name: str = "social-duo") -> dict[str, Any]:
+        """OTLP/JSON ``ExportTraceServiceRequest`` for the recorded spans."""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otel_attr("service.name", service_name)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "social_duo"},
+                            "spans": [
+                                {
+                                    "traceId": self.trace_id,
+                                    "spanId": span.span_id,
+                                    "parentSpanId": span.parent_id or "",
+                                    "name": span.name,
+                                    "kind": 1,
+                                    "startTimeUnixNano": str(span.start_ns),
+                                    "endTimeUnixNano": str(span.start_ns + span.duration_ns),
+                                    "attributes": [_otel_attr(k, v) for k, v in span.attrs.items()],
+                                }
+                                for span in spans
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+    def export(self, path: Path) -> None:
+        """Append the spans to ``path`` as one OTLP/JSON line (the collector file-exporter layout)."""
+        with path.open("a") as handle:
+            handle.write(json.dumps(self.to_otel()) + "\n")
+
+
+def _otel_attr(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_CURRENT: contextvars.ContextVar[tuple[SpanRecorder, Span | None] | None] = contextvars.ContextVar(
+    "social_duo_span", default=None
+)
+
+
+def current_recorder() -> SpanRecorder | None:
+    state = _CURRENT.get()
+    return state[0] if state else None
+
+
+@contextmanager
+def recording(recorder: SpanRecorder | None = None) -> Iterator[SpanRecorder]:
+    """Record spans made in this context (and in work handed off via ``propagate``) into ``recorder``."""
+    recorder = recorder or SpanRecorder()
+    token = _CURRENT.set((recorder, None))
+    try:
+        yield recorder
+    finally:
+        _CURRENT.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span | None]:
+    """Time the block as ``name``; a no-op yielding None when nothing is recording."""
+    state = _CURRENT.get()
+    if state is None:
+        yield None
+        return
+    recorder, parent = state
+    current = Span(name=name, start_ns=time.time_ns(), attrs=attrs, parent_id=parent.span_id if parent else None)
+    token = _CURRENT.set((recorder, current))
+    started = time.perf_counter_ns()
+    try:
+        yield current
+    finally:
+        current.duration_ns = time.perf_counter_ns() - started
+        _CURRENT.reset(token)
+        recorder.add(current)
+
+
+def record(name: str, seconds: float, **attrs: Any) -> None:
+    """Add an already-measured duration (e.g. time spent waiting on a rate limiter)."""
+    state = _CURRENT.get()
+    if state is None:
+        return
+    recorder, parent = state
+    duration_ns = int(seconds * 1e9)
+    recorder.add(
+        Span(
+            name=name,
+            start_ns=time.time_ns() - duration_ns,
+            duration_ns=duration_ns,
+            attrs=attrs,
+            parent_id=parent.span_id if parent else None,
+        )
+    )
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of ``span``."""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _CURRENT.get() is None:
+                return fn(*args, **kwargs)
+            with span(name, fn=fn.__name__):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def propagate(fn: Callable) -> Callable:
+    """Bind ``fn`` to the caller's span context so it records under it on a worker thread."""
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn)
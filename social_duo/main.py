@@ -1,41 +1,92 @@
 from __future__ import annotations
 
 import os
+import sys
+from pathlib import Path
 
 import typer
-from dotenv import load_dotenv
 
-from social_duo.cli.init_cmd import init_app
-from social_duo.cli.post_cmd import post_app
-from social_duo.cli.reply_cmd import reply_app
-from social_duo.cli.chat_cmd import chat_app
-from social_duo.cli.history_cmd import history_app
-from social_duo.cli.config_cmd import config_app
-from social_duo.cli.discuss_cmd import discuss_app
-from social_duo.cli.molt_cmd import molt_app
+from social_duo.cli.lazy import LazyGroup
 
-app = typer.Typer(add_completion=False, help="Two-agent CLI for social media content.")
+# Subcommand modules are imported on first use; see LazyGroup.
+COMMANDS = {
+    "init": ("social_duo.cli.init_cmd", "init_app"),
+    "post": ("social_duo.cli.post_cmd", "post_app"),
+    "reply": ("social_duo.cli.reply_cmd", "reply_app"),
+    "chat": ("social_duo.cli.chat_cmd", "chat_app"),
+    "history": ("social_duo.cli.history_cmd", "history_app"),
+    "config": ("social_duo.cli.config_cmd", "config_app"),
+    "discuss": ("social_duo.cli.discuss_cmd", "discuss_app"),
+    "molt": ("social_duo.cli.molt_cmd", "molt_app"),
+    "batch": ("social_duo.cli.batch_cmd", "batch_app"),
+    "serve": ("social_duo.cli.serve_cmd", "serve_app"),
+}
 
-app.add_typer(init_app, name="init")
-app.add_typer(post_app, name="post")
-app.add_typer(reply_app, name="reply")
-app.add_typer(chat_app, name="chat")
-app.add_typer(history_app, name="history")
-app.add_typer(config_app, name="config")
-app.add_typer(discuss_app, name="discuss")
-app.add_typer(molt_app, name="molt")
+
+class _Commands(LazyGroup):
+    lazy_commands = COMMANDS
+
+
+app = typer.Typer(add_completion=False, help="Two-agent CLI for social media content.", cls=_Commands)
 
 
 def _load_env() -> None:
+    from dotenv import load_dotenv
+
     load_dotenv(override=False)
     os.environ.setdefault("OPENAI_BASE_URL", "https://api.openai.com/v1")
     os.environ.setdefault("OPENAI_MODEL", "gpt-4.1-mini")
 
 
+def _report_spans(recorder, profile: bool, trace_out: Path | None) -> None:
+    if trace_out is not None:
+        recorder.export(trace_out)
+    if profile:
+        from social_duo.core.render import render_profile
+
+        render_profile(recorder.summary())
+
+
 @app.callback()
-def main() -> None:
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(False, "--profile", help="Print a per-stage latency breakdown on exit"),
+    trace_out: Path = typer.Option(
+        None, "--trace-out", envvar="SOCIAL_DUO_TRACE_OUT", help="Append spans as OpenTelemetry JSON to this file"
+    ),
+    cassette: str = typer.Option(
+        None, "--cassette", envvar="SOCIAL_DUO_CASSETTE", help="Record/replay LLM traffic (name in .social-duo/cassettes/ or a path)"
+    ),
+    cassette_mode: str = typer.Option("auto", "--cassette-mode", help="Cassette: auto|record|replay"),
+    replay_speed: float = typer.Option(1.0, "--replay-speed", help="Replay latency scale: 1 = real time, 10 = 10x faster, 0 = none"),
+) -> None:
+    from social_duo.core.spans import recording
+
     _load_env()
+    recorder = ctx.with_resource(recording())
+    if replay_speed < 0:
+        raise typer.BadParameter("must be >= 0", param_hint="--replay-speed")
+    if cassette:
+        from social_duo.providers.cassette import CassetteError, CassetteSettings, cassette_path, using_cassette
 
+        settings = CassetteSettings(cassette_path(cassette, Path.cwd() / ".social-duo"), cassette_mode, replay_speed)
+        try:
+            ctx.with_resource(using_cassette(settings))
+        except CassetteError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--cassette") from exc
+    if profile or trace_out is not None:
+        ctx.call_on_close(lambda: _report_spans(recorder, profile, trace_out))
 
-if __name__ == "__main__":
+
+def cli() -> None:
+    """Console entry point: hand off to a running `social_duo serve` when there is one."""
+    from social_duo.server.client import forward
+
+    code = forward(sys.argv[1:])
+    if code is not None:
+        raise SystemExit(code)
     app()
+
+
+if __name__ == "__main__":
+    cli()
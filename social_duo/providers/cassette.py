@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Iterator
+
+from social_duo.core.spans import span
+from social_duo.providers.llm import LLMClient
+
+CASSETTE_DIR = "cassettes"
+MODES = ("auto", "record", "replay")
+
+
+class CassetteError(RuntimeError):
+    pass
+
+
+class CassetteMiss(CassetteError):
+    def __init__(self, key: str, path: Path) -> None:
+        super().__init__(f"No recorded response for request {key[:12]} in {path}")
+        self.key = key
+
+
+def request_key(messages: list[dict], *, temperature: float, max_tokens: int, response_format: dict | None) -> str:
+    """Stable hash of everything the caller controls about a request (not the model or endpoint)."""
+    canonical = json.dumps(
+        {"messages": messages, "temperature": temperature, "max_tokens": max_tokens, "response_format": response_format},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def cassette_path(name: str, workspace: Path) -> Path:
+    """A bare name lives in .social-duo/cassettes/<name>.jsonl; anything path-like is used as given."""
+    if "/" in name or name.endswith(".jsonl"):
+        return Path(name)
+    return workspace / CASSETTE_DIR / f"{name}.jsonl"
+
+
+class RecordingLLM:
+    """LLMClient wrapper that appends every exchange (request, response, latency) to a cassette file.
+
+    The first line is a header with the wrapped client's model and structured-output support;
+    each following line is one interaction. Appends are serialised, so concurrent runs are safe,
+    and several clients in one command share the file.
+    """
+
+    def __init__(self, llm: LLMClient, path: Path) -> None:
+        self.llm = llm
+        self.path = path
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if not path.exists() or not path.stat().st_size:
+            header = {
+                "cassette": 1,
+                "model": getattr(llm, "model", None),
+                "supports_json_schema": bool(getattr(llm, "supports_json_schema", False)),
+            }
+            path.write_text(json.dumps(header) + "\n")
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def chat(self, messages: list[dict], *, temperature: float, max_tokens: int, response_format: dict | None = None) -> dict:
+        started = time.perf_counter()
+        resp = self.llm.chat(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format)
+        latency = time.perf_counter() - started
+        entry = {
+            "key": request_key(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format),
+            "request": {
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "response_format": response_format,
+            },
+            "response": resp,
+            "latency_s": round(latency, 6),
+            # The client may downgrade structured outputs mid-run; replay follows the same switch.
+            "supports_json_schema": bool(getattr(self.llm, "supports_json_schema", False)),
+        }
+        with self._lock, self.path.open("a") as handle:
+            handle.write(json.dumps(entry) + "\n")
+        return resp
+
+
+class ReplayLLM:
+    """LLMClient that answers from a cassette by request hash, without touching the network.
+
+    ``speed`` scales the recorded latencies: 1.0 replays in real time, 10.0 ten times faster
+    and 0 returns immediately. Identical requests are served in recorded order; once a key's
+    recordings run out its last response is reused.
+    """
+
+    def __init__(self, path: Path, *, speed: float = 1.0) -> None:
+        if not path.exists():
+            raise CassetteError(f"Cassette not found: {path}")
+        if speed < 0:
+            raise CassetteError("Replay speed must be >= 0")
+        self.path = path
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._entries: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._last: dict[str, dict[str, Any]] = {}
+        lines = [line for line in path.read_text().splitlines() if line.strip()]
+        header = json.loads(lines[0]) if lines else {}
+        self.model = header.get("model")
+        self.supports_json_schema = bool(header.get("supports_json_schema", False))
+        for line in lines[1:]:
+            entry = json.loads(line)
+            self._entries[entry["key"]].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._entries.values())
+
+    def chat(self, messages: list[dict], *, temperature: float, max_tokens: int, response_format: dict | None = None) -> dict:
+        key = request_key(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format)
+        with self._lock:
+            queue = self._entries.get(key)
+            entry = queue.popleft() if queue else self._last.get(key)
+            if entry is None:
+                raise CassetteMiss(key, self.path)
+            self._last[key] = entry
+            self.supports_json_schema = entry.get("supports_json_schema", self.supports_json_schema)
+        with span("llm.network", replay=True):
+            if self.speed > 0:
+                time.sleep(entry["latency_s"] / self.speed)
+        return entry["response"]
+
+
+@dataclass(frozen=True)
+class CassetteSettings:
+    path: Path
+    mode: str = "auto"
+    speed: float = 1.0
+
+
+_ACTIVE: contextvars.ContextVar[CassetteSettings | None] = contextvars.ContextVar("social_duo_cassette", default=None)
+
+
+@contextmanager
+def using_cassette(settings: CassetteSettings) -> Iterator[CassetteSettings]:
+    """Make ``open_llm`` record to / replay from ``settings.path`` within this context.
+
+    ``auto`` replays an existing cassette and records a missing one; ``record`` starts it afresh.
+    """
+    if settings.mode not in MODES:
+        raise CassetteError(f"Invalid cassette mode {settings.mode!r}; expected one of {', '.join(MODES)}")
+    if settings.mode == "auto":
+        settings = replace(settings, mode="replay" if settings.path.exists() else "record")
+    if settings.mode == "replay" and not settings.path.exists():
+        raise CassetteError(f"Cassette not found: {settings.path}")
+    if settings.mode == "record":
+        settings.path.unlink(missing_ok=True)
+    token = _ACTIVE.set(settings)
+    try:
+        yield settings
+    finally:
+        _ACTIVE.reset(token)
+
+
+def open_llm() -> LLMClient:
+    """The LLM client commands should use: the network client, or a cassette around/instead of it."""
+    settings = _ACTIVE.get()
+    if settings is not None and settings.mode == "replay":
+        return ReplayLLM(settings.path, speed=settings.speed)
+
+    from social_duo.providers.openai_compat import OpenAICompatibleClient
+
+    llm = OpenAICompatibleClient()
+    if settings is not None:
+        return RecordingLLM(llm, settings.path)
+    return llm
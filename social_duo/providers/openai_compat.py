@@ -1,10 +1,31 @@
 from __future__ import annotations
 
 import os
+import threading
 import time
 from typing import Any
 
-import httpx
+from social_duo.core.spans import span
+
+_HTTP_CLIENT = None
+_HTTP_LOCK = threading.Lock()
+
+
+def _http_client():
+    """Process-wide httpx client so keep-alive connections are reused across requests and runs."""
+    global _HTTP_CLIENT
+    import httpx  # deferred: keeps httpx off the CLI startup path
+
+    with _HTTP_LOCK:
+        if _HTTP_CLIENT is None:
+            _HTTP_CLIENT = httpx.Client(timeout=30.0)
+        return _HTTP_CLIENT
+
+
+def _rejects_json_schema(body: str) -> bool:
+    # Other 400s (context length, bad parameters) must not switch the client out of structured outputs.
+    body = body.lower()
+    return "response_format" in body or "json_schema" in body
 
 
 class OpenAICompatibleClient:
@@ -12,6 +33,11 @@ class OpenAICompatibleClient:
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
         self.model = model or os.getenv("OPENAI_MODEL") or "gpt-4.1-mini"
+        schema_flag = os.getenv("OPENAI_JSON_SCHEMA")
+        if schema_flag is None:
+            self.supports_json_schema = self.base_url.startswith("https://api.openai.com")
+        else:
+            self.supports_json_schema = schema_flag.strip().lower() in {"1", "true", "yes"}
 
         if not self.api_key:
             raise RuntimeError("OPENAI_API_KEY is required.")
@@ -31,8 +57,19 @@ class OpenAICompatibleClient:
         last_err: Exception | None = None
         for attempt in range(3):
             try:
-                with httpx.Client(timeout=30.0) as client:
-                    resp = client.post(url, headers=headers, json=payload)
+                with span("llm.network", attempt=attempt) as net:
+                    resp = _http_client().post(url, headers=headers, json=payload)
+                    if net is not None:
+                        net.attrs["status"] = resp.status_code
+                if (
+                    resp.status_code == 400
+                    and payload.get("response_format", {}).get("type") == "json_schema"
+                    and _rejects_json_schema(resp.text)
+                ):
+                    # Backend rejected structured outputs; degrade to JSON mode for this and later calls.
+                    self.supports_json_schema = False
+                    payload["response_format"] = {"type": "json_object"}
+                    continue
                 if resp.status_code >= 400:
                     raise RuntimeError(f"LLM error {resp.status_code}: {resp.text}")
                 return resp.json()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from social_duo.core.spans import record
+from social_duo.providers.llm import LLMClient
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most ``per_minute`` acquisitions per minute, bursting to ``burst``."""
+
+    def __init__(self, per_minute: float, burst: int | None = None) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(per_minute // 60) or 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class RateLimitedLLM:
+    """LLMClient wrapper that takes a limiter token before every request."""
+
+    def __init__(self, llm: LLMClient, limiter: RateLimiter) -> None:
+        self.llm = llm
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        # supports_json_schema, model, ... come from the wrapped client
+        return getattr(self.llm, name)
+
+    def chat(self, messages: list[dict], *, temperature: float, max_tokens: int, response_format: dict | None = None) -> dict:
+        record("llm.queue", self.limiter.acquire())
+        return self.llm.chat(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TextIO
+
+# Kept to the stdlib: this module runs on every CLI start, before any subcommand is imported.
+
+SERVE_FILE = "serve.json"
+FORWARDED = ("post", "reply", "discuss", "molt")
+TOKEN_HEADER = "X-Social-Duo-Token"
+
+
+@dataclass
+class DaemonInfo:
+    pid: int
+    host: str
+    port: int
+    token: str
+    cwd: str
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def serve_file(workspace: Path) -> Path:
+    return workspace / SERVE_FILE
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def find_daemon(workspace: Path) -> DaemonInfo | None:
+    path = serve_file(workspace)
+    try:
+        info = DaemonInfo(**json.loads(path.read_text()))
+    except (OSError, ValueError, TypeError):
+        return None
+    return info if _pid_alive(info.pid) else None
+
+
+def request(info: DaemonInfo, method: str, path: str, body: dict | None = None, *, timeout: float | None = None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        info.url + path,
+        data=data,
+        method=method,
+        headers={TOKEN_HEADER: info.token, "Content-Type": "application/json"},
+    )
+    return urllib.request.urlopen(req, timeout=timeout)
+
+
+def forward(
+    argv: list[str],
+    *,
+    cwd: Path | None = None,
+    stdout: TextIO | None = None,
+    stderr: TextIO | None = None,
+) -> int | None:
+    """Run ``argv`` on the workspace daemon if one is up; None means run it locally instead.
+
+    Only post/reply/discuss/molt are forwarded, and only from the directory the daemon serves.
+    Output streams back as it is produced. If the command needs to prompt, the daemon gives up
+    before printing anything and the caller runs the command locally so the prompt works.
+    """
+    if os.getenv("SOCIAL_DUO_NO_DAEMON") or not argv or argv[0] not in FORWARDED:
+        return None
+    if "--help" in argv:
+        return None
+    cwd = (cwd or Path.cwd()).resolve()
+    info = find_daemon(cwd / ".social-duo")
+    if info is None or Path(info.cwd) != cwd:
+        return None
+
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    try:
+        resp = request(info, "POST", "/cli", {"argv": argv, "cwd": str(cwd)})
+    except (urllib.error.URLError, ConnectionError):
+        return None
+    with resp:
+        for line in resp:
+            frame = json.loads(line)
+            if "out" in frame:
+                stdout.write(frame["out"])
+                stdout.flush()
+            elif "err" in frame:
+                stderr.write(frame["err"])
+                stderr.flush()
+            elif frame.get("needs_input"):
+                return None
+            elif "exit" in frame:
+                return int(frame["exit"])
+    stderr.write("social_duo serve closed the connection before the command finished.\n")
+    return 1
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import importlib
+import io
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+from social_duo.core.config import load_config
+from social_duo.providers.openai_compat import _http_client
+from social_duo.server.client import FORWARDED, TOKEN_HEADER, DaemonInfo, serve_file
+from social_duo.server.jobs import JobError, JobManager, JobQueueFull
+from social_duo.storage.db import connect_read
+
+SSE_HEARTBEAT_S = 15.0
+
+
+class _NeedsInput(Exception):
+    pass
+
+
+class _NoStdin(io.TextIOBase):
+    """Forwarded commands cannot prompt; reading stdin bails out so the client runs locally."""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> str:
+        raise _NeedsInput
+
+    def readline(self, size: int = -1) -> str:
+        raise _NeedsInput
+
+
+class _LineStream(io.TextIOBase):
+    """Line-buffered writer that hands complete lines to ``emit``.
+
+    Prompt text never ends in a newline, so a command that stops to prompt has sent nothing yet.
+    """
+
+    def __init__(self, emit: Callable[[str], None]) -> None:
+        self._emit = emit
+        self._buf = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        self._buf += text
+        if "\n" in self._buf:
+            head, _, self._buf = self._buf.rpartition("\n")
+            self._emit(head + "\n")
+        return len(text)
+
+    def finish(self) -> None:
+        if self._buf:
+            self._emit(self._buf)
+            self._buf = ""
+
+    def discard(self) -> None:
+        self._buf = ""
+
+
+class Daemon:
+    """Local HTTP daemon bound to one workspace.
+
+    Keeps imports, config and policy, the migrated history DB and the provider connection pool
+    warm between commands.
+    Forwarded CLI commands run in-process one at a time, since they share sys.stdout and the
+    working directory; they read the daemon's environment, not the client's. Jobs submitted
+    through /jobs run concurrently on the JobManager.
+    """
+
+    def __init__(
+        self,
+        workspace: Path,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        max_jobs: int = 4,
+        max_queued: int = 100,
+        rate: float = 0,
+    ) -> None:
+        self.workspace = workspace
+        self.cwd = str(workspace.parent.resolve())
+        self.token = secrets.token_urlsafe(16)
+        self.started = time.time()
+        self.commands_served = 0
+        self._cli_lock = threading.Lock()
+        self.jobs = JobManager(workspace, max_jobs=max_jobs, max_queued=max_queued, rate=rate)
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.owner = self
+
+    @property
+    def info(self) -> DaemonInfo:
+        host, port = self.server.server_address[:2]
+        return DaemonInfo(pid=os.getpid(), host=host, port=port, token=self.token, cwd=self.cwd)
+
+    def warm(self) -> None:
+        from social_duo.main import COMMANDS
+
+        for name in FORWARDED:
+            importlib.import_module(COMMANDS[name][0])
+        load_config(self.workspace / "config.json")
+        db_path = self.workspace / "history.db"
+        if db_path.exists():
+            connect_read(db_path).close()
+        _http_client()
+
+    def health(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "cwd": self.cwd,
+            "uptime_s": round(time.time() - self.started, 1),
+            "commands_served": self.commands_served,
+            "jobs": self.jobs.stats(),
+        }
+
+    def run_cli(self, argv: list[str], emit: Callable[[dict], None]) -> dict:
+        from social_duo.main import app
+
+        out = _LineStream(lambda text: emit({"out": text}))
+        err = _LineStream(lambda text: emit({"err": text}))
+        with self._cli_lock:
+            saved = sys.stdin, sys.stdout, sys.stderr
+            sys.stdin, sys.stdout, sys.stderr = _NoStdin(), out, err
+            try:
+                app(args=argv, prog_name="social_duo", standalone_mode=True)
+                code = 0
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+            except _NeedsInput:
+                out.discard()
+                err.discard()
+                return {"needs_input": True}
+            except Exception as exc:  # noqa: BLE001
+                err.write(f"Error: {exc}\n")
+                code = 1
+            finally:
+                sys.stdin, sys.stdout, sys.stderr = saved
+            out.finish()
+            err.finish()
+            self.commands_served += 1
+        return {"exit": code}
+
+    def serve_forever(self) -> None:
+        path = serve_file(self.workspace)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as handle:
+            handle.write(self.info.to_json())
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.jobs.close()
+            try:
+                if json.loads(path.read_text()).get("pid") == os.getpid():
+                    path.unlink()
+            except (OSError, ValueError):
+                pass
+
+    def shutdown(self) -> None:
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "social-duo"
+
+    @property
+    def daemon(self) -> Daemon:
+        return self.server.owner
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002
+        pass
+
+    def _authorized(self) -> bool:
+        token = self.headers.get(TOKEN_HEADER, "")
+        if secrets.compare_digest(token, self.daemon.token):
+            return True
+        self._send_json(403, {"error": "bad token"})
+        return False
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        url = urlsplit(self.path)
+        parts = url.path.strip("/").split("/")
+        if url.path == "/health":
+            self._send_json(200, self.daemon.health())
+        elif url.path == "/jobs":
+            self._send_json(200, {"jobs": [job.to_dict() for job in list(self.daemon.jobs.jobs.values())]})
+        elif len(parts) in {2, 3} and parts[0] == "jobs":
+            job = self.daemon.jobs.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": f"no job {parts[1]}"})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            elif parts[2] == "events":
+                after = self.headers.get("Last-Event-ID") or parse_qs(url.query).get("after", ["0"])[0]
+                try:
+                    after_id = int(after)
+                except ValueError:
+                    after_id = -1
+                if after_id < 0:
+                    self._send_json(400, {"error": f"invalid event id {after!r}"})
+                else:
+                    self._events(job, after_id)
+            else:
+                self._send_json(404, {"error": "not found"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        if self.path == "/shutdown":
+            self._send_json(200, {"ok": True})
+            self.daemon.shutdown()
+        elif self.path == "/cli":
+            self._cli(self._read_json())
+        elif self.path == "/jobs":
+            body = self._read_json()
+            try:
+                job = self.daemon.jobs.submit(body.get("type", ""), body.get("input", {}))
+            except JobError as exc:
+                self._send_json(400, {"error": str(exc)})
+            except JobQueueFull as exc:
+                self._send_json(429, {"error": str(exc)})
+            else:
+                self._send_json(202, job.to_dict())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _events(self, job, after: int) -> None:
+        """Server-sent events for one job, from event id ``after`` until the job finishes."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            while True:
+                events = job.events_after(after, SSE_HEARTBEAT_S)
+                if not events:
+                    if job.done:
+                        return
+                    self.wfile.write(b": keep-alive\n\n")
+                for event in events:
+                    chunk = f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+                    self.wfile.write(chunk.encode())
+                    after = event["id"]
+                self.wfile.flush()
+        except OSError:
+            return
+
+    def _cli(self, body: dict) -> None:
+        argv = body.get("argv") or []
+        if not argv or argv[0] not in FORWARDED:
+            self._send_json(400, {"error": f"only {', '.join(FORWARDED)} are forwarded"})
+            return
+        if body.get("cwd") != self.daemon.cwd:
+            self._send_json(409, {"error": f"daemon serves {self.daemon.cwd}"})
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        connected = True
+
+        def emit(frame: dict) -> None:
+            # Keep running after a client disconnect so the run still lands in history.
+            nonlocal connected
+            if not connected:
+                return
+            try:
+                self.wfile.write((json.dumps(frame) + "\n").encode())
+                self.wfile.flush()
+            except OSError:
+                connected = False
+
+        emit(self.daemon.run_cli(argv, emit))
@@ -0,0 +1,339 @@
+from __future__ import annotations
+
+import contextvars
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from pydantic import ValidationError
+
+from social_duo.core.batch import expand_briefs, run_item
+from social_duo.core.config import load_config
+from social_duo.core.constraints import PLATFORMS
+from social_duo.core.context_budget import ContextBudget
+from social_duo.core.discuss_loop import normalize_artifacts, run_discuss_loop
+from social_duo.core.loop import LoopBudget
+from social_duo.core.molt_engine import simulate_molt
+from social_duo.core.molt_replay import SNAPSHOT_EVERY, SnapshotWriter
+from social_duo.core.spans import propagate, recording
+from social_duo.providers.cassette import open_llm
+from social_duo.providers.rate_limit import RateLimitedLLM, RateLimiter
+from social_duo.storage.events import add_event
+from social_duo.storage.history import add_output, add_step, create_run, create_session, update_session
+from social_duo.types.schemas import Brief
+
+JOB_TYPES = ("post", "reply", "discuss", "molt")
+MAX_FINISHED = 1000
+
+RISKS = ("low", "medium", "high")
+DISCUSS_MODES = ("posts", "replies", "mixed")
+_DISCUSS_DEFAULTS = {"platform": "all", "turns": 12, "mode": "mixed", "risk": "medium", "stop_on": "artifact"}
+_MOLT_DEFAULTS = {
+    "turns": 30,
+    "platform": "all",
+    "cadence": "fast",
+    "risk": "medium",
+    "topic": "any",
+    "stop_on": "turns",
+}
+
+
+class JobError(ValueError):
+    pass
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class StorageWriter:
+    """Single thread that performs every history DB write made by jobs, in submission order."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args, kwargs = item
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as exc:  # noqa: BLE001
+                future.set_exception(exc)
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        future: Future = Future()
+        # Run under the caller's span context so db.write spans land in the job's recorder.
+        self._queue.put((future, propagate(fn), args, kwargs))
+        return future.result()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    input: dict[str, Any]
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    events: list[dict[str, Any]] = field(default_factory=list)
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in {"succeeded", "failed"}
+
+    def publish(self, event: str, data: Any) -> None:
+        with self._cond:
+            self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+            self._cond.notify_all()
+
+    def events_after(self, after: int, timeout: float) -> list[dict[str, Any]]:
+        """Events with id > ``after``, waiting up to ``timeout`` for one unless the job is done."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.events) > after or self.done, timeout)
+            return self.events[after:]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "input": self.input,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "events": len(self.events),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Runs post/reply/discuss/molt jobs on a bounded pool.
+
+    All jobs share one provider client (optionally rate limited) and one StorageWriter.
+    At most ``max_jobs`` run at once; beyond ``max_queued`` waiting jobs, submit refuses.
+    """
+
+    def __init__(self, workspace: Path, *, max_jobs: int = 4, max_queued: int = 100, rate: float = 0) -> None:
+        self.workspace = workspace
+        self.db_path = workspace / "history.db"
+        self.max_jobs = max(1, max_jobs)
+        self.max_queued = max_queued
+        self.rate = rate
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.writer = StorageWriter()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._llm = None
+        # --cassette is a contextvar of the thread that started the daemon; job threads don't inherit it.
+        self._context = contextvars.copy_context()
+
+    def _shared_llm(self):
+        with self._lock:
+            if self._llm is None:
+                llm = self._context.run(open_llm)
+                self._llm = RateLimitedLLM(llm, RateLimiter(self.rate)) if self.rate > 0 else llm
+            return self._llm
+
+    def submit(self, job_type: str, data: dict[str, Any]) -> Job:
+        if job_type not in JOB_TYPES:
+            raise JobError(f"Unknown job type {job_type!r}; expected one of {', '.join(JOB_TYPES)}")
+        if not isinstance(data, dict):
+            raise JobError("Job input must be a JSON object")
+        _validate(job_type, data)
+        with self._lock:
+            queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+            if queued >= self.max_queued:
+                raise JobQueueFull(f"{queued} jobs already queued")
+            job = Job(id=uuid.uuid4().hex[:12], type=job_type, input=data)
+            self.jobs[job.id] = job
+            self._evict()
+        job.publish("status", {"status": job.status})
+        self._pool.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for job in list(self.jobs.values()):
+            counts[job.status] += 1
+        return {**counts, "max_jobs": self.max_jobs}
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED)]:
+            del self.jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        job.status, job.started_at = "running", time.time()
+        job.publish("status", {"status": job.status})
+        try:
+            runner = {"post": self._run_brief, "reply": self._run_brief, "discuss": self._run_discuss, "molt": self._run_molt}
+            with recording() as recorder:
+                job.result = runner[job.type](job)
+            job.result["timings"] = recorder.summary()
+            job.status = "succeeded"
+        except Exception as exc:  # noqa: BLE001
+            job.error = str(exc)
+            job.status = "failed"
+        job.finished_at = time.time()
+        job.publish("status", {"status": job.status, "result": job.result, "error": job.error})
+
+    def _run_brief(self, job: Job) -> dict[str, Any]:
+        config = load_config(self.workspace / "config.json")
+        brief = Brief.model_validate({**job.input, "type": job.type, "id": job.id})
+        budget = LoopBudget() if job.input.get("adaptive", True) else None
+        session_id = self.writer.call(create_session, self.db_path, cwd=str(self.workspace.parent), label=f"api:{job.type}")
+        runs = []
+        for item in expand_briefs([brief], config):
+            res = run_item(item, llm=self._shared_llm(), config=config, rounds=brief.rounds or 2, budget=budget)
+            run_input = {**brief.model_dump(), "platform": item.platform}
+            run_id = self.writer.call(
+                create_run, self.db_path, session_id=session_id, run_type=job.type, platform=item.platform, input_json=run_input
+            )
+            for idx, step in enumerate(res.trace):
+                self.writer.call(
+                    add_step, self.db_path, run_id=run_id, step_index=idx, agent_name=step["agent"], role=step["role"], content=step["content"]
+                )
+            record: dict[str, Any] = {"platform": item.platform, "run_id": run_id}
+            if res.result is None:
+                record["error"] = res.error
+            else:
+                self.writer.call(add_output, self.db_path, run_id=run_id, final_json=res.output)
+                record.update(res.output)
+            job.publish("run", record)
+            runs.append(record)
+        self.writer.call(update_session, self.db_path, session_id)
+        if all("error" in record for record in runs):
+            raise RuntimeError(runs[0]["error"] if runs else "No platforms to run")
+        return {"session_id": session_id, "runs": runs}
+
+    def _run_discuss(self, job: Job) -> dict[str, Any]:
+        config = load_config(self.workspace / "config.json")
+        opts = {**_DISCUSS_DEFAULTS, **job.input}
+        session_id = self.writer.call(create_session, self.db_path, cwd=str(self.workspace.parent), label="api:discuss")
+        run_input = {key: opts[key] for key in _DISCUSS_DEFAULTS}
+        run_id = self.writer.call(
+            create_run, self.db_path, session_id=session_id, run_type="discuss", platform=opts["platform"], input_json=run_input
+        )
+        result = run_discuss_loop(
+            llm=self._shared_llm(),
+            config=config,
+            platform=opts["platform"],
+            turns=opts["turns"],
+            mode=opts["mode"],
+            risk=opts["risk"],
+            stop_on=opts["stop_on"],
+            budget=ContextBudget(max_tokens=opts.get("max_context_tokens", 3000)),
+        )
+        for idx, step in enumerate(result.transcript):
+            self.writer.call(
+                add_step,
+                self.db_path,
+                run_id=run_id,
+                step_index=idx,
+                agent_name=step.get("agent", "unknown"),
+                role=step.get("turn", {}).get("intent", "unknown"),
+                content=step,
+            )
+        output = {
+            "transcript": result.transcript,
+            "artifacts": normalize_artifacts([a.model_dump() for a in result.artifacts], opts["platform"]),
+            "stop_reason": result.stop_reason,
+        }
+        self.writer.call(add_output, self.db_path, run_id=run_id, final_json=output)
+        self.writer.call(update_session, self.db_path, session_id)
+        return {"run_id": run_id, **output}
+
+    def _run_molt(self, job: Job) -> dict[str, Any]:
+        opts = {**_MOLT_DEFAULTS, **job.input}
+        session_id = self.writer.call(create_session, self.db_path, cwd=str(self.workspace.parent), label="api:molt")
+        run_input = {key: opts[key] for key in _MOLT_DEFAULTS}
+        run_id = self.writer.call(
+            create_run, self.db_path, session_id=session_id, run_type="molt", platform=opts["platform"], input_json=run_input
+        )
+        snapshots = SnapshotWriter(self.db_path, run_id, every=opts.get("snapshot_every", SNAPSHOT_EVERY))
+
+        def _event_sink(event: dict) -> None:
+            event_id = self.writer.call(
+                add_event,
+                self.db_path,
+                run_id=run_id,
+                agent=event["agent"],
+                action=event["action"],
+                target_id=event.get("target_id"),
+                payload=event.get("payload", {}),
+            )
+            snapshots.record(event_id)
+            job.publish("molt", {**event, "event_id": event_id})
+
+        simulate_molt(
+            llm=self._shared_llm(),
+            turns=opts["turns"],
+            platform=opts["platform"],
+            risk=opts["risk"],
+            topic=None if opts["topic"] == "any" else opts["topic"],
+            cadence=opts["cadence"],
+            stop_on=opts["stop_on"],
+            event_cb=_event_sink,
+            budget=ContextBudget(max_tokens=opts.get("max_context_tokens", 3000)),
+            speculative=opts.get("speculative", True),
+            on_turn=lambda turn, state: self.writer.call(snapshots, turn, state),
+        )
+        self.writer.call(snapshots.flush)
+        summary = {"run_id": run_id, "events": snapshots.event_count, "turns": opts["turns"], "snapshots": snapshots.snapshots}
+        self.writer.call(add_output, self.db_path, run_id=run_id, final_json=summary)
+        return summary
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.writer.close()
+
+
+def _validate(job_type: str, data: dict[str, Any]) -> None:
+    """Reject malformed input at submit time so callers get a 400 instead of a failed job."""
+    if job_type in {"post", "reply"}:
+        try:
+            brief = Brief.model_validate({**data, "type": job_type})
+        except ValidationError as exc:
+            raise JobError(exc.errors()[0]["msg"]) from exc
+        if brief.platform and brief.platform not in PLATFORMS:
+            raise JobError(f"Invalid platform {brief.platform}")
+        if job_type == "reply" and not brief.source_text:
+            raise JobError("reply jobs need source_text")
+        if job_type == "post" and not brief.topic:
+            raise JobError("post jobs need a topic")
+        return
+    if data.get("platform", "all") not in PLATFORMS:
+        raise JobError(f"Invalid platform {data['platform']}")
+    if not isinstance(data.get("turns", 1), int) or data.get("turns", 1) < 1:
+        raise JobError("turns must be a positive integer")
+    if data.get("risk", "medium") not in RISKS:
+        raise JobError(f"Invalid risk {data['risk']}; expected one of {', '.join(RISKS)}")
+    if job_type == "discuss" and data.get("mode", "mixed") not in DISCUSS_MODES:
+        raise JobError(f"Invalid mode {data['mode']}; expected one of {', '.join(DISCUSS_MODES)}")
+    if job_type == "discuss" and data.get("stop_on", "artifact") not in {"artifact", "turns", "manual"}:
+        raise JobError("Invalid stop_on value")
+    if job_type == "molt" and data.get("stop_on", "turns") not in {"turns", "manual"}:
+        raise JobError("Invalid stop_on value")
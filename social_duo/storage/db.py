@@ -1,20 +1,260 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import os
+import random
+import socket
 import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Callable
 
 from social_duo.storage.migrations import MIGRATIONS
 
+# (path, inode) pairs already migrated by this process; long-lived processes such as
+# `social_duo serve` otherwise re-run every migration script on each connect.
+_MIGRATED: set[tuple[str, int]] = set()
 
-def connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
+BUSY_TIMEOUT_S = 10.0
+JOURNAL_ENV = "SOCIAL_DUO_JOURNAL_MODE"
+SHARD_ENV = "SOCIAL_DUO_SHARD"
+
+# Tables a shard holds; every one has an AUTOINCREMENT id. Shard N allocates ids from
+# N * SHARD_SPAN so rows from different processes never collide when read or merged.
+SHARDED_TABLES = ("sessions", "runs", "steps", "outputs", "events", "molt_snapshots", "molt_checkpoints", "spans")
+SHARD_SPAN = 10**12
+
+_SHARDS: dict[tuple[str, int], Path] = {}
+_SHARD_LOCK = threading.Lock()
+
+
+class ShardLimitError(RuntimeError):
+    pass
+
+
+def _journal_mode() -> str:
+    # WAL needs shared memory, which network filesystems often lack; use delete + shards there.
+    return os.getenv(JOURNAL_ENV, "wal").strip().lower() or "wal"
+
+
+def _open(db_path: Path) -> sqlite3.Connection:
+    # timeout doubles as SQLite's busy_timeout: wait for another writer instead of failing at once.
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S)
     conn.row_factory = sqlite3.Row
-    _apply_migrations(conn)
+    key = (str(db_path), os.stat(db_path).st_ino) if str(db_path) != ":memory:" else None
+    if key is None or key not in _MIGRATED:
+        _apply_migrations(conn)
+        if key is not None:
+            _MIGRATED.add(key)
+    if _journal_mode() == "wal":
+        conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Connection for writes: the workspace DB, or this process's shard of it when sharding is on."""
+    if _sharding_enabled() and not _is_shard(db_path):
+        return _open(shard_path(db_path))
+    return _open(db_path)
+
+
+def connect_read(db_path: Path) -> sqlite3.Connection:
+    """Connection for reads that sees the main DB plus every shard.
+
+    Shards are attached and each sharded table is shadowed by a TEMP view that unions them,
+    so queries keep using plain table names. Without shards this is a plain connection.
+    """
+    conn = _open(db_path)
+    shards = shard_files(db_path)
+    if not shards:
+        return conn
+    limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    if len(shards) > limit:
+        conn.close()
+        raise ShardLimitError(f"{len(shards)} shard databases exceed SQLite's attach limit ({limit}); run `social_duo history merge`.")
+    for idx, path in enumerate(shards):
+        conn.execute(f"ATTACH DATABASE ? AS shard{idx}", (str(path),))
+    for table in SHARDED_TABLES:
+        parts = [f"SELECT * FROM main.{table}"] + [f"SELECT * FROM shard{idx}.{table}" for idx in range(len(shards))]
+        conn.execute(f"CREATE TEMP VIEW {table} AS " + " UNION ALL ".join(parts))
     return conn
 
 
+def update_owned(db_path: Path, sql: str, params: tuple[Any, ...]) -> int:
+    """Run an UPDATE on whichever database holds the row; returns the rows changed.
+
+    With sharding on, a row may live in this process's shard, the main DB (created before
+    sharding, or already merged) or another process's shard, so each is tried in that order.
+    """
+    candidates = [db_path]
+    if _sharding_enabled() and not _is_shard(db_path):
+        own = shard_path(db_path)
+        candidates = [own, db_path] + [p for p in shard_files(db_path) if p != own]
+    for path in candidates:
+        conn = _open(path)
+        try:
+            changed = conn.execute(sql, params).rowcount
+            conn.commit()
+        finally:
+            conn.close()
+        if changed:
+            return changed
+    return 0
+
+
+def retry_on_busy(fn: Callable | None = None, *, attempts: int = 6, base_delay: float = 0.05) -> Callable:
+    """Retry a write that still hits ``database is locked``/``busy`` after busy_timeout, with jittered backoff."""
+
+    def decorate(inner: Callable) -> Callable:
+        @functools.wraps(inner)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            for attempt in range(attempts):
+                try:
+                    return inner(*args, **kwargs)
+                except sqlite3.OperationalError as exc:
+                    message = str(exc).lower()
+                    if attempt == attempts - 1 or ("locked" not in message and "busy" not in message):
+                        raise
+                    time.sleep(base_delay * (2**attempt) * (0.5 + random.random()))
+
+        return wrapper
+
+    return decorate(fn) if fn is not None else decorate
+
+
+def _sharding_enabled() -> bool:
+    return os.getenv(SHARD_ENV, "").strip().lower() in {"1", "true", "yes"}
+
+
+def shard_dir(db_path: Path) -> Path:
+    return db_path.with_suffix(".shards")
+
+
+def shard_files(db_path: Path) -> list[Path]:
+    directory = shard_dir(db_path)
+    if not directory.is_dir():
+        return []
+    return sorted((p for p in directory.glob("*.db") if p.stem.isdigit()), key=lambda p: int(p.stem))
+
+
+def _is_shard(db_path: Path) -> bool:
+    return db_path.parent.suffix == ".shards"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def shard_path(db_path: Path) -> Path:
+    """This process's shard of ``db_path``, registering it in the main DB's ``shards`` table on first use."""
+    key = (str(db_path), os.getpid())
+    with _SHARD_LOCK:
+        path = _SHARDS.get(key)
+        if path is None:
+            shard_id = _register_shard(db_path)
+            path = shard_dir(db_path) / f"{shard_id}.db"
+            _SHARDS[key] = path
+            atexit.register(_close_shard, db_path, shard_id)
+        if not path.exists():
+            _create_shard(db_path, path)
+    return path
+
+
+@retry_on_busy
+def _register_shard(db_path: Path) -> int:
+    conn = _open(db_path)
+    try:
+        cur = conn.execute(
+            "INSERT INTO shards(host, pid, created_at) VALUES(?,?,?)", (socket.gethostname(), os.getpid(), _now())
+        )
+        conn.commit()
+        return int(cur.lastrowid)
+    finally:
+        conn.close()
+
+
+def _create_shard(db_path: Path, path: Path) -> None:
+    """Create and seed a shard so its ids start past anything of its range already in the main DB."""
+    path.parent.mkdir(exist_ok=True)
+    start = int(path.stem) * SHARD_SPAN
+    main = _open(db_path)
+    try:
+        seeds = []
+        for table in SHARDED_TABLES:
+            row = main.execute(f"SELECT MAX(id) FROM {table} WHERE id >= ? AND id < ?", (start, start + SHARD_SPAN)).fetchone()
+            seeds.append((table, max(start, row[0] or 0)))
+    finally:
+        main.close()
+    conn = _open(path)
+    try:
+        conn.executemany("INSERT INTO sqlite_sequence(name, seq) VALUES(?,?)", seeds)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _close_shard(db_path: Path, shard_id: int) -> None:
+    try:
+        conn = _open(db_path)
+        conn.execute("UPDATE shards SET closed_at=? WHERE id=?", (_now(), shard_id))
+        conn.commit()
+        conn.close()
+    except (sqlite3.Error, OSError):
+        pass  # best effort at exit; `history merge` also treats dead local pids as closed
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_shards(db_path: Path) -> list[dict[str, Any]]:
+    """Move every shard's rows into the main DB; delete shard files whose process has finished.
+
+    Rows are copied and removed from the shard in one transaction, so a shard still being
+    written keeps working and is simply merged again next time.
+    """
+    results = []
+    for path in shard_files(db_path):
+        shard_id = int(path.stem)
+        conn = _open(db_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS shard", (str(path),))
+            conn.execute("BEGIN IMMEDIATE")
+            moved = {}
+            for table in SHARDED_TABLES:
+                columns = ", ".join(row["name"] for row in conn.execute(f"PRAGMA main.table_info({table})"))
+                cur = conn.execute(f"INSERT OR IGNORE INTO main.{table}({columns}) SELECT {columns} FROM shard.{table}")
+                moved[table] = max(cur.rowcount, 0)
+                conn.execute(f"DELETE FROM shard.{table}")
+            conn.commit()
+            owner = conn.execute("SELECT host, pid, closed_at FROM shards WHERE id=?", (shard_id,)).fetchone()
+            conn.execute("DETACH DATABASE shard")
+        finally:
+            conn.close()
+        finished = owner is None or owner["closed_at"] is not None or (
+            owner["host"] == socket.gethostname() and owner["pid"] != os.getpid() and not _pid_alive(owner["pid"])
+        )
+        if finished:
+            for leftover in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                leftover.unlink(missing_ok=True)
+        results.append({"shard": shard_id, "rows": sum(moved.values()), "moved": moved, "removed": finished})
+    return results
+
+
 def _apply_migrations(conn: sqlite3.Connection) -> None:
     cur = conn.cursor()
+    mode = _journal_mode()
+    if mode in {"wal", "delete", "truncate", "persist"}:
+        cur.execute(f"PRAGMA journal_mode={mode}")
     for sql in MIGRATIONS:
         cur.executescript(sql)
     conn.commit()
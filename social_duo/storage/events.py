@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 import json
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator
 
-from social_duo.storage.db import connect
+from social_duo.core.spans import traced
+from social_duo.storage.db import connect, connect_read, retry_on_busy, shard_files, update_owned
 
 
 ISO = "%Y-%m-%dT%H:%M:%SZ"
@@ -15,6 +17,8 @@ def _now() -> str:
     return datetime.now(timezone.utc).strftime(ISO)
 
 
+@traced("db.write")
+@retry_on_busy
 def add_event(
     db_path: Path,
     *,
@@ -35,12 +39,195 @@ def add_event(
 
 
 def list_events(db_path: Path, run_id: int) -> list[dict[str, Any]]:
-    conn = connect(db_path)
+    conn = connect_read(db_path)
     cur = conn.cursor()
     cur.execute("SELECT * FROM events WHERE run_id=? ORDER BY id ASC", (run_id,))
     rows = cur.fetchall()
     return [dict(r) for r in rows]
 
 
+def list_events_after(db_path: Path, run_id: int, after_id: int, limit: int | None = None) -> list[dict[str, Any]]:
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT * FROM events WHERE run_id=? AND id>? ORDER BY id ASC LIMIT ?",
+        (run_id, after_id, -1 if limit is None else limit),
+    )
+    return [dict(r) for r in cur.fetchall()]
+
+
+def event_ids_after(db_path: Path, run_id: int, after_id: int, limit: int) -> list[int]:
+    """Ids of a run's next ``limit`` events past ``after_id``, read from the index alone."""
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM events WHERE run_id=? AND id>? ORDER BY id ASC LIMIT ?", (run_id, after_id, limit))
+    return [int(r[0]) for r in cur.fetchall()]
+
+
+def stream_events(
+    db_path: Path,
+    run_id: int,
+    after_id: int = 0,
+    *,
+    page: int = 256,
+    follow: bool = False,
+    poll: float = 0.5,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[dict[str, Any]]:
+    """Yield a run's event rows past ``after_id`` in id order, one indexed page at a time.
+
+    With ``follow`` it tails a live run: once caught up it polls for rows past the last id
+    seen every ``poll`` seconds, and stops after the run has an output row (written after its
+    last event) and a final page has been drained. One connection serves the stream; it is
+    only reopened when a writer starts a new shard.
+    """
+    conn = connect_read(db_path)
+    shards = shard_files(db_path)
+    try:
+        last_id = after_id
+        finished = False
+        while True:
+            rows = conn.execute(
+                "SELECT * FROM events WHERE run_id=? AND id>? ORDER BY id ASC LIMIT ?", (run_id, last_id, page)
+            ).fetchall()
+            for row in rows:
+                last_id = int(row["id"])
+                yield dict(row)
+            if len(rows) == page:
+                continue
+            if not follow or finished:
+                return
+            finished = conn.execute("SELECT 1 FROM outputs WHERE run_id=? LIMIT 1", (run_id,)).fetchone() is not None
+            if not finished:
+                sleep(poll)
+            if shard_files(db_path) != shards:
+                conn.close()
+                conn = connect_read(db_path)
+                shards = shard_files(db_path)
+    finally:
+        conn.close()
+
+
+def count_events(db_path: Path, run_id: int) -> int:
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM events WHERE run_id=?", (run_id,))
+    return int(cur.fetchone()[0])
+
+
+def row_to_event(row: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "agent": row["agent"],
+        "action": row["action"],
+        "target_id": row["target_id"],
+        "payload": json.loads(row["payload_json"]),
+    }
+
+
+@traced("db.write")
+@retry_on_busy
+def add_snapshot(
+    db_path: Path,
+    *,
+    run_id: int,
+    event_count: int,
+    last_event_id: int,
+    turn: int,
+    state: dict[str, Any],
+    keep: int | None = None,
+    spacing: int | None = None,
+) -> int:
+    """Store a snapshot; with ``keep``, prune the run's older snapshots in the same commit.
+
+    The ``keep`` latest always stay. Older ones are dropped, except that with ``spacing`` the
+    earliest snapshot in each ``spacing``-event stretch is kept, so seeking anywhere in a long
+    run replays at most about two stretches of events.
+    """
+    conn = connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO molt_snapshots(run_id, event_count, last_event_id, turn, created_at, state_json) VALUES(?,?,?,?,?,?)",
+        (run_id, event_count, last_event_id, turn, _now(), json.dumps(state)),
+    )
+    snapshot_id = int(cur.lastrowid)
+    if keep is not None:
+        sql = (
+            "DELETE FROM molt_snapshots WHERE run_id=? AND id NOT IN "
+            "(SELECT id FROM molt_snapshots WHERE run_id=? ORDER BY event_count DESC, id DESC LIMIT ?)"
+        )
+        params: tuple[Any, ...] = (run_id, run_id, max(1, keep))
+        if spacing:
+            # SQLite returns the bare ``id`` column from the row that holds MIN(event_count).
+            sql += (
+                " AND id NOT IN (SELECT id FROM (SELECT id, MIN(event_count) FROM molt_snapshots"
+                " WHERE run_id=? GROUP BY event_count / ?))"
+            )
+            params += (run_id, spacing)
+        conn.execute(sql, params)
+    conn.commit()
+    return snapshot_id
+
+
+def nearest_snapshot(
+    db_path: Path, run_id: int, event_count: int | None = None, *, with_state: bool = True
+) -> dict[str, Any] | None:
+    """Latest snapshot taken at or before ``event_count`` events (or the latest overall).
+
+    ``with_state=False`` skips loading ``state_json`` when only the position is needed.
+    """
+    columns = "*" if with_state else "id, run_id, event_count, last_event_id, turn, created_at"
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {columns} FROM molt_snapshots WHERE run_id=? AND event_count<=? ORDER BY event_count DESC, id DESC LIMIT 1",
+        (run_id, event_count if event_count is not None else 2**62),
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
+@traced("db.write")
+@retry_on_busy
+def save_checkpoint(
+    db_path: Path,
+    *,
+    run_id: int,
+    turn: int,
+    event_count: int,
+    last_event_id: int,
+    checkpoint_id: int | None = None,
+) -> int:
+    """Record how many turns a run has finished; returns the checkpoint row id.
+
+    With ``checkpoint_id`` the row is updated in place, so a writer keeps one row per run.
+    """
+    values = (turn, event_count, last_event_id, _now())
+    if checkpoint_id is not None and update_owned(
+        db_path,
+        "UPDATE molt_checkpoints SET turn=?, event_count=?, last_event_id=?, updated_at=? WHERE id=?",
+        (*values, checkpoint_id),
+    ):
+        return checkpoint_id
+    conn = connect(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO molt_checkpoints(run_id, turn, event_count, last_event_id, updated_at) VALUES(?,?,?,?,?)",
+        (run_id, *values),
+    )
+    conn.commit()
+    return int(cur.lastrowid)
+
+
+def latest_checkpoint(db_path: Path, run_id: int) -> dict[str, Any] | None:
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT * FROM molt_checkpoints WHERE run_id=? ORDER BY event_count DESC, turn DESC, id DESC LIMIT 1",
+        (run_id,),
+    )
+    row = cur.fetchone()
+    return dict(row) if row else None
+
+
 def export_events(db_path: Path, run_id: int) -> dict[str, Any]:
     return {"run_id": run_id, "events": list_events(db_path, run_id)}
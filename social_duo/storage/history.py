@@ -5,7 +5,8 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
-from social_duo.storage.db import connect
+from social_duo.core.spans import traced
+from social_duo.storage.db import connect, connect_read, retry_on_busy, update_owned
 
 
 ISO = "%Y-%m-%dT%H:%M:%SZ"
@@ -15,6 +16,8 @@ def _now() -> str:
     return datetime.now(timezone.utc).strftime(ISO)
 
 
+@traced("db.write")
+@retry_on_busy
 def create_session(db_path: Path, *, cwd: str, label: str | None) -> int:
     conn = connect(db_path)
     cur = conn.cursor()
@@ -27,13 +30,38 @@ def create_session(db_path: Path, *, cwd: str, label: str | None) -> int:
     return int(cur.lastrowid)
 
 
+@traced("db.write")
+@retry_on_busy
 def update_session(db_path: Path, session_id: int) -> None:
-    conn = connect(db_path)
+    update_owned(db_path, "UPDATE sessions SET updated_at=? WHERE id=?", (_now(), session_id))
+
+
+def find_session(db_path: Path, label: str) -> int | None:
+    conn = connect_read(db_path)
     cur = conn.cursor()
-    cur.execute("UPDATE sessions SET updated_at=? WHERE id=?", (_now(), session_id))
-    conn.commit()
+    cur.execute("SELECT id FROM sessions WHERE label=? ORDER BY id DESC LIMIT 1", (label,))
+    row = cur.fetchone()
+    return int(row[0]) if row else None
 
 
+def completed_batch_keys(db_path: Path, session_id: int) -> set[str]:
+    """``batch_key`` of every run in the session that reached a stored output."""
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT r.input_json FROM runs r WHERE r.session_id=? AND EXISTS (SELECT 1 FROM outputs o WHERE o.run_id = r.id)",
+        (session_id,),
+    )
+    keys = set()
+    for row in cur.fetchall():
+        key = json.loads(row[0]).get("batch_key")
+        if key:
+            keys.add(key)
+    return keys
+
+
+@traced("db.write")
+@retry_on_busy
 def create_run(db_path: Path, *, session_id: int, run_type: str, platform: str | None, input_json: dict[str, Any]) -> int:
     conn = connect(db_path)
     cur = conn.cursor()
@@ -45,6 +73,8 @@ def create_run(db_path: Path, *, session_id: int, run_type: str, platform: str |
     return int(cur.lastrowid)
 
 
+@traced("db.write")
+@retry_on_busy
 def add_step(
     db_path: Path,
     *,
@@ -64,6 +94,8 @@ def add_step(
     conn.commit()
 
 
+@traced("db.write")
+@retry_on_busy
 def add_output(db_path: Path, *, run_id: int, final_json: dict[str, Any]) -> None:
     conn = connect(db_path)
     cur = conn.cursor()
@@ -74,8 +106,38 @@ def add_output(db_path: Path, *, run_id: int, final_json: dict[str, Any]) -> Non
     conn.commit()
 
 
-def list_runs(db_path: Path, limit: int = 10) -> list[dict[str, Any]]:
+@retry_on_busy
+def add_spans(db_path: Path, *, run_id: int, spans: list[dict[str, Any]]) -> None:
+    if not spans:
+        return
     conn = connect(db_path)
+    conn.executemany(
+        "INSERT INTO spans(run_id, span_id, parent_id, name, start_ns, duration_ms, attrs_json) VALUES(?,?,?,?,?,?,?)",
+        [
+            (run_id, s["span_id"], s["parent_id"], s["name"], s["start_ns"], s["duration_ms"], json.dumps(s["attrs"], default=str))
+            for s in spans
+        ],
+    )
+    conn.commit()
+
+
+def list_spans(db_path: Path, run_id: int) -> list[dict[str, Any]]:
+    conn = connect_read(db_path)
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT span_id, parent_id, name, start_ns, duration_ms, attrs_json FROM spans WHERE run_id=? ORDER BY start_ns",
+        (run_id,),
+    )
+    spans = []
+    for row in cur.fetchall():
+        data = dict(row)
+        data["attrs"] = json.loads(data.pop("attrs_json"))
+        spans.append(data)
+    return spans
+
+
+def list_runs(db_path: Path, limit: int = 10) -> list[dict[str, Any]]:
+    conn = connect_read(db_path)
     cur = conn.cursor()
     cur.execute(
         "SELECT r.id, r.type, r.platform, r.created_at, s.label FROM runs r JOIN sessions s ON r.session_id = s.id ORDER BY r.created_at DESC LIMIT ?",
@@ -86,7 +148,7 @@ def list_runs(db_path: Path, limit: int = 10) -> list[dict[str, Any]]:
 
 
 def get_run(db_path: Path, run_id: int) -> dict[str, Any] | None:
-    conn = connect(db_path)
+    conn = connect_read(db_path)
     cur = conn.cursor()
     cur.execute("SELECT * FROM runs WHERE id=?", (run_id,))
     run = cur.fetchone()
@@ -104,7 +166,7 @@ def get_run(db_path: Path, run_id: int) -> dict[str, Any] | None:
 
 
 def latest_run_id(db_path: Path) -> int | None:
-    conn = connect(db_path)
+    conn = connect_read(db_path)
     cur = conn.cursor()
     cur.execute("SELECT id FROM runs ORDER BY created_at DESC LIMIT 1")
     row = cur.fetchone()
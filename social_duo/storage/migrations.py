@@ -60,4 +60,55 @@ MIGRATIONS = [
         FOREIGN KEY(run_id) REFERENCES runs(id)
     );
     """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_events_run ON events(run_id, id);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS molt_snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        event_count INTEGER NOT NULL,
+        last_event_id INTEGER NOT NULL,
+        turn INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        state_json TEXT NOT NULL,
+        FOREIGN KEY(run_id) REFERENCES runs(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_molt_snapshots_run ON molt_snapshots(run_id, event_count);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS molt_checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        turn INTEGER NOT NULL,
+        event_count INTEGER NOT NULL,
+        last_event_id INTEGER NOT NULL,
+        updated_at TEXT NOT NULL,
+        FOREIGN KEY(run_id) REFERENCES runs(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_molt_checkpoints_run ON molt_checkpoints(run_id, event_count);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS spans (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL,
+        span_id TEXT NOT NULL,
+        parent_id TEXT,
+        name TEXT NOT NULL,
+        start_ns INTEGER NOT NULL,
+        duration_ms REAL NOT NULL,
+        attrs_json TEXT NOT NULL,
+        FOREIGN KEY(run_id) REFERENCES runs(id)
+    );
+    CREATE INDEX IF NOT EXISTS idx_spans_run ON spans(run_id);
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS shards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        host TEXT NOT NULL,
+        pid INTEGER NOT NULL,
+        created_at TEXT NOT NULL,
+        closed_at TEXT
+    );
+    """,
 ]
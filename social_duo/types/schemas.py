@@ -107,3 +107,11 @@ class RunInput(BaseModel):
     risk: str | None = None
     source_text: str | None = None
     instruction: str | None = None
+
+
+class Brief(RunInput):
+    """One line of a batch file; ``id`` defaults to the line number."""
+
+    type: Literal["post", "reply"] = "post"
+    id: str | None = None
+    rounds: int | None = None
@@ -0,0 +1,81 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from social_duo.agents.prompts import EDITOR_SYSTEM
+from social_duo.core.batch import expand_briefs, load_briefs, run_batch
+from social_duo.core.config import default_config
+from social_duo.storage.history import add_output, completed_batch_keys, create_run, create_session
+
+WRITER_JSON = json.dumps({"recommended": "Draft", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]})
+EDITOR_JSON = json.dumps(
+    {
+        "verdict": "PASS",
+        "issues": [],
+        "edited_version": "Draft",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 90, "clarity": 90, "hook": 80, "risk": 10},
+    }
+)
+
+
+class ConcurrentLLM:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        content = EDITOR_JSON if messages[0]["content"] == EDITOR_SYSTEM else WRITER_JSON
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def test_load_briefs_jsonl_and_csv(tmp_path: Path):
+    jsonl = tmp_path / "briefs.jsonl"
+    jsonl.write_text(
+        json.dumps({"id": "a", "topic": "Launch", "platform": "all"})
+        + "\n\n"
+        + json.dumps({"type": "reply", "source_text": "Nice post", "platform": "linkedin"})
+        + "\n"
+    )
+    briefs = load_briefs(jsonl)
+    assert [b.id for b in briefs] == ["a", "3"]
+    items = expand_briefs(briefs, default_config())
+    assert [i.key for i in items] == ["a:x", "a:linkedin", "a:instagram", "a:threads", "3:linkedin"]
+
+    csv_path = tmp_path / "briefs.csv"
+    csv_path.write_text("id,topic,keywords,cta_required\nb1,Hiring,\"jobs, remote\",yes\n")
+    (brief,) = load_briefs(csv_path)
+    assert brief.keywords == ["jobs", "remote"]
+    assert brief.cta_required is True
+
+
+def test_run_batch_runs_concurrently_and_skips_completed(tmp_path: Path):
+    path = tmp_path / "briefs.jsonl"
+    path.write_text("\n".join(json.dumps({"id": str(n), "topic": f"Topic {n}"}) for n in range(8)))
+    config = default_config()
+    items = expand_briefs(load_briefs(path), config)
+
+    db_path = tmp_path / "history.db"
+    session_id = create_session(db_path, cwd=str(tmp_path), label="batch")
+    run_id = create_run(db_path, session_id=session_id, run_type="post", platform="x", input_json={"batch_key": "0:x"})
+    add_output(db_path, run_id=run_id, final_json={})
+    done = completed_batch_keys(db_path, session_id)
+    todo = [item for item in items if item.key not in done]
+
+    llm = ConcurrentLLM()
+    results = []
+    run_batch(todo, llm=llm, config=config, rounds=1, concurrency=4, on_done=results.append)
+
+    assert sorted(r.item.key for r in results) == [f"{n}:x" for n in range(1, 8)]
+    assert all(r.result is not None and r.result.editor.verdict == "PASS" for r in results)
+    assert 1 < llm.peak <= 4
+    assert all(set(r.output) == {"final", "editor", "loop", "prompt_cache", "structured_output"} for r in results)
+    assert {r.output["structured_output"]["calls"] for r in results} == {2}
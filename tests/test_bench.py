@@ -0,0 +1,20 @@
+from benchmarks.bench_suite import percentile, run
+
+
+def test_suite_runs_offline_against_stub_server() -> None:
+    report = run(runs=1, only="post_single,reply,discuss_12", pass_rate=1.0)
+
+    assert [row["scenario"] for row in report["scenarios"]] == ["post_single", "reply", "discuss_12"]
+    for row in report["scenarios"]:
+        assert row["ok"] == 1, row["errors"]
+        assert row["llm_calls_per_run"] >= 1
+        assert row["db_bytes_per_run"] >= 0
+    assert report["scenarios"][2]["llm_calls_per_run"] == 12
+    assert report["llm"]["errors"] == 0
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
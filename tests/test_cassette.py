@@ -0,0 +1,100 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import social_duo.providers.openai_compat as openai_compat
+from social_duo.agents.prompts import EDITOR_SYSTEM
+from social_duo.core.config import default_config, save_config
+from social_duo.main import app
+from social_duo.providers.cassette import CassetteMiss, RecordingLLM, ReplayLLM
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+WRITER_JSON = json.dumps({"recommended": "Ship it", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]})
+EDITOR_JSON = json.dumps(
+    {
+        "verdict": "PASS",
+        "issues": [],
+        "edited_version": "Ship it",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 90, "clarity": 90, "hook": 80, "risk": 10},
+    }
+)
+
+
+class StubLLM:
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        content = EDITOR_JSON if messages[0]["content"] == EDITOR_SYSTEM else WRITER_JSON
+        return {"choices": [{"message": {"content": content}}]}
+
+
+class CountingLLM:
+    supports_json_schema = True
+    model = "stub"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.calls = 0
+        self.delay = delay
+
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"choices": [{"message": {"content": f"answer {self.calls}"}}]}
+
+
+def _content(resp: dict) -> str:
+    return resp["choices"][0]["message"]["content"]
+
+
+def test_replay_serves_recorded_responses_by_request_hash(tmp_path: Path):
+    path = tmp_path / "c.jsonl"
+    recorder = RecordingLLM(CountingLLM(delay=0.05), path)
+    assert _content(recorder.chat(MESSAGES, temperature=0.2, max_tokens=10)) == "answer 1"
+    assert _content(recorder.chat(MESSAGES, temperature=0.2, max_tokens=10)) == "answer 2"
+    assert recorder.supports_json_schema is True
+
+    replay = ReplayLLM(path, speed=0)
+    assert len(replay) == 2 and replay.model == "stub" and replay.supports_json_schema
+    started = time.perf_counter()
+    # Identical requests come back in recorded order, then the last one repeats.
+    assert [_content(replay.chat(MESSAGES, temperature=0.2, max_tokens=10)) for _ in range(3)] == [
+        "answer 1",
+        "answer 2",
+        "answer 2",
+    ]
+    assert time.perf_counter() - started < 0.05
+    with pytest.raises(CassetteMiss):
+        replay.chat(MESSAGES, temperature=0.9, max_tokens=10)
+
+    started = time.perf_counter()
+    ReplayLLM(path, speed=1.0).chat(MESSAGES, temperature=0.2, max_tokens=10)
+    assert time.perf_counter() - started >= 0.04
+
+
+def test_cassette_option_records_then_replays_offline(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    workspace = tmp_path / ".social-duo"
+    workspace.mkdir()
+    save_config(workspace / "config.json", default_config())
+    (tmp_path / "facts.txt").write_text("- fact\n")
+    post = ["post", "--goal", "g", "--topic", "t", "--audience", "a", "--tone", "calm", "--length", "short"]
+    post += ["--facts", "facts.txt", "--rounds", "1", "--json"]
+
+    monkeypatch.setattr(openai_compat, "OpenAICompatibleClient", StubLLM)
+    recorded = CliRunner().invoke(app, ["--cassette", "demo", *post])
+    assert recorded.exit_code == 0, recorded.output
+    cassette = workspace / "cassettes" / "demo.jsonl"
+    assert len(cassette.read_text().splitlines()) == 1 + 2
+
+    def offline():
+        raise AssertionError("replay must not build a network client")
+
+    monkeypatch.setattr(openai_compat, "OpenAICompatibleClient", offline)
+    replayed = CliRunner().invoke(app, ["--cassette", "demo", "--replay-speed", "0", *post])
+    assert replayed.exit_code == 0, replayed.output
+    assert json.loads(replayed.output)["final"] == json.loads(recorded.output)["final"]
+
+    missing = CliRunner().invoke(app, ["--cassette", "nope", "--cassette-mode", "replay", *post])
+    assert missing.exit_code == 2
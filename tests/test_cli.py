@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from social_duo.main import COMMANDS, app
+
+
+def test_main_import_defers_subcommands_and_http():
+    code = (
+        "import sys, social_duo.main\n"
+        "print(sorted(m for m in sys.modules if m == 'httpx' or m.endswith('_cmd')))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == "[]"
+
+
+def test_lazy_commands_resolve_on_use():
+    runner = CliRunner()
+    result = runner.invoke(app, ["--help"])
+    assert result.exit_code == 0
+    for name in COMMANDS:
+        assert name in result.output
+    result = runner.invoke(app, ["batch", "run", "--help"])
+    assert result.exit_code == 0
+    assert "--concurrency" in result.output
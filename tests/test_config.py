@@ -0,0 +1,49 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from social_duo.core.config import default_config, load_config, save_config, update_config_value
+from social_duo.core.policy import get_policy
+
+
+def test_load_config_is_cached_until_content_changes(tmp_path: Path):
+    path = tmp_path / "config.json"
+    config = default_config()
+    config.brand_voice.banned_phrases = ["game changer"]
+    save_config(path, config)
+
+    first = load_config(path)
+    assert load_config(path) is first
+    policy = get_policy(first)
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_config(path) is first
+
+    data = json.loads(path.read_text())
+    data["defaults"]["rounds"] = 4
+    path.write_text(json.dumps(data))
+    reloaded = load_config(path)
+    assert reloaded is not first
+    assert reloaded.defaults.rounds == 4
+    assert reloaded.brand_voice is first.brand_voice
+    assert reloaded.platform_constraints is first.platform_constraints
+    assert get_policy(reloaded).banned_matcher is policy.banned_matcher
+
+
+def test_update_config_value_validates_only_the_touched_section():
+    config = default_config()
+    updated = update_config_value(config, "platform_constraints.x.char_limit", "300")
+    assert updated.platform_constraints.x.char_limit == 300
+    assert config.platform_constraints.x.char_limit != 300
+    assert updated.brand_voice is config.brand_voice
+    assert updated.platform_constraints.linkedin is config.platform_constraints.linkedin
+
+    updated = update_config_value(updated, "brand.claims_policy.no_unverified_claims", "false")
+    assert updated.brand_voice.claims_policy == {"no_unverified_claims": "false"}
+    with pytest.raises(ValueError):
+        update_config_value(config, "brand.nope.value", "x")
+    with pytest.raises(ValueError):
+        update_config_value(config, "platform_constraints.x.char_limit", "many")
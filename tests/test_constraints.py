@@ -1,5 +1,8 @@
+import json
+
 from social_duo.core.config import default_config
-from social_duo.core.constraints import validate_text
+from social_duo.core.constraints import parse_thread, split_thread, validate_text
+from social_duo.core.policy import get_policy
 
 
 def test_constraints_basic():
@@ -26,3 +29,50 @@ def test_constraints_cta():
     )
     assert metrics["cta_present"] is False
     assert any("CTA required" in i for i in issues)
+
+
+def test_thread_validated_per_segment():
+    config = default_config()
+    segments = [f"{i}/3 " + "Vector search maps meaning to geometry. " * 5 for i in range(1, 4)]
+    issues, metrics = validate_text(
+        "\n\n".join(segments),
+        config=config,
+        platform="x",
+        cta_required=False,
+        cta_text=None,
+        thread_count=3,
+    )
+    assert metrics["segment_count"] == 3
+    assert metrics["char_count"] > 280
+    assert not any("character limit" in i for i in issues)
+
+
+def test_split_thread_numbers_segments_within_limit():
+    text = " ".join(f"Sentence number {i} explains one idea clearly." for i in range(30))
+    segments = split_thread(text, 280)
+    assert len(segments) > 1
+    assert all(len(s) <= 280 for s in segments)
+    assert segments[0].startswith(f"1/{len(segments)} ")
+    assert parse_thread("\n\n".join(segments)) == segments
+
+
+def test_policy_bundle_cached_per_config():
+    config = default_config()
+    policy = get_policy(config)
+    assert get_policy(config) is policy
+    assert get_policy(default_config()) is not policy
+    assert json.loads(policy.constraints_json("x")) == {"x": config.platform_constraints.x.model_dump()}
+    assert set(json.loads(policy.constraints_json("all"))) == {"x", "linkedin", "instagram", "threads"}
+
+
+def test_banned_matcher_matches_plain_scan():
+    config = default_config()
+    config.brand_voice.banned_phrases = ["game changer", "game", "synergy"]
+    issues, metrics = validate_text(
+        "This GAME changer is great",
+        config=config,
+        platform="x",
+        cta_required=False,
+        cta_text=None,
+    )
+    assert metrics["banned_hits"] == ["game changer", "game"]
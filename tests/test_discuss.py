@@ -2,8 +2,10 @@ import json
 from pathlib import Path
 
 from social_duo.core.config import default_config
-from social_duo.core.discuss_loop import DiscussLoopError, run_discuss_loop
+from social_duo.core.context_budget import ContextBudget
+from social_duo.core.discuss_loop import ArtifactStore, DiscussLoopError, run_discuss_loop
 from social_duo.storage.history import add_output, add_step, create_run, create_session, get_run
+from social_duo.types.discuss_schemas import DiscussArtifact
 
 
 class DummyLLM:
@@ -129,3 +131,95 @@ def test_discuss_persists_steps_and_output(tmp_path: Path):
     assert stored is not None
     assert stored["steps"]
     assert stored["output"]
+
+
+def test_artifact_store_validates_once_and_dedupes():
+    config = default_config()
+    store = ArtifactStore(config=config, platform="x")
+    long_post = DiscussArtifact(kind="post", platform="x", content="word " * 80)
+    assert store.add(long_post)
+    assert not store.add(DiscussArtifact(kind="post", platform="x", content="word " * 80))
+    store.add(DiscussArtifact(kind="post", platform="linkedin", content="ignored for x target"))
+    assert len(store) == 2
+    assert len([i for i in store.issues if "character limit" in i]) == 1
+    snapshot = store.to_json()
+    assert store.to_json() is snapshot
+    assert json.loads(snapshot)[0]["content"] == long_post.content
+
+    # issues follow the verbatim window; older ones only leave a count in the summary
+    windowed = ArtifactStore(config=config, platform="x", window=1)
+    windowed.add(long_post)
+    assert windowed.issues == store.issues
+    windowed.add(DiscussArtifact(kind="post", platform="x", content="Short and fine."))
+    assert windowed.issues == []
+    assert f"({len(store.issues)} issues)" in windowed.summary.text()
+
+
+def test_discuss_over_budget_prompt_keeps_schema():
+    class RecordingLLM(DummyLLM):
+        def __init__(self, responses):
+            super().__init__(responses)
+            self.prompts = []
+
+        def chat(self, messages, *, temperature, max_tokens, response_format=None):
+            self.prompts.append(messages)
+            return super().chat(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format)
+
+    responses = [
+        _turn(
+            "DRAFT",
+            "Another long draft.",
+            chosen={"topic": "Focus blocks", "angle": "workflow", "platform": "x"},
+            artifacts=[{"kind": "post", "platform": "x", "content": f"Focus blocks post {i}. " + "detail " * 150}],
+        )
+        for i in range(8)
+    ]
+    llm = RecordingLLM(responses)
+    budget = ContextBudget(max_tokens=900, item_chars=2000)
+    run_discuss_loop(
+        llm=llm, config=default_config(), platform="x", turns=8, mode="mixed", risk="low", stop_on="turns", budget=budget
+    )
+
+    for messages in llm.prompts:
+        context = messages[-1]["content"]
+        assert "Schema: {" in context
+        assert context.rstrip().endswith("Do NOT echo this context.")
+        assert sum(len(m["content"]) for m in messages) <= budget.max_tokens * 4
+    assert "Recent artifacts: [" in llm.prompts[-1][-1]["content"]
+
+
+def test_discuss_prompt_size_stays_flat_on_long_runs():
+    responses = [
+        _turn(
+            "DRAFT",
+            f"Draft number {i}. " + "Padding words for the message. " * 10,
+            chosen={"topic": "Focus blocks", "angle": "workflow", "platform": "x"},
+            artifacts=[{"kind": "post", "platform": "x", "content": f"Focus blocks post {i}. " + "detail " * 30}],
+        )
+        for i in range(60)
+    ]
+
+    class SizingLLM(DummyLLM):
+        def __init__(self, responses):
+            super().__init__(responses)
+            self.sizes = []
+
+        def chat(self, messages, *, temperature, max_tokens, response_format=None):
+            self.sizes.append(sum(len(m["content"]) for m in messages))
+            return super().chat(messages, temperature=temperature, max_tokens=max_tokens, response_format=response_format)
+
+    llm = SizingLLM(responses)
+    budget = ContextBudget(max_tokens=2000)
+    run_discuss_loop(
+        llm=llm,
+        config=default_config(),
+        platform="x",
+        turns=55,
+        mode="mixed",
+        risk="low",
+        stop_on="turns",
+        budget=budget,
+    )
+
+    assert max(llm.sizes) <= budget.max_tokens * 4
+    assert abs(llm.sizes[50] - llm.sizes[20]) < 0.1 * llm.sizes[20]
@@ -1,20 +1,22 @@
 import json
 
 from social_duo.agents.editor import EditorAgent
+from social_duo.agents.structured import StructuredStats
 from social_duo.agents.writer import WriterAgent
 from social_duo.core.config import default_config
-from social_duo.core.loop import run_loop
+from social_duo.core.loop import LoopBudget, loop_output, run_loop
 
 
 class DummyLLM:
     def __init__(self, responses):
         self.responses = responses
         self.calls = 0
+        self.usage = None
 
     def chat(self, messages, *, temperature, max_tokens, response_format=None):
         content = self.responses[self.calls]
         self.calls += 1
-        return {"choices": [{"message": {"content": content}}]}
+        return {"choices": [{"message": {"content": content}}], "usage": self.usage}
 
 
 def test_loop_passes():
@@ -61,3 +63,158 @@ def test_loop_passes():
     assert result.final.recommended == "Hello world"
     assert result.editor.verdict == "PASS"
     assert len(result.trace) == 2
+
+
+def test_prompt_prefix_stable_across_rounds():
+    writer_json = json.dumps(
+        {"recommended": "Draft", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]}
+    )
+    fail_json = json.dumps(
+        {
+            "verdict": "FAIL",
+            "issues": [{"type": "clarity", "detail": "Be clearer"}],
+            "edited_version": "Clearer draft",
+            "alt_suggestions": [],
+            "scores": {"constraint_fit": 70, "clarity": 50, "hook": 50, "risk": 10},
+        }
+    )
+    llm = DummyLLM([writer_json, fail_json, writer_json, fail_json])
+    llm.usage = {"prompt_tokens": 100, "prompt_tokens_details": {"cached_tokens": 60}}
+    writer = WriterAgent(llm)
+    editor = EditorAgent(llm)
+    config = default_config()
+    context = {
+        "goal": "educate",
+        "topic": "test",
+        "platform": "x",
+        "facts": ["fact one"],
+        "brand_voice": config.brand_voice.model_dump(),
+        "constraints": config.platform_constraints.x.model_dump(),
+    }
+
+    draft_layout = writer._build_prompt(context, mode="draft")
+    revise_layout = writer._build_prompt({**context, "editor_feedback": ["x"]}, mode="revise")
+    assert draft_layout.prefix_hash == revise_layout.prefix_hash
+    assert draft_layout.messages()[:2] == revise_layout.messages()[:2]
+
+    run_loop(writer=writer, editor=editor, config=config, context=context, rounds=2)
+    assert writer.cache_stats.prefix_repeats == 1
+    assert writer.cache_stats.hit_rate == 0.6
+
+
+def _loop_context(config):
+    return {
+        "goal": "educate",
+        "topic": "test",
+        "platform": "x",
+        "brand_voice": config.brand_voice.model_dump(),
+        "constraints": config.platform_constraints.x.model_dump(),
+    }
+
+
+def _fail_json(edited, clarity=50):
+    return json.dumps(
+        {
+            "verdict": "FAIL",
+            "issues": [{"type": "clarity", "detail": "Be clearer"}],
+            "edited_version": edited,
+            "alt_suggestions": [],
+            "scores": {"constraint_fit": 70, "clarity": clarity, "hook": 50, "risk": 10},
+        }
+    )
+
+
+def test_budget_accepts_valid_editor_edit_without_rewriting():
+    writer_json = json.dumps({"recommended": "Draft", "variants": ["a"], "hashtags": [], "rationale": ["r"]})
+    llm = DummyLLM([writer_json, _fail_json("A clearer draft for engineers.")])
+    config = default_config()
+
+    result = run_loop(
+        writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=_loop_context(config),
+        rounds=3, budget=LoopBudget(),
+    )
+    assert llm.calls == 2
+    assert result.stop_reason == "accepted_edit"
+    assert result.final.recommended == "A clearer draft for engineers."
+    stored = loop_output(result, writer=WriterAgent(llm), editor=EditorAgent(llm), stats=StructuredStats())
+    assert (stored["editor"]["verdict"], stored["editor"]["accepted_edit"]) == ("FAIL", True)
+
+
+def test_budget_stops_when_editor_scores_plateau():
+    drafts = [
+        json.dumps({"recommended": text, "variants": ["a"], "hashtags": [], "rationale": ["r"]})
+        for text in ("First take on the topic", "A rather different second attempt", "Third")
+    ]
+    llm = DummyLLM([drafts[0], _fail_json(""), drafts[1], _fail_json("", clarity=51), drafts[2], _fail_json("")])
+    config = default_config()
+
+    result = run_loop(
+        writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=_loop_context(config),
+        rounds=3, budget=LoopBudget(),
+    )
+    assert llm.calls == 4
+    assert (result.rounds, result.stop_reason) == (2, "plateau")
+
+
+def test_budget_prefers_valid_edit_over_plateau_and_keeps_better_draft_on_regression():
+    drafts = [
+        json.dumps({"recommended": text, "variants": ["a"], "hashtags": [], "rationale": ["r"]})
+        for text in ("First take on the topic", "A rather different second attempt")
+    ]
+    config = default_config()
+
+    llm = DummyLLM([drafts[0], _fail_json(""), drafts[1], _fail_json("A clearer draft for engineers.")])
+    result = run_loop(
+        writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=_loop_context(config),
+        rounds=3, budget=LoopBudget(),
+    )
+    assert (result.rounds, result.stop_reason) == (2, "accepted_edit")
+    assert result.final.recommended == "A clearer draft for engineers."
+
+    llm = DummyLLM([drafts[0], _fail_json("", clarity=80), drafts[1], _fail_json("", clarity=40)])
+    result = run_loop(
+        writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=_loop_context(config),
+        rounds=3, budget=LoopBudget(),
+    )
+    assert (result.rounds, result.stop_reason) == (2, "regressed")
+    assert result.final.recommended == "First take on the topic"
+    assert result.editor.scores.clarity == 80
+
+
+def test_tournament_scores_candidates_and_keeps_the_winner():
+    import threading
+
+    from social_duo.agents.prompts import EDITOR_SYSTEM
+
+    class TournamentLLM:
+        def __init__(self):
+            self.lock = threading.Lock()
+            self.critiqued = []
+
+        def chat(self, messages, *, temperature, max_tokens, response_format=None):
+            if messages[0]["content"] != EDITOR_SYSTEM:
+                # over-long drafts lose locally; the 0.75 draft is the one the editor likes
+                text = "x" * 400 if temperature == 1.0 else f"Candidate at {temperature} for engineers."
+                return {"choices": [{"message": {"content": json.dumps(
+                    {"recommended": text, "variants": [], "hashtags": [], "rationale": []})}}]}
+            draft = next(line for line in messages[-1]["content"].splitlines() if line.startswith("Draft: "))
+            with self.lock:
+                self.critiqued.append(draft)
+            verdict = "PASS" if "0.75" in draft else "FAIL"
+            return {"choices": [{"message": {"content": json.dumps({
+                "verdict": verdict, "issues": [], "edited_version": "", "alt_suggestions": [],
+                "scores": {"constraint_fit": 80, "clarity": 80, "hook": 80, "risk": 10}})}}]}
+
+    llm = TournamentLLM()
+    config = default_config()
+    result = run_loop(
+        writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=_loop_context(config),
+        rounds=2, candidates=3, top_k=2,
+    )
+
+    roles = [step["role"] for step in result.trace]
+    assert roles.count("candidate") == 3
+    assert roles.count("candidate_critique") == 2
+    assert len(llm.critiqued) == 2 and not any("xxxx" in d for d in llm.critiqued)
+    assert result.final.recommended == "Candidate at 0.75 for engineers."
+    assert result.stop_reason == "pass"
@@ -1,8 +1,15 @@
 import json
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 from social_duo.core.molt_engine import FeedState, reduce_event, simulate_molt
-from social_duo.storage.events import add_event, list_events
+from social_duo.core.molt_replay import SnapshotWriter, seek, state_at
+from social_duo.core.molt_swarm import RoundRobinScheduler, default_personas, simulate_swarm
+from social_duo.core.render import MoltRenderer, molt_event_line
+from social_duo.storage.events import add_event, add_snapshot, list_events, nearest_snapshot, stream_events
+from social_duo.storage.history import add_output
 
 
 class DummyLLM:
@@ -42,6 +49,22 @@ def test_reducer_threads():
     assert "R1" in state.replies
 
 
+def test_feed_state_indexes_threads_and_tails():
+    state = FeedState(max_comments=3)
+    reduce_event(state, {"action": "CREATE_POST", "payload": {"post_id": "P1", "title": "Bike lanes", "content": "c"}})
+    for idx in (1, 2, 3):
+        reduce_event(state, {"agent": "AgentA", "action": "COMMENT", "payload": {"comment_id": f"C{idx}", "post_id": "P1", "content": f"c{idx}"}})
+    reduce_event(state, {"agent": "AgentB", "action": "REPLY", "payload": {"reply_id": "R1", "parent_id": "C3", "content": "r1"}})
+
+    assert state.latest_post_id() == "P1"
+    assert state.latest_comment_id() == "C3"
+    assert [c["content"] for c in state.recent("comment", 2)] == ["c2", "c3"]
+    assert state.recent("reply", 0) == []
+    assert state.children == {"P1": ["C1", "C2", "C3"], "C3": ["R1"]}
+    assert state.log["reply"][0].agent == "AgentB"
+    assert state.sorted_topics == ["bike lanes"]
+
+
 def test_retry_and_error_event():
     bad = "not json"
     good = json.dumps({
@@ -82,6 +105,29 @@ def test_events_persist_and_replay(tmp_path: Path):
     assert len(rows) == 2
 
 
+def test_stream_events_pages_and_follows_live_run(tmp_path: Path):
+    db_path = tmp_path / "history.db"
+    for idx in range(5):
+        add_event(db_path, run_id=1, agent="A", action="UPVOTE", target_id=f"P{idx}", payload={})
+    add_event(db_path, run_id=2, agent="B", action="UPVOTE", target_id="other", payload={})
+    assert [r["target_id"] for r in stream_events(db_path, 1, 2, page=2)] == ["P2", "P3", "P4"]
+
+    polls = []
+
+    def tick(seconds):
+        # The writer makes progress between polls, then completes the run.
+        polls.append(seconds)
+        if len(polls) == 1:
+            add_event(db_path, run_id=1, agent="A", action="UPVOTE", target_id="P5", payload={})
+        else:
+            add_event(db_path, run_id=1, agent="A", action="UPVOTE", target_id="P6", payload={})
+            add_output(db_path, run_id=1, final_json={})
+
+    rows = list(stream_events(db_path, 1, page=2, follow=True, poll=0.25, sleep=tick))
+    assert [r["target_id"] for r in rows] == [f"P{i}" for i in range(7)]
+    assert polls == [0.25, 0.25]
+
+
 def test_moderation_creates_rewrite():
     mod = json.dumps({
         "action": "MODERATE",
@@ -111,3 +157,172 @@ def test_moderation_creates_rewrite():
     actions = [e["action"] for e in events]
     assert "MODERATE" in actions
     assert "REWRITE" in actions
+
+
+def test_speculative_run_matches_sequential():
+    responses = [
+        json.dumps({"action": "CREATE_POST", "title": "Transit data", "content": "Open transit data helps cities plan."}),
+        json.dumps({"action": "COMMENT", "content": "Transit data quality varies a lot between cities."}),
+        json.dumps({"action": "COMMENT", "content": "A second comment is over the limit and leaves no event."}),
+        json.dumps({"action": "REPLY", "content": "Agreed, transit data needs shared standards."}),
+        json.dumps({"action": "REPLY", "content": "Standards plus funding for transit data teams."}),
+    ]
+
+    def run(speculative):
+        events = []
+        result = simulate_molt(
+            llm=DummyLLM(list(responses)),
+            turns=4,
+            platform="x",
+            risk="low",
+            topic=None,
+            cadence="fast",
+            stop_on="turns",
+            event_cb=events.append,
+            speculative=speculative,
+        )
+        return events, result
+
+    seq_events, _ = run(False)
+    spec_events, spec_result = run(True)
+    assert spec_events == seq_events
+    assert spec_result["speculation"] == {"hits": 3, "misses": 0}
+
+
+def test_snapshot_seek_and_resume(tmp_path: Path):
+    db_path = tmp_path / "history.db"
+    responses = [
+        json.dumps({"action": "CREATE_POST", "title": "Transit data", "content": "Open transit data helps cities plan."}),
+        json.dumps({"action": "COMMENT", "content": "Transit data quality varies a lot between cities."}),
+        json.dumps({"action": "COMMENT", "content": "A second comment is over the limit and leaves no event."}),
+        json.dumps({"action": "REPLY", "content": "Agreed, transit data needs shared standards."}),
+        json.dumps({"action": "REPLY", "content": "Standards plus funding for transit data teams."}),
+    ]
+
+    def run(llm, turns, writer, **kwargs):
+        def sink(event):
+            writer.record(add_event(db_path, run_id=1, agent=event["agent"], action=event["action"],
+                                    target_id=event.get("target_id"), payload=event.get("payload", {})))
+
+        result = simulate_molt(llm=llm, turns=turns, platform="x", risk="low", topic=None, cadence="fast",
+                               stop_on="turns", event_cb=sink, speculative=False, on_turn=writer, **kwargs)
+        writer.flush()
+        return result["state"]
+
+    full = simulate_molt(llm=DummyLLM(list(responses)), turns=5, platform="x", risk="low", topic=None,
+                         cadence="fast", stop_on="turns", event_cb=lambda e: None, speculative=False)["state"]
+
+    # "crash" after three turns (the third dropped), then resume from the stored checkpoint
+    run(DummyLLM(list(responses)), 3, SnapshotWriter(db_path, 1, every=1))
+    point = state_at(db_path, 1)
+    assert (point.turn, point.event_count) == (3, 2)
+    writer = SnapshotWriter(db_path, 1, every=1, keep=2, event_count=point.event_count, last_event_id=point.last_event_id)
+    resumed = run(DummyLLM(list(responses[3:])), 5, writer, state=point.state, start_turn=point.turn)
+    assert resumed.to_snapshot() == full.to_snapshot()
+    assert state_at(db_path, 1).turn == 5
+
+    # the latest snapshots are kept, plus the first of each older spacing stretch
+    counts = sqlite3.connect(db_path).execute("SELECT event_count FROM molt_snapshots ORDER BY event_count").fetchall()
+    assert [row[0] for row in counts] == [1, 2, 3]
+    point = state_at(db_path, 1, 3)
+    assert point.event_count == 3
+    assert list(point.state.replies) == ["R1"]
+    assert point.state.next_id("reply") == "R2"
+    early = state_at(db_path, 1, 1)
+    assert (early.event_count, list(early.state.posts), early.state.comments) == (1, ["P1"], {})
+    ids = [row["id"] for row in list_events(db_path, 1)]
+    assert [seek(db_path, 1, n) for n in (1, 2, 3, 9)] == [(1, ids[0]), (2, ids[1]), (3, ids[2]), (3, ids[2])]
+
+    for count in range(10, 210, 10):
+        add_snapshot(db_path, run_id=2, event_count=count, last_event_id=count, turn=count, state={}, keep=2, spacing=50)
+    counts = sqlite3.connect(db_path).execute("SELECT event_count FROM molt_snapshots WHERE run_id=2 ORDER BY event_count")
+    assert [row[0] for row in counts] == [10, 50, 100, 150, 190, 200]
+    assert nearest_snapshot(db_path, 2, 140)["event_count"] == 100
+
+
+def test_swarm_keeps_per_feed_reducer_semantics():
+    import threading
+
+    class FeedAwareLLM:
+        def __init__(self):
+            self.calls = 0
+            self.lock = threading.Lock()
+            self.systems = set()
+
+        def chat(self, messages, *, temperature, max_tokens, response_format=None):
+            with self.lock:
+                n = self.calls
+                self.calls += 1
+                self.systems.add(messages[0]["content"])
+            context = messages[-1]["content"]
+            if "Recent posts: []" in context:
+                action = "CREATE_POST"
+            elif "Comments remaining: 1" in context:
+                action = "COMMENT"
+            else:
+                action = "REPLY"
+            content = f"Idea {n} about community gardens and shared tools."
+            return {"choices": [{"message": {"content": json.dumps({"action": action, "title": f"Gardens {n}", "content": content})}}]}
+
+    events = []
+    llm = FeedAwareLLM()
+    result = simulate_swarm(
+        llm=llm,
+        personas=default_personas(5),
+        feeds=3,
+        turns=30,
+        platform="x",
+        risk="low",
+        topic=None,
+        event_cb=events.append,
+        scheduler=RoundRobinScheduler(),
+        concurrency=3,
+    )
+
+    assert result["stats"]["turns"] == 30
+    # default reply cap covers each feed's share of turns, so nearly every turn lands
+    assert result["stats"]["events"] >= 27
+    assert all("between Agent1, Agent2, Agent3, Agent4 and Agent5" in system for system in llm.systems)
+    assert not any("AgentA" in system for system in llm.systems)
+    assert {e["feed_id"] for e in events} == {"F1", "F2", "F3"}
+    for feed_id, state in result["feeds"].items():
+        assert len(state.posts) == 1
+        assert len(state.comments) == 1
+        feed_posts = [e for e in events if e["feed_id"] == feed_id and e["action"] == "CREATE_POST"]
+        assert [e["payload"]["post_id"] for e in feed_posts] == list(state.posts)
+
+
+def test_renderer_batches_frames_off_thread_and_drains_on_close(capsys):
+    events = [
+        {"agent": "AgentA", "action": "CREATE_POST", "target_id": f"P{i}", "payload": {"post_id": f"P{i}", "title": f"t{i}"}}
+        for i in range(200)
+    ]
+    with MoltRenderer("ndjson", fps=10) as renderer:
+        for event in events:
+            renderer.submit(event)
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["target_id"] for line in lines] == [f"P{i}" for i in range(200)]
+    assert renderer.rendered == 200 and renderer.frames < 200
+
+    with MoltRenderer("rich", fps=10) as renderer:
+        for event in events[:20]:
+            renderer.submit(event)
+    out = capsys.readouterr().out
+    assert "[MyVillage POST P0] (Agent: AgentA)" in out and "t19" in out
+
+    assert molt_event_line(events[0], ndjson=False) == "CREATE_POST P0 AgentA: t0"
+
+
+def test_renderer_error_does_not_mask_body_exception():
+    bad = {"agent": "AgentA", "action": "CREATE_POST", "target_id": "P1", "payload": {"title": object()}}
+    with pytest.raises(KeyError, match="llm failed"):
+        with MoltRenderer("ndjson", fps=0) as renderer:
+            renderer.submit(bad)
+            renderer._stop()
+            raise KeyError("llm failed")
+    assert isinstance(renderer._error, TypeError)
+
+    # with no exception in flight the render error still surfaces
+    with pytest.raises(TypeError):
+        with MoltRenderer("ndjson", fps=0) as renderer:
+            renderer.submit(bad)
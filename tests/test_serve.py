@@ -0,0 +1,177 @@
+import io
+import json
+import threading
+import urllib.error
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import social_duo.cli.post_cmd as post_cmd
+import social_duo.providers.openai_compat as openai_compat
+from social_duo.agents.prompts import EDITOR_SYSTEM
+from social_duo.core.config import default_config, save_config
+from social_duo.providers.cassette import CassetteSettings, using_cassette
+from social_duo.server.client import find_daemon, forward, request
+from social_duo.server.daemon import Daemon
+from social_duo.server.jobs import JobManager
+from social_duo.storage.db import connect_read
+
+WRITER_JSON = json.dumps({"recommended": "Ship it", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]})
+EDITOR_JSON = json.dumps(
+    {
+        "verdict": "PASS",
+        "issues": [],
+        "edited_version": "Ship it",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 90, "clarity": 90, "hook": 80, "risk": 10},
+    }
+)
+
+
+class StubLLM:
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        content = EDITOR_JSON if messages[0]["content"] == EDITOR_SYSTEM else WRITER_JSON
+        return {"choices": [{"message": {"content": content}}]}
+
+
+class GatedLLM(StubLLM):
+    def __init__(self):
+        self.gate = threading.Event()
+
+    def chat(self, messages, **kwargs):
+        self.gate.wait(5)
+        return super().chat(messages, **kwargs)
+
+
+def _workspace(tmp_path: Path) -> Path:
+    workspace = tmp_path / ".social-duo"
+    workspace.mkdir()
+    save_config(workspace / "config.json", default_config())
+    return workspace
+
+
+def _start(daemon: Daemon) -> threading.Thread:
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if find_daemon(daemon.workspace):
+            break
+        threading.Event().wait(0.01)
+    return thread
+
+
+def test_forward_runs_on_daemon_and_falls_back_for_prompts(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(post_cmd, "open_llm", StubLLM)
+    workspace = _workspace(tmp_path)
+    facts = tmp_path / "facts.txt"
+    facts.write_text("- fact one\n")
+
+    daemon = Daemon(workspace)
+    thread = _start(daemon)
+    try:
+        argv = ["post", "--goal", "announce", "--topic", "Launch", "--audience", "devs", "--tone", "calm"]
+        argv += ["--length", "short", "--facts", str(facts), "--json"]
+        out = io.StringIO()
+        assert forward(argv, stdout=out, stderr=io.StringIO()) == 0
+        assert json.loads(out.getvalue())["final"]["recommended"] == "Ship it"
+
+        out = io.StringIO()
+        assert forward(["post", "--topic", "Launch"], stdout=out) is None
+        assert out.getvalue() == ""
+        assert forward(["history", "--list"]) is None
+        assert daemon.health()["commands_served"] == 1
+    finally:
+        request(find_daemon(workspace), "POST", "/shutdown", {}).close()
+        thread.join(timeout=5)
+    assert find_daemon(workspace) is None
+
+
+def test_prompting_command_falls_back_without_writing(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    opened = []
+    monkeypatch.setattr(post_cmd, "open_llm", lambda: opened.append(1) or StubLLM())
+    workspace = _workspace(tmp_path)
+    argv = ["post", "--goal", "a", "--topic", "Launch", "--audience", "d", "--tone", "c", "--length", "short", "--json"]
+
+    daemon = Daemon(workspace)
+    thread = _start(daemon)
+    try:
+        assert forward(argv, stdout=io.StringIO(), stderr=io.StringIO()) is None
+    finally:
+        request(find_daemon(workspace), "POST", "/shutdown", {}).close()
+        thread.join(timeout=5)
+    assert opened == []
+    db_path = workspace / "history.db"
+    if db_path.exists():
+        assert connect_read(db_path).execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 0
+
+    result = CliRunner().invoke(post_cmd.post_app, argv[1:], input="\n")
+    assert result.exit_code == 0, result.output
+    assert opened == [1]
+    conn = connect_read(db_path)
+    assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+
+
+def test_job_api_streams_events_and_limits_concurrency(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(openai_compat, "OpenAICompatibleClient", StubLLM)
+    workspace = _workspace(tmp_path)
+    daemon = Daemon(workspace, max_jobs=2)
+    thread = _start(daemon)
+    info = find_daemon(workspace)
+    try:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            request(info, "POST", "/jobs", {"type": "post", "input": {"platform": "x"}})
+        assert exc.value.code == 400
+        for bad in ({"mode": "essays"}, {"risk": "extreme"}):
+            with pytest.raises(urllib.error.HTTPError) as exc:
+                request(info, "POST", "/jobs", {"type": "discuss", "input": bad})
+            assert exc.value.code == 400
+        with request(info, "POST", "/jobs", {"type": "post", "input": {"topic": "Launch", "platform": "x"}}) as resp:
+            job = json.load(resp)
+        with request(info, "GET", f"/jobs/{job['id']}/events") as resp:
+            stream = resp.read().decode()
+        assert "event: run" in stream
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            request(info, "GET", f"/jobs/{job['id']}/events?after=latest")
+        assert exc.value.code == 400
+        with request(info, "GET", f"/jobs/{job['id']}") as resp:
+            job = json.load(resp)
+        assert job["status"] == "succeeded"
+        assert job["result"]["runs"][0]["final"]["recommended"] == "Ship it"
+    finally:
+        request(info, "POST", "/shutdown", {}).close()
+        thread.join(timeout=5)
+
+    llm = GatedLLM()
+    monkeypatch.setattr(openai_compat, "OpenAICompatibleClient", lambda: llm)
+    manager = JobManager(workspace, max_jobs=1)
+    first = manager.submit("reply", {"source_text": "Nice", "platform": "x", "rounds": 1})
+    second = manager.submit("reply", {"source_text": "Nice", "platform": "x", "rounds": 1})
+    first.events_after(1, 5)
+    assert (first.status, second.status) == ("running", "queued")
+    llm.gate.set()
+    for _ in range(200):
+        if first.done and second.done:
+            break
+        threading.Event().wait(0.01)
+    assert (first.status, second.status) == ("succeeded", "succeeded")
+    manager.close()
+
+
+def test_jobs_record_to_the_daemon_cassette(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(openai_compat, "OpenAICompatibleClient", StubLLM)
+    workspace = _workspace(tmp_path)
+    cassette = tmp_path / "jobs.jsonl"
+    with using_cassette(CassetteSettings(cassette, "record")):
+        manager = JobManager(workspace)
+    job = manager.submit("post", {"topic": "Launch", "platform": "x", "rounds": 1})
+    for _ in range(200):
+        if job.done:
+            break
+        threading.Event().wait(0.01)
+    manager.close()
+    assert job.status == "succeeded", job.error
+    assert len(cassette.read_text().splitlines()) > 1
@@ -0,0 +1,35 @@
+from social_duo.core.molt_engine import FeedState, reduce_event
+from social_duo.core.similarity import SimilarityIndex
+
+
+def test_index_finds_near_duplicates_in_long_history():
+    index = SimilarityIndex(threshold=0.5)
+    for idx in range(500):
+        index.add(f"R{idx}", f"filler reply number {idx} about topic {idx * 7}")
+    index.add("R999", "bike lanes near schools make streets safer for kids")
+
+    matches = index.query("bike lanes near schools make streets safer for children")
+    assert matches and matches[0][0] == "R999"
+    assert matches[0][1] > 0.7
+    assert index.query("completely unrelated words here") == []
+    assert index.query("bike lanes near schools", threshold=0.9) == []
+
+
+def test_feed_state_flags_repeats_beyond_recent_window():
+    state = FeedState(max_replies=10)
+    reduce_event(state, {"action": "CREATE_POST", "payload": {"post_id": "P1", "title": "Bike lanes", "content": "c"}})
+    reduce_event(state, {"action": "COMMENT", "payload": {"comment_id": "C1", "post_id": "P1", "content": "Painted lanes are not enough"}})
+    replies = [
+        "Protected lanes cut injuries for riders of every age",
+        "Budget is the real blocker here",
+        "Parking removal is always the fight",
+        "Schools should be first in line",
+    ]
+    for idx, content in enumerate(replies, start=1):
+        reduce_event(state, {"agent": "AgentA", "action": "REPLY", "payload": {"reply_id": f"R{idx}", "parent_id": "C1", "content": content}})
+
+    assert state.is_repeat("Protected lanes cut injuries for riders of any age")
+    assert not state.is_repeat("Snow clearing matters in winter")
+    assert state.is_repeat_topic("Bike lanes", "c")
+    # Echoing the comment being answered is not a repeat; only earlier replies count.
+    assert not state.is_repeat("Painted lanes are not enough, protected ones are")
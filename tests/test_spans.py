@@ -0,0 +1,77 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+import social_duo.cli.post_cmd as post_cmd
+from social_duo.agents.editor import EditorAgent
+from social_duo.agents.prompts import EDITOR_SYSTEM
+from social_duo.agents.writer import WriterAgent
+from social_duo.core.config import default_config, save_config
+from social_duo.core.loop import run_loop
+from social_duo.core.spans import recording, span
+from social_duo.main import app
+from social_duo.storage.history import list_spans
+
+WRITER_JSON = json.dumps({"recommended": "Ship it", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]})
+EDITOR_JSON = json.dumps(
+    {
+        "verdict": "PASS",
+        "issues": [],
+        "edited_version": "Ship it",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 90, "clarity": 90, "hook": 80, "risk": 10},
+    }
+)
+
+
+class StubLLM:
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        content = EDITOR_JSON if messages[0]["content"] == EDITOR_SYSTEM else WRITER_JSON
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def test_spans_cover_loop_stages_across_threads():
+    config = default_config()
+    llm = StubLLM()
+    context = {"platform": "x", "goal": "educate", "topic": "t", "constraints": "{}", "brand_voice": "{}"}
+    with span("outside"):
+        pass
+    with recording() as recorder:
+        with span("command") as root:
+            result = run_loop(
+                writer=WriterAgent(llm), editor=EditorAgent(llm), config=config, context=dict(context), rounds=1, candidates=3
+            )
+    names = [s.name for s in recorder.spans]
+    assert "outside" not in names
+    assert names.count("llm.call") == 3 + 2
+    assert {"prompt.build", "json.parse", "validate"} <= set(names)
+    calls = [s for s in recorder.spans if s.name == "llm.call"]
+    assert all(s.parent_id == root.span_id for s in calls)
+    assert result.trace[-1]["role"] == "critique"
+
+    exported = recorder.to_otel()["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert len(exported) == len(names)
+    assert all(len(s["traceId"]) == 32 and len(s["spanId"]) == 16 for s in exported)
+
+
+def test_profile_flag_prints_breakdown_and_persists_spans(tmp_path: Path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(post_cmd, "open_llm", StubLLM)
+    workspace = tmp_path / ".social-duo"
+    workspace.mkdir()
+    save_config(workspace / "config.json", default_config())
+    facts = tmp_path / "facts.txt"
+    facts.write_text("- fact\n")
+    trace_out = tmp_path / "trace.jsonl"
+
+    args = ["--profile", "--trace-out", str(trace_out), "post", "--goal", "g", "--topic", "t", "--audience", "a"]
+    args += ["--tone", "calm", "--length", "short", "--facts", str(facts), "--rounds", "1", "--json"]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+    assert "Profile" in result.output and "llm.call" in result.output
+
+    stored = list_spans(workspace / "history.db", 1)
+    assert {"llm.call", "validate", "db.write"} <= {s["name"] for s in stored}
+    (line,) = trace_out.read_text().splitlines()
+    assert json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
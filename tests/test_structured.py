@@ -0,0 +1,158 @@
+import json
+
+from social_duo.agents.json_repair import repair_json
+from social_duo.agents.structured import StructuredStats, structured_chat
+from social_duo.types.molt_schemas import MoltAction
+from social_duo.types.schemas import WriterOutput
+
+
+class DummyLLM:
+    def __init__(self, responses, supports_json_schema=False):
+        self.responses = responses
+        self.calls = 0
+        self.formats = []
+        self.supports_json_schema = supports_json_schema
+
+    def chat(self, messages, *, temperature, max_tokens, response_format=None):
+        self.formats.append(response_format)
+        content = self.responses[self.calls]
+        self.calls += 1
+        return {"choices": [{"message": {"content": content}}]}
+
+
+def test_sends_json_schema_when_supported():
+    llm = DummyLLM([json.dumps({"action": "WRAPUP"})], supports_json_schema=True)
+    action, _ = structured_chat(
+        llm, [], MoltAction, temperature=0.5, max_tokens=100, correction="fix", stats=StructuredStats()
+    )
+    assert action.action == "WRAPUP"
+    assert llm.formats[0]["type"] == "json_schema"
+    assert llm.formats[0]["json_schema"]["name"] == "MoltAction"
+
+
+def test_only_schema_rejections_downgrade_to_json_mode(monkeypatch):
+    from social_duo.providers import openai_compat
+
+    class Response:
+        def __init__(self, status_code, text):
+            self.status_code = status_code
+            self.text = text
+
+        def json(self):
+            return json.loads(self.text)
+
+    class HTTP:
+        def __init__(self, responses):
+            self.responses = responses
+            self.formats = []
+
+        def post(self, url, *, headers, json):
+            self.formats.append(json["response_format"]["type"])
+            return self.responses.pop(0)
+
+    monkeypatch.setattr(openai_compat.time, "sleep", lambda s: None)
+    monkeypatch.setenv("OPENAI_JSON_SCHEMA", "1")
+    schema = {"type": "json_schema", "json_schema": {"name": "MoltAction", "schema": {}}}
+    ok = Response(200, json.dumps({"choices": []}))
+
+    http = HTTP([Response(400, "This model's maximum context length is 8192 tokens")] * 3)
+    monkeypatch.setattr(openai_compat, "_http_client", lambda: http)
+    client = openai_compat.OpenAICompatibleClient(api_key="test")
+    try:
+        client.chat([], temperature=0.5, max_tokens=10, response_format=dict(schema))
+    except RuntimeError as exc:
+        assert "context length" in str(exc)
+    else:
+        raise AssertionError("unrelated 400 should raise")
+    assert client.supports_json_schema
+    assert http.formats == ["json_schema"] * 3
+
+    http = HTTP([Response(400, "Invalid parameter: 'response_format' of type 'json_schema' is not supported"), ok])
+    monkeypatch.setattr(openai_compat, "_http_client", lambda: http)
+    client.chat([], temperature=0.5, max_tokens=10, response_format=dict(schema))
+    assert not client.supports_json_schema
+    assert http.formats == ["json_schema", "json_object"]
+
+
+def test_fenced_json_repaired_without_retry():
+    payload = {"recommended": "Hi", "variants": ["a"], "hashtags": [], "rationale": ["r"]}
+    llm = DummyLLM([f"Here you go:\n```json\n{json.dumps(payload)}\n```"])
+    stats = StructuredStats()
+    output, _ = structured_chat(llm, [], WriterOutput, temperature=0.5, max_tokens=100, correction="fix", stats=stats)
+    assert output.recommended == "Hi"
+    assert llm.calls == 1
+    assert llm.formats[0] == {"type": "json_object"}
+    assert stats.summary()["avoided_retries"] == 1
+    assert stats.retries == 0
+
+
+def test_truncated_output_recovered_locally():
+    truncated = '{"action": "REPLY", "content": "Cities should pilot this first, then'
+    llm = DummyLLM([truncated])
+    stats = StructuredStats()
+    action, _ = structured_chat(llm, [], MoltAction, temperature=0.5, max_tokens=100, correction="fix", stats=stats)
+    assert action.action == "REPLY"
+    assert action.content.startswith("Cities should pilot")
+    assert stats.repair_hit_rate == 1.0
+
+
+def test_repair_json_common_mistakes():
+    fixed = repair_json('```json\n{“a”: [1, 2,], "b": True, "c": "line\nbreak",}\n```')
+    assert json.loads(fixed) == {"a": [1, 2], "b": True, "c": "line\nbreak"}
+    assert json.loads(repair_json('{"a": 1, "b"')) == {"a": 1, "b": None}
+    assert repair_json("no json here") is None
+
+
+def test_repair_json_truncated_mid_scalar():
+    assert json.loads(repair_json('{"a": -')) == {"a": None}
+    assert json.loads(repair_json('{"a": 1.')) == {"a": None}
+    assert json.loads(repair_json('{"a": tr')) == {"a": None}
+    assert json.loads(repair_json('{"a": [1, 2.')) == {"a": [1, None]}
+    assert json.loads(repair_json('{"a": 12')) == {"a": 12}
+
+
+def test_unrepairable_output_falls_back_to_corrective_call():
+    good = json.dumps({"action": "WRAPUP"})
+    llm = DummyLLM(["I cannot comply.", good])
+    stats = StructuredStats()
+    action, _ = structured_chat(llm, [], MoltAction, temperature=0.5, max_tokens=100, correction="fix", stats=stats)
+    assert action.action == "WRAPUP"
+    assert llm.calls == 2
+    assert stats.retries == 1
+
+
+def test_post_all_stores_per_platform_stats(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+
+    import social_duo.cli.post_cmd as post_cmd
+    from social_duo.agents.prompts import EDITOR_SYSTEM
+    from social_duo.core.config import default_config, save_config
+    from social_duo.storage.db import connect_read
+
+    editor = {
+        "verdict": "PASS",
+        "issues": [],
+        "edited_version": "Ship it",
+        "alt_suggestions": [],
+        "scores": {"constraint_fit": 90, "clarity": 90, "hook": 80, "risk": 10},
+    }
+    writer = {"recommended": "Ship it", "variants": ["a", "b", "c"], "hashtags": [], "rationale": ["r"]}
+
+    class StubLLM:
+        def chat(self, messages, *, temperature, max_tokens, response_format=None):
+            content = editor if messages[0]["content"] == EDITOR_SYSTEM else writer
+            return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(post_cmd, "open_llm", StubLLM)
+    (tmp_path / ".social-duo").mkdir()
+    save_config(tmp_path / ".social-duo" / "config.json", default_config())
+    argv = ["--platform", "all", "--goal", "a", "--topic", "t", "--audience", "d", "--tone", "c", "--length", "short"]
+    result = CliRunner().invoke(post_cmd.post_app, argv + ["--json"], input="\n")
+    assert result.exit_code == 0, result.output
+
+    rows = connect_read(tmp_path / ".social-duo" / "history.db").execute("SELECT final_json FROM outputs").fetchall()
+    outputs = [json.loads(row[0]) for row in rows]
+    assert len(outputs) > 1
+    assert {out["structured_output"]["calls"] for out in outputs} == {outputs[0]["structured_output"]["calls"]}
+    assert {out["prompt_cache"]["writer"]["calls"] for out in outputs} == {outputs[0]["prompt_cache"]["writer"]["calls"]}